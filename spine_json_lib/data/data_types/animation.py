@@ -3,7 +3,10 @@ from typing import List, Dict, Any
 from spine_json_lib.data.data_types.base_type import SpineData
 from spine_json_lib.data.data_types.bone import BoneTimeline
 from spine_json_lib.data.data_types.deform import Deform
-from spine_json_lib.data.data_types.draworder import DrawOrderTimeline
+from spine_json_lib.data.data_types.draworder import (
+    DrawOrderRemap,
+    DrawOrderTimeline,
+)
 from spine_json_lib.data.data_types.events import EventTimeline
 from spine_json_lib.data.data_types.ik import IkTimeline
 from spine_json_lib.data.data_types.path import PathTimeline
@@ -92,8 +95,13 @@ class Animation(SpineData):
         }
 
     def remove_draw_order_with_ids(self, slots_ids, original_slots):
+        self.remap_draw_order(
+            DrawOrderRemap([slot.name for slot in original_slots], slots_ids)
+        )
+
+    def remap_draw_order(self, remap: DrawOrderRemap) -> None:
         for draw_order in self.drawOrder:
-            draw_order.remove_offsets_with_ids(slots_ids, original_slots)
+            draw_order.remap_offsets(remap)
 
     def remove_deforms_using_slots(self, slots_ids):
         self.deform = {
@@ -2,6 +2,7 @@ import copy
 from typing import Dict, Any, Optional, Callable, List, TypeVar
 
 from spine_json_lib.data.constants import SPINE_3_8_VERSION
+from spine_json_lib.data.float_precision import FloatPrecision
 from spine_json_lib.data.spine_exceptions import SpineParsingException
 from spine_json_lib.data.spine_version_type import SpineVersion
 
@@ -24,6 +25,9 @@ class SpineData(object):
     # We should override this on inherited classes to include fields that are required
     REQUIRED: List[str] = []
 
+    # Attributes starting with '_' are runtime caches, they are never traversed or serialized
+    PRIVATE_PREFIX = "_"
+
     def __new__(cls, *args, **kwargs):
         if cls.DEFAULT_VALUES is None:
             raise NotImplementedError(
@@ -77,12 +81,15 @@ class SpineData(object):
             obj=self, func=SpineData.set_default_values_from_version, version=version
         )
 
-    def to_json(self, spine_version: SpineVersion) -> Dict[str, Any]:
+    def to_json(
+        self, spine_version: SpineVersion, precision: Optional[FloatPrecision] = None
+    ) -> Dict[str, Any]:
         # Generates Json data from SpineData classes ignoring default values
         return self.traverse_spine_data(
             obj=self,
             func=SpineData.to_spine_data_ignoring_default_values,
             version=spine_version,
+            precision=precision,
         )
 
     def clean_unsupported_attributes(self, spine_version: SpineVersion) -> None:
@@ -97,6 +104,9 @@ class SpineData(object):
     def set_default_values_from_version(obj: SpineDataType, version):
         default_values = obj.default_values(version=version)
         for k, v in obj.__dict__.items():
+            if k.startswith(SpineData.PRIVATE_PREFIX):
+                continue
+
             if k in default_values.keys() and v is None:
                 obj.__setattr__(k, default_values[k])
 
@@ -107,22 +117,48 @@ class SpineData(object):
 
     @staticmethod
     def to_spine_data_ignoring_default_values(
-        obj: SpineDataType, version: str
+        obj: SpineDataType,
+        version: str,
+        precision: Optional[FloatPrecision] = None,
+        parent_attribute: Optional[str] = None,
     ) -> Dict[str, Any]:
         result = {}
         default_values = obj.default_values(version=version)
         for k, v in obj.__dict__.items():
+            if k.startswith(SpineData.PRIVATE_PREFIX):
+                continue
+
+            if precision is not None and v is not None:
+                # Rounding first so values rounded to the default are not written
+                rounded = precision.round_attribute(obj, k, v, parent_attribute)
+                if v != default_values.get(k):
+                    precision.count_saved(
+                        k,
+                        v,
+                        rounded,
+                        parent_attribute,
+                        omitted=rounded == default_values.get(k),
+                    )
+                v = rounded
+
             if (
                 v is None and k in default_values.keys() and default_values[k] is None
             ) or (v is not None and v != default_values.get(k)):
                 result[k] = obj.traverse_spine_data(
-                    v, SpineData.to_spine_data_ignoring_default_values, version=version
+                    v,
+                    SpineData.to_spine_data_ignoring_default_values,
+                    version=version,
+                    precision=precision,
+                    parent_attribute=k,
                 )
         return result
 
     @staticmethod
     def remove_unsupported_attributes(obj: SpineDataType, version: str) -> None:
         for k, v in obj.__dict__.items():
+            if k.startswith(SpineData.PRIVATE_PREFIX):
+                continue
+
             if (
                 version < SPINE_3_8_VERSION
                 and obj.UNSUPPORTED_VALUES_OLD_VERSION is not None
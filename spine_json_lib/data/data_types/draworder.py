@@ -1,6 +1,5 @@
-import copy
 from collections import OrderedDict
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterable
 
 from spine_json_lib.data.data_types.base_type import SpineData
 
@@ -34,57 +33,6 @@ class DrawOrderTimeline(SpineData):
 
         super(DrawOrderTimeline, self).__init__(values)
 
-    @staticmethod
-    def _reorder_slots_with_offset(slot_offsets, original_slots):
-        new_slots_draw_order = copy.deepcopy(original_slots)
-        operations = []
-        pop_indexes = []
-        for index, slot in enumerate(original_slots):
-            if slot.name in slot_offsets:
-                new_index = index + slot_offsets[slot.name].offset
-                operations.append({"slot": slot, "new_index": new_index})
-                pop_indexes.append(index)
-
-        for _index in reversed(pop_indexes):
-            new_slots_draw_order.pop(_index)
-
-        sorted_operations = sorted(operations, key=lambda x: x["new_index"])
-        for cached in sorted_operations:
-            new_slots_draw_order.insert(cached["new_index"], cached["slot"])
-
-        return new_slots_draw_order
-
-    @staticmethod
-    def _adjust_draw_oder_offset_with_erased_slots(
-        slots_to_be_removed, slots, slot_offsets, original_slots
-    ):
-        original_slots_names = [_slot.name for _slot in original_slots]
-        # Filter out slots we want to remove
-        clean_original_slots = list(
-            filter(lambda x: x not in slots_to_be_removed, original_slots_names)
-        )
-
-        reordered_slots_names = [_slot.name for _slot in slots]
-        # Filter out slots we want to remove
-        clean_reordered_slots = list(
-            filter(lambda x: x not in slots_to_be_removed, reordered_slots_names)
-        )
-
-        adjusted_draw_order_offsets = copy.deepcopy(slot_offsets)
-
-        for name, slot_offset in adjusted_draw_order_offsets.items():
-            if name in slots_to_be_removed:
-                continue
-            index_original = clean_original_slots.index(name)
-            index_final = clean_reordered_slots.index(name)
-            slot_offset.offset = index_final - index_original
-
-        return [
-            offset
-            for offset in adjusted_draw_order_offsets.values()
-            if offset.slot not in slots_to_be_removed and offset.offset != 0
-        ]
-
     def remove_offsets_with_ids(self, slots_ids, original_slots):
         """
         When we remove a slot, the position of the slot removed could interfere directly
@@ -93,14 +41,108 @@ class DrawOrderTimeline(SpineData):
         We need to update the drawOrder offsets bearing in mind the slots removed
         and the new position in the slots array.
         """
-        slot_offsets = OrderedDict({offset.slot: offset for offset in self.offsets})
-        new_slots_draw_order = self._reorder_slots_with_offset(
-            slot_offsets, original_slots
+        self.remap_offsets(
+            DrawOrderRemap([slot.name for slot in original_slots], slots_ids)
         )
 
-        self.offsets = self._adjust_draw_oder_offset_with_erased_slots(
-            slots_to_be_removed=slots_ids,
-            slots=new_slots_draw_order,
-            slot_offsets=slot_offsets,
-            original_slots=original_slots,
+    def remap_offsets(self, remap: "DrawOrderRemap") -> None:
+        """Same as remove_offsets_with_ids reusing a remap shared by many timelines"""
+        slot_offsets = OrderedDict({offset.slot: offset for offset in self.offsets})
+        self.offsets = remap.remap_offsets(slot_offsets)
+
+
+class DrawOrderRemap(object):
+    """
+    Removal of slots from the setup draw order applied to the offsets of drawOrder keys.
+
+    Slots are handled by their integer index in the setup pose: the offsets of a key are
+    resolved into a draw order array of slot indices, removed slots are masked out and
+    the new offsets are the difference between the positions of every slot with and
+    without the key applied. Build it once and reuse it for every drawOrder key.
+    """
+
+    def __init__(
+        self, original_slots_names: List[str], slots_to_be_removed: Iterable[str]
+    ) -> None:
+        self.num_slots = len(original_slots_names)
+        self.slot_index: Dict[str, int] = {
+            name: idx for idx, name in enumerate(original_slots_names)
+        }
+        self.slots_to_be_removed = frozenset(slots_to_be_removed)
+
+        self.removed_mask = bytearray(self.num_slots)
+        for name in self.slots_to_be_removed:
+            idx = self.slot_index.get(name)
+            if idx is not None:
+                self.removed_mask[idx] = 1
+
+        # Position of every slot in the setup draw order once the slots are removed
+        self.setup_positions = self._kept_positions(range(self.num_slots))
+
+    def _kept_positions(self, draw_order: Iterable[int]) -> List[int]:
+        positions = [-1] * self.num_slots
+        removed_mask = self.removed_mask
+        position = 0
+        for idx in draw_order:
+            if not removed_mask[idx]:
+                positions[idx] = position
+                position += 1
+        return positions
+
+    def draw_order(self, slot_offsets: Dict[str, DrawOrderTimelineOffset]) -> List[int]:
+        """
+        :return: slot indices in the order they are drawn after applying slot_offsets
+        """
+        moves = sorted(
+            (idx, idx + slot_offsets[name].offset)
+            for name, idx in self.slot_index.items()
+            if name in slot_offsets
         )
+        targets = [target for _, target in moves]
+
+        if len(set(targets)) == len(targets) and all(
+            0 <= target < self.num_slots for target in targets
+        ):
+            # Every moved slot ends exactly in its target position
+            draw_order = [-1] * self.num_slots
+            for idx, target in moves:
+                draw_order[target] = idx
+            moved = frozenset(idx for idx, _ in moves)
+            not_moved = (idx for idx in range(self.num_slots) if idx not in moved)
+            return [next(not_moved) if idx == -1 else idx for idx in draw_order]
+
+        # Out of range or repeated targets, the moved slots are inserted in order
+        # of target the same way as list.insert does
+        moved = frozenset(idx for idx, _ in moves)
+        draw_order = [idx for idx in range(self.num_slots) if idx not in moved]
+        for idx, target in sorted(moves, key=lambda move: move[1]):
+            draw_order.insert(target, idx)
+        return draw_order
+
+    def remap_offsets(
+        self, slot_offsets: Dict[str, DrawOrderTimelineOffset]
+    ) -> List[DrawOrderTimelineOffset]:
+        """
+        :return: offsets of the slots not removed updated to the slots array without
+                the removed slots, the ones not moving the slot anymore are discarded
+        """
+        final_positions = self._kept_positions(self.draw_order(slot_offsets))
+
+        new_offsets = []
+        for name, slot_offset in slot_offsets.items():
+            if name in self.slots_to_be_removed:
+                continue
+            idx = self.slot_index.get(name)
+            if idx is None:
+                raise ValueError(
+                    "drawOrder offset references slot {} which is not in the slots list".format(
+                        name
+                    )
+                )
+            offset = final_positions[idx] - self.setup_positions[idx]
+            if offset != 0:
+                new_offsets.append((slot_offset, offset))
+
+        for slot_offset, offset in new_offsets:
+            slot_offset.offset = offset
+        return [slot_offset for slot_offset, _ in new_offsets]
@@ -0,0 +1,52 @@
+from typing import Any, Iterable, List, Sequence, Tuple
+
+# (bone index, x, y, weight) of a bone moving a vertex of a weighted attachment
+Influence = Tuple[int, Any, Any, Any]
+
+
+def is_weighted(attachment: Any) -> bool:
+    """
+    True if the vertices of an attachment are weighted. Unweighted vertices are 2
+    values per vertex: as many as the uvs of meshes or 2 * vertexCount of paths,
+    clipping and bounding box attachments.
+    """
+    vertices = getattr(attachment, "vertices", None)
+    if not vertices:
+        return False
+
+    uvs = getattr(attachment, "uvs", None)
+    if uvs is not None:
+        return len(vertices) > len(uvs)
+    vertex_count = getattr(attachment, "vertexCount", None)
+    if vertex_count is not None:
+        return len(vertices) > vertex_count * 2
+    return False
+
+
+def decode_weighted_vertices(vertices: Sequence[Any]) -> List[List[Influence]]:
+    """
+    Influences of every vertex of a weighted attachment, stored as
+    [bones count, bone index, x, y, weight, bone index, x, y, weight, ...]
+    """
+    decoded = []
+    position = 0
+    while position < len(vertices):
+        bones_count = int(vertices[position])
+        position += 1
+        decoded.append(
+            [
+                tuple(vertices[index : index + 4])
+                for index in range(position, position + bones_count * 4, 4)
+            ]
+        )
+        position += bones_count * 4
+    return decoded
+
+
+def encode_weighted_vertices(decoded: Iterable[Sequence[Influence]]) -> List[Any]:
+    vertices = []
+    for influences in decoded:
+        vertices.append(len(influences))
+        for influence in influences:
+            vertices.extend(influence)
+    return vertices
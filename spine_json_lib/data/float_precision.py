@@ -0,0 +1,164 @@
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence
+
+from spine_json_lib.data.data_types.vertices import (
+    decode_weighted_vertices,
+    encode_weighted_vertices,
+    is_weighted,
+)
+
+POSITIONS = "positions"
+ANGLES = "angles"
+SCALES = "scales"
+UVS = "uvs"
+MIXES = "mixes"
+TIMES = "times"
+
+# Class of field of the float attributes of the spine json
+FIELD_CLASSES: Dict[str, str] = {
+    "x": POSITIONS,
+    "y": POSITIONS,
+    "length": POSITIONS,
+    "width": POSITIONS,
+    "height": POSITIONS,
+    "softness": POSITIONS,
+    "position": POSITIONS,
+    "spacing": POSITIONS,
+    "lengths": POSITIONS,
+    "vertices": POSITIONS,
+    "rotation": ANGLES,
+    "angle": ANGLES,
+    "shearX": ANGLES,
+    "shearY": ANGLES,
+    "scaleX": SCALES,
+    "scaleY": SCALES,
+    "uvs": UVS,
+    "mix": MIXES,
+    "rotateMix": MIXES,
+    "translateMix": MIXES,
+    "scaleMix": MIXES,
+    "shearMix": MIXES,
+    "curve": MIXES,
+    "c2": MIXES,
+    "c3": MIXES,
+    "c4": MIXES,
+    "time": TIMES,
+}
+# Keyframes of bone timelines store every value as x and y
+TIMELINE_FIELD_CLASSES: Dict[str, str] = {"scale": SCALES, "shear": ANGLES}
+
+
+class FloatPrecision(object):
+    """
+    Decimals written for every class of float field when serializing a spine json,
+    None keeps the values as they are:
+    - positions: coordinates, lengths, sizes and vertices of meshes and deforms
+    - angles: rotations and shears, in degrees
+    - scales: scale factors
+    - uvs: texture coordinates of meshes
+    - mixes: constraint mixes, bone weights of meshes and bezier curve points. In
+      the spine json colors are hex strings with no decimals.
+    - times: time of keyframes in seconds
+    Floats with an integer value (after rounding) are written as ints. Bytes saved
+    in compact json by every class of field are added to bytes_saved while
+    serializing.
+    """
+
+    def __init__(
+        self,
+        positions: Optional[int] = None,
+        angles: Optional[int] = None,
+        scales: Optional[int] = None,
+        uvs: Optional[int] = None,
+        mixes: Optional[int] = None,
+        times: Optional[int] = None,
+        collapse_integers: bool = True,
+    ) -> None:
+        self.decimals: Dict[str, Optional[int]] = {
+            POSITIONS: positions,
+            ANGLES: angles,
+            SCALES: scales,
+            UVS: uvs,
+            MIXES: mixes,
+            TIMES: times,
+        }
+        self.collapse_integers = collapse_integers
+        self.bytes_saved: Dict[str, int] = Counter()
+
+    @staticmethod
+    def get_field_class(attribute: str, parent_attribute: Optional[str]) -> str:
+        if attribute in ("x", "y") and parent_attribute in TIMELINE_FIELD_CLASSES:
+            return TIMELINE_FIELD_CLASSES[parent_attribute]
+        return FIELD_CLASSES.get(attribute)
+
+    def round_attribute(
+        self, obj: Any, attribute: str, value: Any, parent_attribute: Optional[str]
+    ) -> Any:
+        """
+        Value of the attribute of a SpineData object to serialize, parent_attribute
+        is the attribute holding obj in its parent
+        """
+        field_class = self.get_field_class(attribute, parent_attribute)
+        if field_class is None or value is None:
+            return value
+
+        if attribute == "vertices" and is_weighted(obj):
+            # [bones count, bone index, x, y, weight, bone index, ...] per vertex
+            return self._round_weighted_vertices(value)
+        if isinstance(value, list):
+            return [self._round(field_class, item) for item in value]
+        return self._round(field_class, value)
+
+    def count_saved(
+        self,
+        attribute: str,
+        value: Any,
+        rounded: Any,
+        parent_attribute: Optional[str],
+        omitted: bool = False,
+    ) -> None:
+        """
+        Count the bytes saved writing rounded instead of value, omitted if the
+        attribute is no longer written as rounding made it a default value
+        """
+        field_class = self.get_field_class(attribute, parent_attribute)
+        if field_class is None:
+            return
+        if omitted:
+            # "attribute":value,
+            self.bytes_saved[field_class] += len(attribute) + _text_length(value) + 4
+        else:
+            self.bytes_saved[field_class] += _text_length(value) - _text_length(rounded)
+
+    def _round(self, field_class: str, value: Any) -> Any:
+        if not isinstance(value, float):
+            return value
+
+        decimals = self.decimals[field_class]
+        rounded = value if decimals is None else round(value, decimals)
+        if self.collapse_integers and rounded.is_integer():
+            rounded = int(rounded)
+        return rounded
+
+    def _round_weighted_vertices(self, vertices: Sequence[Any]) -> List[Any]:
+        return encode_weighted_vertices(
+            [
+                (
+                    bone_index,
+                    self._round(POSITIONS, x),
+                    self._round(POSITIONS, y),
+                    self._round(MIXES, weight),
+                )
+                for bone_index, x, y, weight in influences
+            ]
+            for influences in decode_weighted_vertices(vertices)
+        )
+
+
+def _text_length(value: Any) -> int:
+    # Only numbers change when rounding, the rest of the json text is the same
+    if isinstance(value, list):
+        return sum(_text_length(item) for item in value)
+    if isinstance(value, (int, float)):
+        return len(repr(value))
+    return 0
@@ -0,0 +1,129 @@
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple
+
+from spine_json_lib.data.data_types.slot import Slot, SlotTimeline
+
+def bits_from_indices(indices: Iterable[int]) -> int:
+    bits = 0
+    for idx in indices:
+        bits |= 1 << idx
+    return bits
+
+
+def indices_from_bits(bits: int) -> Iterator[int]:
+    while bits:
+        lowest_bit = bits & -bits
+        yield lowest_bit.bit_length() - 1
+        bits ^= lowest_bit
+
+
+class SlotsUsageIndex(object):
+    """
+    Integer indices for the slots and the attachment ids of a skeleton, so visibility
+    and usage of them in every animation is stored as bitsets (python ints where bit i
+    is the slot or attachment with index i) and joined with bitwise ORs.
+    """
+
+    def __init__(
+        self,
+        slots: List[Slot],
+        skins: List[Any],
+        alpha_zero_slots: Iterable[str],
+        no_attachment_slots: Iterable[str],
+    ) -> None:
+        self.slot_names: List[str] = [slot.name for slot in slots]
+        self.slot_index: Dict[str, int] = {
+            name: idx for idx, name in enumerate(self.slot_names)
+        }
+
+        self.attachment_names: List[str] = []
+        self.attachment_index: Dict[str, int] = {}
+        for skin in skins:
+            for slot_attachments in skin.attachments.values():
+                for attachment_id in slot_attachments:
+                    if attachment_id not in self.attachment_index:
+                        self.attachment_index[attachment_id] = len(
+                            self.attachment_names
+                        )
+                        self.attachment_names.append(attachment_id)
+
+        self.all_slots_bits = (1 << len(self.slot_names)) - 1
+        self.alpha_zero_bits = self.slots_bits(alpha_zero_slots)
+        self.no_attachment_bits = self.slots_bits(no_attachment_slots)
+        self.default_visible_bits = self.all_slots_bits & ~(
+            self.alpha_zero_bits | self.no_attachment_bits
+        )
+
+        # Attachment set up by default in every slot, used whenever the slot is visible
+        self.setup_attachment_bits: List[int] = [
+            self.attachments_bits([slot.attachment]) for slot in slots
+        ]
+
+    def slots_bits(self, slot_ids: Iterable[str]) -> int:
+        slot_index = self.slot_index
+        return bits_from_indices(
+            slot_index[slot_id] for slot_id in slot_ids if slot_id in slot_index
+        )
+
+    def attachments_bits(self, attachment_ids: Iterable[Optional[str]]) -> int:
+        """Bitset of the attachment ids given, ids not found in any skin are ignored"""
+        attachment_index = self.attachment_index
+        return bits_from_indices(
+            attachment_index[attachment_id]
+            for attachment_id in attachment_ids
+            if attachment_id in attachment_index
+        )
+
+    def slots_from_bits(self, bits: int) -> FrozenSet[str]:
+        return frozenset(self.slot_names[idx] for idx in indices_from_bits(bits))
+
+    def attachments_from_bits(self, bits: int) -> FrozenSet[str]:
+        return frozenset(self.attachment_names[idx] for idx in indices_from_bits(bits))
+
+    def setup_attachments_of(self, slots_bits: int) -> int:
+        """Bitset of the setup attachments of every slot in slots_bits"""
+        used_bits = 0
+        for slot_idx in indices_from_bits(slots_bits):
+            used_bits |= self.setup_attachment_bits[slot_idx]
+        return used_bits
+
+    def animation_bits(
+        self,
+        anim_slots: Dict[str, SlotTimeline],
+        default_visible_bits: Optional[int] = None,
+    ) -> Tuple[int, int]:
+        """
+        :param default_visible_bits: slots visible when the animation doesn't key them,
+                the ones visible in setup pose by default
+        :return: bitsets with the slots visible in the animation and with the attachments
+                used in its slot timelines (setup attachments are not included)
+        """
+        if default_visible_bits is None:
+            default_visible_bits = self.default_visible_bits
+        visible_bits = default_visible_bits
+        used_bits = 0
+
+        for slot_id, slot_data in anim_slots.items():
+            slot_bit = 1 << self.slot_index[slot_id]
+            slot_used_attachments = slot_data.get_used_attachments()
+
+            # Discarding slot if:
+            # 1 -) At least 1 animation it is not empty
+            # 2 -) The slot has alpha 0 but has color information
+            # 3 -) Has no setup attachments and is not adding any in animation data
+            if (
+                slot_data.is_empty()
+                or (slot_bit & self.alpha_zero_bits and not slot_data.has_color())
+                or (slot_bit & self.no_attachment_bits and not slot_used_attachments)
+            ):
+                visible_bits &= ~slot_bit
+            else:
+                visible_bits |= slot_bit
+                used_bits |= self.attachments_bits(slot_used_attachments)
+
+        return visible_bits, used_bits
+
+    def animations_bits(
+        self, animations: Iterable[Dict[str, SlotTimeline]]
+    ) -> List[Tuple[int, int]]:
+        """Visible slots and used attachments bitsets of every animation, in order"""
+        return [self.animation_bits(anim_slots) for anim_slots in animations]
@@ -1,7 +1,6 @@
 import copy
-import functools
 
-from typing import Dict, Any, List, Union, FrozenSet, TypeVar, Tuple
+from typing import Dict, Any, List, Union, FrozenSet, TypeVar, Tuple, Optional
 
 from spine_json_lib.data.data_types.animation import Animation
 from spine_json_lib.data.data_types.bone import Bone
@@ -17,8 +16,11 @@ from spine_json_lib.data.data_types.skin import (
 from spine_json_lib.data.data_types.slot import Slot, SlotTimeline
 from spine_json_lib.data.data_types.transform import Transform
 from spine_json_lib.data.data_types.base_type import SpineData
+from spine_json_lib.data.float_precision import FloatPrecision
 from spine_json_lib.data.spine_exceptions import SpineJsonEditorError
 from spine_json_lib.data.spine_version_type import SpineVersion
+from spine_json_lib.data.slots_usage import SlotsUsageIndex, indices_from_bits
+from spine_json_lib.utils import get_tags_from_name, get_tags_from_names, SCALE_TAG
 
 
 # Mypy forward declarations
@@ -27,6 +29,37 @@ JsonSpineAnimationDataType = TypeVar(
 )
 SpineAnimationDataType = TypeVar("SpineAnimationDataType", bound="SpineAnimationData")
 
+# (bones by name, slots by name, custom scale of bones, custom scale of slots)
+HierarchyCache = Tuple[
+    Dict[str, Bone],
+    Dict[str, Slot],
+    Dict[str, float],
+    Dict[str, float],
+]
+
+
+def get_skin_images(skin: Skin38) -> Tuple[List[str], Dict[str, Dict[str, str]]]:
+    """
+    Images referenced by a skin
+    :return: images of meshes and other attachments with a path and the images of region
+            attachments in the format {slot_id: {attachment_id: image_path}}
+    """
+    images = []
+    attachments_images = {}
+    for attachment_id, attachment in skin.attachments.items():
+        for slot_id, slot_data in attachment.items():
+            if isinstance(slot_data, SkinAttachment):
+                image_path = slot_data.path or slot_data.name
+                if image_path is not None:
+                    attachments_images.setdefault(attachment_id, {})
+                    attachments_images[attachment_id][slot_id] = image_path
+            elif isinstance(slot_data, (SkinMesh, SkinLinkedMesh)):
+                mesh_image_path = slot_data.path or slot_data.name
+                images.append(mesh_image_path)
+            elif hasattr(slot_data, "path") and slot_data.path is not None:
+                images.append(slot_data.path)
+    return images, attachments_images
+
 
 class JsonSpineAnimationData:
     def __init__(self, data):
@@ -39,8 +72,10 @@ class JsonSpineAnimationData:
         _data.set_default_values(version=self.spine_version)
         return _data
 
-    def to_json_data(self) -> Dict[str, Any]:
-        json_data = self.data.to_json(self.spine_version)
+    def to_json_data(
+        self, precision: Optional[FloatPrecision] = None
+    ) -> Dict[str, Any]:
+        json_data = self.data.to_json(self.spine_version, precision=precision)
         json_data["skeleton"] = copy.deepcopy(self.skeleton)
         return json_data
 
@@ -61,8 +96,17 @@ class SpineAnimationData(SpineData):
         _data = copy.deepcopy(data)
         del _data["skeleton"]
 
+        self._hierarchy_cache: Optional[HierarchyCache] = None
+        # Lengths of the bones and slots lists when the cache was built
+        self._hierarchy_sizes: Tuple[int, int] = (0, 0)
         self.bones: List[Bone] = [Bone(value) for value in _data["bones"]]
         self.slots: List[Slot] = [Slot(value) for value in _data["slots"]]
+
+        # Tags in names of bones and slots, wrong tags only raise when they are used
+        self._names_tags: Dict[str, Dict[str, Any]] = get_tags_from_names(
+            [bone.name for bone in self.bones] + [slot.name for slot in self.slots],
+            skip_invalid=True,
+        )
         self.skins: Union[Dict[str, Any], List[Skin38]] = [
             Skin38(value) for value in _data["skins"]
         ]
@@ -85,25 +129,83 @@ class SpineAnimationData(SpineData):
 
         super(SpineAnimationData, self).__init__(_data)
 
+    # Bones and slots stay in __dict__ under their own names, so they are validated
+    # and serialized as any other attribute, but assigning them drops the cache
+    @property
+    def bones(self) -> List[Bone]:
+        return self.__dict__["bones"]
+
+    @bones.setter
+    def bones(self, bones: List[Bone]) -> None:
+        self.__dict__["bones"] = bones
+        self._hierarchy_cache = None
+
+    @property
+    def slots(self) -> List[Slot]:
+        return self.__dict__["slots"]
+
+    @slots.setter
+    def slots(self, slots: List[Slot]) -> None:
+        self.__dict__["slots"] = slots
+        self._hierarchy_cache = None
+
+    def invalidate_hierarchy_cache(self) -> None:
+        """
+        Drop cached lookups and scales, only needed after editing the names or parents
+        of bones and slots, or replacing items, in place
+        """
+        self._hierarchy_cache = None
+
+    def _get_hierarchy_cache(self) -> HierarchyCache:
+        """
+        Bones and slots by name and the custom scales already computed for them. It is
+        rebuilt when the bones or slots lists are assigned or change their length
+        """
+        sizes = (len(self.bones), len(self.slots))
+        if self._hierarchy_cache is None or sizes != self._hierarchy_sizes:
+            self._hierarchy_sizes = sizes
+            bones_dict: Dict[str, Bone] = {}
+            for bone in self.bones:
+                bones_dict.setdefault(bone.name, bone)
+            slots_dict: Dict[str, Slot] = {}
+            for slot in self.slots:
+                slots_dict.setdefault(slot.name, slot)
+            self._hierarchy_cache = (
+                bones_dict,
+                slots_dict,
+                {},
+                {},
+            )
+        return self._hierarchy_cache
+
+    def get_name_tags(self, name: str) -> Dict[str, Any]:
+        """Tags of a bone or slot name, parsed at load time or the first time asked"""
+        if name not in self._names_tags:
+            self._names_tags[name] = get_tags_from_name(name)
+        return self._names_tags[name]
+
     def get_slot(self, slot_id: str) -> Union[Slot, None]:
-        for slot in self.slots:
-            if slot.name == slot_id:
-                return slot
-        return None
+        return self._get_hierarchy_cache()[1].get(slot_id)
 
     def get_bone_custom_scale_recursive(self, bone: Bone) -> float:
         """
         Return custom 'scale' set in name of a bone and any of the parents bone
         In case of not found custom scale will return 1.0
+        Scales are computed top-down and cached, so every bone is only parsed once
         """
-        result_scale = 1.0
-        iter_bone = bone
+        bones_dict, _, bones_scales, _ = self._get_hierarchy_cache()
 
-        # This will iterate every bone up in tree looking for 'scale' until we found the root
-        while iter_bone.name != "root":
-            b_scale = iter_bone.get_scale_in_name()
-            result_scale *= b_scale
-            iter_bone = self.get_bone(iter_bone.parent)
+        # Go up in tree until the root or a bone with the scale already computed
+        pending_bones = []
+        iter_bone = bone
+        while iter_bone.name not in bones_scales and iter_bone.name != "root":
+            pending_bones.append(iter_bone)
+            iter_bone = bones_dict[iter_bone.parent]
+
+        result_scale = bones_scales.get(iter_bone.name, 1.0)
+        for pending_bone in reversed(pending_bones):
+            result_scale *= self.get_name_tags(pending_bone.name).get(SCALE_TAG, 1.0)
+            bones_scales[pending_bone.name] = result_scale
         return result_scale
 
     def get_slot_custom_scale(self, slot: Slot) -> float:
@@ -111,17 +213,16 @@ class SpineAnimationData(SpineData):
         Return custom 'scale' set in name of an slot and any of the parents bone
         In case of not found custom scale will return 1.0
         """
-        slot_bone = self.get_bone(slot.bone)
-        slot_scale = slot.get_scale_in_name()
-        bone_scale = self.get_bone_custom_scale_recursive(slot_bone)
-
-        return slot_scale * bone_scale
+        _, _, _, slots_scales = self._get_hierarchy_cache()
+        if slot.name not in slots_scales:
+            slot_bone = self.get_bone(slot.bone)
+            bone_scale = self.get_bone_custom_scale_recursive(slot_bone)
+            slot_scale = self.get_name_tags(slot.name).get(SCALE_TAG, 1.0)
+            slots_scales[slot.name] = slot_scale * bone_scale
+        return slots_scales[slot.name]
 
     def get_bone(self, bone_id: str) -> Union[Bone, None]:
-        for bone in self.bones:
-            if bone.name == bone_id:
-                return bone
-        return None
+        return self._get_hierarchy_cache()[0].get(bone_id)
 
     def get_skin(self, skin_id):
         for skin in self.skins:
@@ -130,30 +231,50 @@ class SpineAnimationData(SpineData):
         return None
 
     def remove_skin(self, skin_name):
-        skins = [skin for skin in self.skins if skin.name != skin_name]
-        if len(skins) == len(self.skins):
-            raise SpineJsonEditorError(
-                message="Trying to remove skin with name {} but was not found".format(
-                    skin_name
-                )
-            )
+        removed_images, removed_attachments = self.remove_skins([skin_name])
+        return removed_images, removed_attachments[skin_name]
 
-        skin_to_remove = self.get_skin(skin_name)
+    def remove_skins(
+        self, skin_names: List[str]
+    ) -> Tuple[List[str], Dict[str, Dict[str, Dict[str, str]]]]:
+        """
+        Remove several skins with a single pass over the skins kept and the animations
+        :return: images of meshes and other attachments with a path of every skin
+                removed and the images of their region attachments by skin name
+        """
+        skins_by_name = {skin.name: skin for skin in self.skins}
+        for skin_name in skin_names:
+            if skin_name not in skins_by_name:
+                raise SpineJsonEditorError(
+                    message="Trying to remove skin with name {} but was not found".format(
+                        skin_name
+                    )
+                )
+        skin_names = list(dict.fromkeys(skin_names))
+        removed_names = frozenset(skin_names)
 
+        skins = [skin for skin in self.skins if skin.name not in removed_names]
         for skin in skins:
-            for attachment_id, attachment in skin.attachments.items():
-                attachment_data = copy.deepcopy(attachment)
-                for slot_id, slot_data in attachment_data.items():
+            for slot_id, slot_attachments in skin.attachments.items():
+                for attachment_id, slot_data in slot_attachments.items():
                     if (
                         isinstance(slot_data, SkinLinkedMesh)
-                        and slot_data.skin == skin_name
+                        and slot_data.skin in removed_names
                     ):
-
-                        # In case of a LinkedMesh linked to a mesh existing into the skin we want to remove
-                        # we need to copy the Mesh information to this LinkedMesh
-                        skin_removed_slot_mesh = skin_to_remove.attachments[
-                            attachment_id
-                        ][slot_id]
+                        # In case of a LinkedMesh linked to a mesh existing into a skin
+                        # we want to remove we need to copy the Mesh information to
+                        # this LinkedMesh, following links through other removed skins
+                        skin_removed_slot_mesh = slot_data
+                        visited_skins = set()
+                        while (
+                            isinstance(skin_removed_slot_mesh, SkinLinkedMesh)
+                            and skin_removed_slot_mesh.skin in removed_names
+                            and skin_removed_slot_mesh.skin not in visited_skins
+                        ):
+                            visited_skins.add(skin_removed_slot_mesh.skin)
+                            skin_removed_slot_mesh = skins_by_name[
+                                skin_removed_slot_mesh.skin
+                            ].attachments[slot_id][attachment_id]
 
                         copied_mesh = copy.deepcopy(skin_removed_slot_mesh)
                         copied_mesh.name = slot_data.name
@@ -161,30 +282,26 @@ class SpineAnimationData(SpineData):
                         copied_mesh.width = slot_data.width
                         copied_mesh.height = slot_data.height
 
-                        attachment[slot_id] = copied_mesh
+                        slot_attachments[attachment_id] = copied_mesh
 
         # Get images removed from spine
         removed_images = []
         removed_attachments = {}
-        for attachment_id, attachment in skin_to_remove.attachments.items():
-            for slot_id, slot_data in attachment.items():
-                if isinstance(slot_data, SkinAttachment):
-                    image_path = slot_data.path or slot_data.name
-                    if image_path is not None:
-                        removed_attachments.setdefault(attachment_id, {})
-                        removed_attachments[attachment_id][slot_id] = image_path
-                elif isinstance(slot_data, (SkinMesh, SkinLinkedMesh)):
-                    mesh_image_path = slot_data.path or slot_data.name
-                    removed_images.append(mesh_image_path)
-                elif hasattr(slot_data, "path") and slot_data.path is not None:
-                    removed_images.append(slot_data.path)
-
-        # Remove deforms with references to skin we want to remove <skin_name>
+        for skin_name in skin_names:
+            skin_images, attachments_images = get_skin_images(skins_by_name[skin_name])
+            removed_images += skin_images
+            removed_attachments[skin_name] = attachments_images
+
+        # Remove deforms with references to skins we want to remove
         # it should be in any case validated before going into this point as deforms add
         # a performance overhead to the game runtime
         for anim_data in self.animations.values():
-            if anim_data.deform and skin_name in anim_data.deform.keys():
-                del anim_data.deform[skin_name]
+            if anim_data.deform and not removed_names.isdisjoint(anim_data.deform):
+                anim_data.deform = {
+                    skin_id: skin_deform
+                    for skin_id, skin_deform in anim_data.deform.items()
+                    if skin_id not in removed_names
+                }
 
         self.skins = skins
 
@@ -218,51 +335,53 @@ class SpineAnimationData(SpineData):
 
         return no_attachment_slot
 
+    def get_slots_usage_index(self) -> SlotsUsageIndex:
+        return SlotsUsageIndex(
+            slots=self.slots,
+            skins=self.skins,
+            alpha_zero_slots=self.get_slots_with_alpha_zero(),
+            no_attachment_slots=self.get_slots_not_visible_in_setup_pose(),
+        )
+
     def get_visible_slots_and_attachments(
         self, anim_slots, visible_slots, alpha_zero_slots, no_attachment_slots
     ):
         # type: (Dict[str, SlotTimeline], FrozenSet[str], List[str], List[str]) -> Tuple[FrozenSet[str], Dict[str, FrozenSet[str]]]
-        anim_visible_slots = frozenset(visible_slots)
+        """
+        Slots visible in an animation, starting from visible_slots, and attachments
+        used by each of them. get_unused_slots_and_attachments doesn't need the
+        attachments by slot and uses the bitsets of SlotsUsageIndex directly.
+        """
+        usage_index = SlotsUsageIndex(
+            slots=self.slots,
+            skins=self.skins,
+            alpha_zero_slots=alpha_zero_slots,
+            no_attachment_slots=no_attachment_slots,
+        )
+        visible_bits, _ = usage_index.animation_bits(
+            anim_slots, default_visible_bits=usage_index.slots_bits(visible_slots)
+        )
+        anim_visible_slots = usage_index.slots_from_bits(visible_bits)
 
-        anim_list_visible_slots = [
-            slot for slot in self.slots if slot.name in anim_visible_slots
-        ]
         anim_used_attachments = {
-            slot.name: frozenset([slot.attachment]) for slot in anim_list_visible_slots
+            slot.name: frozenset([slot.attachment])
+            for slot in self.slots
+            if slot.name in visible_slots
         }
-
-        slots_dict = {slot.name: slot for slot in self.slots if slot.name}
-
         for slot_id, slot_data in anim_slots.items():
-            # By default we have to add the slot attachment base data as they are normally missing
-            # in the json info for optimization
+            if slot_id not in anim_visible_slots:
+                anim_used_attachments[slot_id] = frozenset()
+                continue
+            # The setup attachment is normally missing in the timeline
             slot_used_attachments = slot_data.get_used_attachments()
-            if slots_dict[slot_id].attachment is not None:
-                slot_used_attachments.append(slots_dict[slot_id].attachment)
-
-            # Discarding slot if:
-            # 1 -) At least 1 animation it is not empty
-            # 2 -) The slot has alpha 0 but has color information
-            # 3 -) Has no setup attachments and is not adding any in animation data
-            if (
-                slot_data.is_empty()
-                or (slot_id in alpha_zero_slots and not slot_data.has_color())
-                or (slot_id in no_attachment_slots and not slot_used_attachments)
-            ):
-                # Mark slot as invisible
-                anim_visible_slots -= frozenset([slot_id])
-                anim_used_attachments[slot_id] = frozenset([])
-
-            else:
-                # Save used attachments
-                anim_used_attachments[slot_id] = frozenset(slot_used_attachments)
-
-                # Mark slot as visible
-                anim_visible_slots |= frozenset([slot_id])
+            setup_attachment = self.get_slot(slot_id).attachment
+            if setup_attachment is not None:
+                slot_used_attachments.append(setup_attachment)
+            anim_used_attachments[slot_id] = frozenset(slot_used_attachments)
 
         return anim_visible_slots, anim_used_attachments
 
-    def get_unused_slots_and_attachments(self) -> (FrozenSet[Any], List[str]):
+    def get_unused_slots_and_attachments(self) -> (FrozenSet[Any], FrozenSet[Any]):
         """
         - Slots can be visible or invisible by default:
         1 - Visible slots:
@@ -271,50 +390,69 @@ class SpineAnimationData(SpineData):
             - can only be removed if it is not used in any animation or the ones using it are also
             marked to not be shown
         """
+        usage_index = self.get_slots_usage_index()
 
-        slots_set = frozenset([slot.name for slot in self.slots])
-        alpha_zero_slots = self.get_slots_with_alpha_zero()
-        no_attachment_slots = self.get_slots_not_visible_in_setup_pose()
-
-        default_invisible_slots = frozenset(alpha_zero_slots + no_attachment_slots)
-        default_visible_slots = slots_set - default_invisible_slots
+        visible_bits = 0
+        used_attachments_bits = 0
+        for anim_visible_bits, anim_used_bits in usage_index.animations_bits(
+            [anim_data.slots for anim_data in self.animations.values()]
+        ):
+            visible_bits |= anim_visible_bits
+            used_attachments_bits |= anim_used_bits
 
-        visible_slots = frozenset([])
-        l_attachments_used = frozenset([])
+        # Setup attachment of a slot is used by every animation showing the slot
+        used_attachments_bits |= usage_index.setup_attachments_of(visible_bits)
+        invisible_bits = usage_index.all_slots_bits & ~visible_bits
 
-        for anim_id, anim_data in self.animations.items():
-            (
-                anim_visible_slots,
-                anim_used_attachments,
-            ) = self.get_visible_slots_and_attachments(
-                anim_slots=anim_data.slots,
-                visible_slots=default_visible_slots,
-                alpha_zero_slots=alpha_zero_slots,
-                no_attachment_slots=no_attachment_slots,
-            )
-            visible_slots |= anim_visible_slots
-
-            l_attachments_used |= functools.reduce(
-                (lambda x, y: x | y), anim_used_attachments.values()
-            )
-
-        invisible_slots = slots_set - visible_slots
-
-        attachments_to_remove: FrozenSet[Any] = frozenset([])
+        attachment_index = usage_index.attachment_index
+        slot_index = usage_index.slot_index
+        attachments_to_remove = set()
 
         # Only not visible slots and the ones not being used can be erased
         for skin in self.skins:
             for slot_id, attachment_data in skin.attachments.items():
-                attachments_ids = attachment_data.keys()
-
-                for attachment_id in attachments_ids:
-                    if attachment_id not in l_attachments_used:
-                        # Avoid removing skinmeshes if parent slot is visible...
-                        if (
-                            isinstance(attachment_data[attachment_id], SkinMesh)
-                            and slot_id not in invisible_slots
-                        ):
-                            continue
-                        attachments_to_remove |= frozenset([attachment_id])
+                slot_is_invisible = (
+                    slot_id in slot_index
+                    and invisible_bits >> slot_index[slot_id] & 1
+                )
+                for attachment_id, attachment in attachment_data.items():
+                    if used_attachments_bits >> attachment_index[attachment_id] & 1:
+                        continue
+                    # Avoid removing skinmeshes if parent slot is visible...
+                    if isinstance(attachment, SkinMesh) and not slot_is_invisible:
+                        continue
+                    attachments_to_remove.add(attachment_id)
+
+        return (
+            usage_index.slots_from_bits(invisible_bits),
+            frozenset(attachments_to_remove),
+        )
+
+    def get_animations_shown_attachments(self) -> Dict[str, Dict[str, FrozenSet[str]]]:
+        """
+        Attachments every animation can show in each of its visible slots: the setup
+        attachment of the slot and the ones keyed in its timeline.
+        Every animation is analysed only once.
+        :return: {animation_id: {slot_id: attachment ids}}
+        """
+        usage_index = self.get_slots_usage_index()
+        setup_attachments = [slot.attachment for slot in self.slots]
 
-        return invisible_slots, attachments_to_remove
+        shown_attachments = {}
+        for anim_id, anim_data in self.animations.items():
+            visible_bits, _ = usage_index.animation_bits(anim_data.slots)
+
+            anim_attachments = {}
+            for slot_idx in indices_from_bits(visible_bits):
+                slot_timeline = anim_data.slots.get(usage_index.slot_names[slot_idx])
+                attachments = set(
+                    slot_timeline.get_used_attachments() if slot_timeline else ()
+                )
+                if setup_attachments[slot_idx] is not None:
+                    attachments.add(setup_attachments[slot_idx])
+                if attachments:
+                    anim_attachments[usage_index.slot_names[slot_idx]] = frozenset(
+                        attachments
+                    )
+            shown_attachments[anim_id] = anim_attachments
+        return shown_attachments
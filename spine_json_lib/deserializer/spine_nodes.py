@@ -10,7 +10,9 @@ from spine_json_lib.graph.factories import INodeFactory, IGraphParser
 from spine_json_lib.graph.dagraph import DAGraph
 from typing import Any, List
 from typing import Dict
+from typing import Iterable
 from typing import Optional
+from typing import Tuple
 
 
 class NodeType(Enum):
@@ -30,73 +32,48 @@ class NodeType(Enum):
 
 SPINE_JSON_MAPPED_IDS = {"BONE": "bones", "SLOT": "slots", "IK": "ik"}
 
+# Graph ids are typed keys (node_type_name, base_id), so slots and bones can share names
+SpineGraphId = Tuple[str, Optional[str]]
+
+BONE_TYPE = NodeType.BONE.name
+SLOT_TYPE = NodeType.SLOT.name
+IK_TYPE = NodeType.IK.name
+ATTACHMENT_TYPE = NodeType.ATTACHMENT.name
+IMAGE_TYPE = NodeType.IMAGE.name
+
+
+# Children types forbidden per node type, shared by every node of the same type
+FORBIDDEN_CHILD_TYPES = {
+    BONE_TYPE: frozenset([ATTACHMENT_TYPE]),
+    SLOT_TYPE: frozenset([BONE_TYPE, NodeType.PATH.name, IK_TYPE]),
+    IK_TYPE: frozenset([NodeType.PATH.name, IK_TYPE, ATTACHMENT_TYPE, IMAGE_TYPE]),
+    ATTACHMENT_TYPE: frozenset(
+        [NodeType.PATH.name, IK_TYPE, ATTACHMENT_TYPE, BONE_TYPE]
+    ),
+    IMAGE_TYPE: frozenset(_type.name for _type in NodeType),
+}
+
 
 class SpineNodeFactory(INodeFactory):
     def create_node(
         self,
         node_type: str,
-        node_id: str,
+        node_id: SpineGraphId,
         order: int,
         node_data: Dict[str, Any] = None,
         public_id: Optional[str] = None,
-    ) -> SpamNode:
-        created_node = None
-        if node_type == NodeType.BONE.name:
-            created_node = SpamNode(
-                id_value=node_id,
-                data=node_data,
-                node_type=NodeType.BONE.name,
-                children_types_forbidden=[NodeType.ATTACHMENT.name],
-                order=order,
-            )
-        elif node_type == NodeType.SLOT.name:
-            created_node = SpamNode(
-                id_value=node_id,
-                data=node_data,
-                node_type=NodeType.SLOT.name,
-                children_types_forbidden=[
-                    NodeType.BONE.name,
-                    NodeType.PATH.name,
-                    NodeType.IK.name,
-                ],
-                order=order,
-            )
-        elif node_type == NodeType.IK.name:
-            created_node = SpamNode(
-                id_value=node_id,
-                data=node_data,
-                node_type=NodeType.IK.name,
-                children_types_forbidden=[
-                    NodeType.PATH.name,
-                    NodeType.IK.name,
-                    NodeType.ATTACHMENT.name,
-                    NodeType.IMAGE.name,
-                ],
-                order=order,
-            )
-        elif node_type == NodeType.ATTACHMENT.name:
-            created_node = SpamNode(
-                id_value=node_id,
-                data=node_data,
-                node_type=NodeType.ATTACHMENT.name,
-                children_types_forbidden=[
-                    NodeType.PATH.name,
-                    NodeType.IK.name,
-                    NodeType.ATTACHMENT.name,
-                    NodeType.BONE.name,
-                ],
-                order=order,
-            )
-        elif node_type == NodeType.IMAGE.name:
-            created_node = SpamNode(
-                id_value=node_id,
-                data=node_data,
-                node_type=NodeType.IMAGE.name,
-                children_types_forbidden=[_type.name for _type in list(NodeType)],
-                order=order,
-            )
-
-        return created_node
+    ) -> Optional[SpamNode]:
+        children_types_forbidden = FORBIDDEN_CHILD_TYPES.get(node_type)
+        if children_types_forbidden is None:
+            return None
+
+        return SpamNode(
+            id_value=node_id,
+            data=node_data,
+            node_type=node_type,
+            children_types_forbidden=children_types_forbidden,
+            order=order,
+        )
 
 
 class SpineNodeData(object):
@@ -107,18 +84,146 @@ class SpineNodeData(object):
         node_base_id: str,
         idx: int = -1,
     ) -> None:
-        node_graph_id = SpineGraphParser._to_graph_id(
-            node_type_name=node_type.name, node_base_id=node_base_id
-        )
         # Adding idx to node_data
         _node_data = copy.deepcopy(node_data)
         _node_data = {"idx": idx, "data": _node_data}
 
         self.node_type = node_type.name
-        self.node_id = node_graph_id
+        self.node_id = (node_type.name, node_base_id)
         self.node_data = _node_data
 
 
+class SpineGraph(DAGraph):
+    """
+    DAGraph for spine skeletons keeping a reference count for every ATTACHMENT and
+    IMAGE node: the number of skin entries that use it (one per add_edge call).
+
+    Nodes of those types whose reference count drops to 0 are "orphaned", they are
+    not used anymore and can be pruned without scanning the whole graph.
+    - get_orphaned_ids() returns every orphaned node
+    - get_orphaned_ids(since_checkpoint=True) only the ones orphaned after the
+    last call to checkpoint()
+    """
+
+    REF_COUNTED_TYPES = frozenset([ATTACHMENT_TYPE, IMAGE_TYPE])
+
+    def __init__(self, node_factory=None, detect_cycles=False):
+        super(SpineGraph, self).__init__(node_factory, detect_cycles=detect_cycles)
+        self._ref_counts: Dict[SpineGraphId, int] = {}
+        self._edges_refs: Dict[Tuple[SpineGraphId, SpineGraphId], int] = {}
+        # Dicts used as ordered sets to keep results deterministic
+        self._orphaned: Dict[SpineGraphId, None] = {}
+        self._orphaned_since_checkpoint: Dict[SpineGraphId, None] = {}
+
+    def add_node(
+        self,
+        node_id: Optional[SpineGraphId] = None,
+        node_data: Optional[Dict[str, Any]] = None,
+        node_type: str = DEFAULT_NODE_TYPE,
+        public_id: Optional[str] = None,
+    ) -> SpamNode:
+        node = super(SpineGraph, self).add_node(
+            node_id=node_id, node_data=node_data, node_type=node_type, public_id=public_id
+        )
+        if node.node_type in self.REF_COUNTED_TYPES:
+            # Not referenced by anyone until an edge is added
+            self._ref_counts[node.id] = 0
+            self._set_orphaned(node.id)
+        return node
+
+    def add_edge(self, parent_id: SpineGraphId, child_id: SpineGraphId) -> None:
+        super(SpineGraph, self).add_edge(parent_id, child_id)
+        self._add_reference(parent_id, child_id)
+
+    def add_edges(self, edges: Iterable[Tuple[SpineGraphId, SpineGraphId]]) -> None:
+        edges = list(edges)
+        super(SpineGraph, self).add_edges(edges)
+        for parent_id, child_id in edges:
+            self._add_reference(parent_id, child_id)
+
+    def remove_edge(self, parent_id: SpineGraphId, child_id: SpineGraphId) -> None:
+        super(SpineGraph, self).remove_edge(parent_id, child_id)
+        self._drop_references(child_id, self._edges_refs.pop((parent_id, child_id), 0))
+
+    def remove_reference(self, parent_id: SpineGraphId, child_id: SpineGraphId) -> None:
+        """
+        Remove one of the references added with add_edge(parent_id, child_id),
+        the edge itself is removed when the last reference goes away
+        """
+        edge = (parent_id, child_id)
+        edge_refs = self._edges_refs.get(edge)
+        if edge_refs is None:
+            raise ValueError(
+                "No references found from {} to {}".format(parent_id, child_id)
+            )
+        if edge_refs > 1:
+            self._edges_refs[edge] = edge_refs - 1
+            self._ref_counts[child_id] -= 1
+        else:
+            self.remove_edge(parent_id, child_id)
+
+    def edge_refs(self, parent_id: SpineGraphId, child_id: SpineGraphId) -> int:
+        """Number of references added from parent_id to an ATTACHMENT or IMAGE node"""
+        return self._edges_refs.get((parent_id, child_id), 0)
+
+    def ref_count(self, node_id: SpineGraphId) -> int:
+        """Number of references to an ATTACHMENT or IMAGE node"""
+        return self._ref_counts[node_id]
+
+    def checkpoint(self) -> None:
+        """Start tracking again the nodes orphaned from now on"""
+        self._orphaned_since_checkpoint = {}
+
+    def get_orphaned_ids(
+        self, node_type: Optional[str] = None, since_checkpoint: bool = False
+    ) -> List[SpineGraphId]:
+        orphaned = self._orphaned_since_checkpoint if since_checkpoint else self._orphaned
+        return [
+            node_id
+            for node_id in orphaned
+            if node_type is None or node_id[0] == node_type
+        ]
+
+    def _nodes_removed(self, removed_nodes: List[SpamNode]) -> None:
+        removed_ids = {node.id for node in removed_nodes}
+        for node in removed_nodes:
+            node_id = node.id
+            self._ref_counts.pop(node_id, None)
+            self._orphaned.pop(node_id, None)
+            self._orphaned_since_checkpoint.pop(node_id, None)
+
+            for parent_id in node.parents:
+                self._edges_refs.pop((parent_id, node_id), None)
+
+            # Removed nodes keep the links to their children
+            for child_id in node.children:
+                edge_refs = self._edges_refs.pop((node_id, child_id), 0)
+                if child_id not in removed_ids:
+                    self._drop_references(child_id, edge_refs)
+
+    def _add_reference(self, parent_id: SpineGraphId, child_id: SpineGraphId) -> None:
+        if child_id not in self._ref_counts:
+            return
+
+        edge = (parent_id, child_id)
+        self._edges_refs[edge] = self._edges_refs.get(edge, 0) + 1
+        self._ref_counts[child_id] += 1
+        self._orphaned.pop(child_id, None)
+        self._orphaned_since_checkpoint.pop(child_id, None)
+
+    def _drop_references(self, child_id: SpineGraphId, references: int) -> None:
+        if not references:
+            return
+
+        self._ref_counts[child_id] -= references
+        if self._ref_counts[child_id] == 0:
+            self._set_orphaned(child_id)
+
+    def _set_orphaned(self, node_id: SpineGraphId) -> None:
+        self._orphaned[node_id] = None
+        self._orphaned_since_checkpoint[node_id] = None
+
+
 class SpineGraphParser(IGraphParser):
     @classmethod
     def create_from_json_file(
@@ -150,11 +255,7 @@ class SpineGraphParser(IGraphParser):
             if (
                 node.node_type is NodeType.SLOT
                 and "attachment" in node._data
-                and SpineGraphParser._to_graph_id(
-                    node_type_name=NodeType.ATTACHMENT.name,
-                    node_base_id=node._data["attachment"],
-                )
-                not in node.children.keys()
+                and (ATTACHMENT_TYPE, node._data["attachment"]) not in node.children
             ):
                 del node._data["attachment"]
 
@@ -186,10 +287,7 @@ class SpineGraphParser(IGraphParser):
             node_data=node_data.node_data,
         )
         # Getting optional parent from bone
-        parent_id = SpineGraphParser._to_graph_id(
-            node_type_name=NodeType.BONE.name, node_base_id=bone_data.get("parent")
-        )
-        parent = graph.get_node(parent_id)
+        parent = graph.get_node((BONE_TYPE, bone_data.get("parent")))
         if parent:
             graph.add_edge(parent.id, node_data.node_id)
         return node_data
@@ -210,48 +308,80 @@ class SpineGraphParser(IGraphParser):
         )
 
         # Getting optional parents from slot
-        parent_id = SpineGraphParser._to_graph_id(
-            node_type_name=NodeType.BONE.name, node_base_id=slot_data.get("bone")
-        )
-        parent = graph.get_node(parent_id)
+        parent = graph.get_node((BONE_TYPE, slot_data.get("bone")))
         if parent:
             graph.add_edge(parent.id, spine_slot_data.node_id)
 
         return spine_slot_data
 
     @staticmethod
-    def add_skin_attachments_to_slot(graph: DAGraph, slot_parent: SpineNodeData, skin_attachment: List) -> None:
-        for _id in skin_attachment:
-            _data = skin_attachment[_id]
-            attachment_data = SpineNodeData(
-                node_data=_data,
-                node_type=NodeType.ATTACHMENT,
-                node_base_id=_id,
-            )
-
-            if graph.get_node(attachment_data.node_id) is None:
+    def add_skin_attachments_to_slot(
+        graph: DAGraph,
+        slot_parent: SpineNodeData,
+        skin_attachment: Dict[str, Any],
+        edges: Optional[List[Tuple[SpineGraphId, SpineGraphId]]] = None,
+    ) -> None:
+        """
+        Add the attachments (and the images they use) of one skin to a slot.
+        :param edges: if given, the new edges are appended to it instead of being added
+                      to the graph, so they can be inserted in bulk later
+        """
+        nodes = graph._nodes
+        new_edges = [] if edges is None else edges
+        slot_id = slot_parent.node_id
+
+        for _id, _data in skin_attachment.items():
+            attachment_id, image_id = SpineGraphParser.skin_attachment_ids(_id, _data)
+            if attachment_id not in nodes:
+                # Attachments are never serialized back from the graph, no need to copy
                 graph.add_node(
-                    node_type=attachment_data.node_type,
-                    node_id=attachment_data.node_id,
-                    node_data=attachment_data.node_data,
+                    node_type=ATTACHMENT_TYPE,
+                    node_id=attachment_id,
+                    node_data={"idx": -1, "data": _data},
                 )
 
-            image_id = _data.get("path") or _data.get("name") or _id
-            image_node_data = SpineNodeData(
-                node_data={},
-                node_type=NodeType.IMAGE,
-                node_base_id=image_id
-            )
-
-            if graph.get_node(image_node_data.node_id) is None:
+            if image_id not in nodes:
                 graph.add_node(
-                    node_type=image_node_data.node_type,
-                    node_id=image_node_data.node_id,
-                    node_data=image_node_data.node_data,
+                    node_type=IMAGE_TYPE,
+                    node_id=image_id,
+                    node_data={"idx": -1, "data": {}},
                 )
 
-            graph.add_edge(attachment_data.node_id, image_node_data.node_id)
-            graph.add_edge(slot_parent.node_id, attachment_data.node_id)
+            new_edges.append((attachment_id, image_id))
+            new_edges.append((slot_id, attachment_id))
+
+        if edges is None:
+            graph.add_edges(new_edges)
+
+    @staticmethod
+    def skin_attachment_ids(
+        attachment_name: str, attachment_data: Any
+    ) -> Tuple[SpineGraphId, SpineGraphId]:
+        """
+        Graph ids of the ATTACHMENT and IMAGE nodes of a skin attachment entry,
+        attachment_data can be either the json dict or the SpineData instance
+        """
+        image_name = (
+            attachment_data.get("path") or attachment_data.get("name") or attachment_name
+        )
+        return (ATTACHMENT_TYPE, attachment_name), (IMAGE_TYPE, image_name)
+
+    @staticmethod
+    def group_skins_attachments_by_slot(
+        skins: List[Dict[str, Any]]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Single pass over the skins returning for every slot name the attachments
+        it has in each skin, in the same order as the skins
+        """
+        slots_attachments: Dict[str, List[Dict[str, Any]]] = {}
+        for skin in skins:
+            skin_data = skin.get("attachments")
+            if not skin_data:
+                continue
+            for slot_name, slot_attachments in skin_data.items():
+                slots_attachments.setdefault(slot_name, []).append(slot_attachments)
+        return slots_attachments
 
     @staticmethod
     def add_ik_to_graph(graph: DAGraph, ik_data: Dict[str, Any], idx: int) -> SpineNodeData:
@@ -269,19 +399,13 @@ class SpineGraphParser(IGraphParser):
 
         # Getting optional parents for ik
         for child_bone_id in ik_data["bones"]:
-            child_id = SpineGraphParser._to_graph_id(
-                node_type_name=NodeType.BONE.name, node_base_id=child_bone_id
-            )
-            child = graph.get_node(child_id)
+            child = graph.get_node((BONE_TYPE, child_bone_id))
             if child:
                 graph.add_edge(spine_ik_data.node_id, child.id)
 
         target_bone = ik_data.get("target")
         if target_bone:
-            parent_bone_id = SpineGraphParser._to_graph_id(
-                node_type_name=NodeType.BONE.name, node_base_id=target_bone
-            )
-            parent_bone = graph.get_node(parent_bone_id)
+            parent_bone = graph.get_node((BONE_TYPE, target_bone))
             if parent_bone:
                 graph.add_edge(parent_bone.id, spine_ik_data.node_id)
 
@@ -290,45 +414,32 @@ class SpineGraphParser(IGraphParser):
     @classmethod
     def create_from_json_data(
         cls, json_data: Dict[str, Any], node_factory: SpineNodeFactory
-    ) -> DAGraph:
-        graph = DAGraph(node_factory)
+    ) -> SpineGraph:
+        graph = SpineGraph(node_factory)
 
         for idx, bone_data in enumerate(json_data["bones"]):
             cls.add_bone_to_graph(
                 graph=graph, bone_data=bone_data, idx=idx
             )
 
+        slots_attachments = cls.group_skins_attachments_by_slot(json_data["skins"])
+        attachments_edges: List[Tuple[SpineGraphId, SpineGraphId]] = []
         for idx, _slot_data in enumerate(json_data.get("slots", [])):
             node_slot = cls.add_slot_to_graph(graph=graph, slot_data=_slot_data, idx=idx)
 
-            # Adding attachments as child to slots differentiating between versions:
-            for data in json_data["skins"]:
-                skin_data = data.get("attachments")
-                if skin_data:
-                    slot_skinned = skin_data.get(_slot_data["name"], [])
-
-                    SpineGraphParser.add_skin_attachments_to_slot(
-                        graph=graph,
-                        slot_parent=node_slot,
-                        skin_attachment=slot_skinned,
-                    )
+            # Adding attachments of every skin as children of the slot
+            for slot_skinned in slots_attachments.get(_slot_data["name"], []):
+                cls.add_skin_attachments_to_slot(
+                    graph=graph,
+                    slot_parent=node_slot,
+                    skin_attachment=slot_skinned,
+                    edges=attachments_edges,
+                )
+        graph.add_edges(attachments_edges)
 
         iks = json_data.get("ik", [])
         for idx, ik_data in enumerate(iks):
             cls.add_ik_to_graph(graph=graph, ik_data=ik_data, idx=idx)
 
+        graph.checkpoint()
         return graph
-
-    @staticmethod
-    def _to_graph_id(node_type_name: str, node_base_id: Optional[str]) -> str:
-        """
-        Convert to Graph Id to avoid cases like Slots and Bones with the same ids
-        :return:
-        """
-        _suffix = NodeType[node_type_name].name
-        return "{}_{}".format(node_base_id, _suffix)
-
-    @staticmethod
-    def _to_base_id(node_type_name, graph_id):
-        _suffix = "_{}".format(NodeType[node_type_name].name)
-        return graph_id.replace(_suffix, "")
@@ -6,7 +6,12 @@ import pytest
 from spine_json_lib.deserializer.spine_nodes import (
     SpineNodeFactory,
     SpineGraphParser,
+    ATTACHMENT_TYPE,
+    BONE_TYPE,
+    IMAGE_TYPE,
+    SLOT_TYPE,
 )
+from spine_json_lib.spine_graph_container import SpineGraphContainer
 from typing import Any
 from typing import Dict
 
@@ -56,3 +61,87 @@ class TestSpineGraph:
 
         # Comparing de-serialised json with the original one
         assert orderer(json_data_to_compare) == orderer(graph_json_data)
+
+    def test_spine_graph_typed_ids(self, spine_node_factory):
+        # Names containing a type suffix or shared between types must not collide
+        json_data = {
+            "bones": [{"name": "root"}, {"name": "hip_BONE", "parent": "root"}],
+            "slots": [{"name": "hip_BONE", "bone": "hip_BONE", "attachment": "hip"}],
+            "skins": [{"name": "default", "attachments": {"hip_BONE": {"hip": {}}}}],
+        }
+        graph = SpineGraphParser.create_from_json_data(
+            json_data=json_data, node_factory=spine_node_factory
+        )
+
+        bone = graph.get_node((BONE_TYPE, "hip_BONE"))
+        slot = graph.get_node((SLOT_TYPE, "hip_BONE"))
+        assert bone is not slot
+        assert list(bone.children) == [(SLOT_TYPE, "hip_BONE")]
+        assert list(slot.children) == [(ATTACHMENT_TYPE, "hip")]
+        assert slot.id == (SLOT_TYPE, "hip_BONE")
+
+    def test_spine_nodes_share_forbidden_child_types(self, spine_node_factory):
+        graph = SpineGraphParser.create_from_json_file(
+            json_file=SPINE_JSON_PATH, node_factory=spine_node_factory
+        )
+        bones = [node for node in graph._nodes.values() if node.node_type == BONE_TYPE]
+
+        assert len(bones) > 1
+        assert all(
+            bone._child_types_forbidden is bones[0]._child_types_forbidden
+            for bone in bones
+        )
+        assert not hasattr(bones[0], "__dict__")
+
+    def test_spine_graph_orphaned_nodes(self, spine_node_factory):
+        json_data = {
+            "bones": [{"name": "root"}],
+            "slots": [
+                {"name": "head", "bone": "root"},
+                {"name": "hat", "bone": "root"},
+            ],
+            "skins": [
+                {"name": "default", "attachments": {"head": {"head": {}}}},
+                {
+                    "name": "party",
+                    "attachments": {
+                        "head": {"head": {}},
+                        "hat": {"hat": {"path": "party/hat"}},
+                    },
+                },
+            ],
+        }
+        graph = SpineGraphParser.create_from_json_data(
+            json_data=json_data, node_factory=spine_node_factory
+        )
+        assert graph.ref_count((ATTACHMENT_TYPE, "head")) == 2
+        assert graph.ref_count((IMAGE_TYPE, "party/hat")) == 1
+        assert graph.get_orphaned_ids() == []
+
+        # Removing one of the two skin references keeps the edge
+        graph.remove_reference((SLOT_TYPE, "head"), (ATTACHMENT_TYPE, "head"))
+        assert graph.ref_count((ATTACHMENT_TYPE, "head")) == 1
+        assert graph.get_orphaned_ids() == []
+
+        graph.remove_node_by_id((SLOT_TYPE, "hat"))
+        assert graph.get_orphaned_ids() == [(ATTACHMENT_TYPE, "hat")]
+
+        graph.checkpoint()
+        graph.remove_node_by_id((ATTACHMENT_TYPE, "hat"))
+        assert graph.get_orphaned_ids(since_checkpoint=True) == [(IMAGE_TYPE, "party/hat")]
+        assert graph.get_orphaned_ids(node_type=ATTACHMENT_TYPE) == []
+
+    def test_spine_graph_dependent_ids(self, spine_json_data):
+        container = SpineGraphContainer(spine_json_data)
+        graph = container.graph
+
+        slot_node = graph.get_node((SLOT_TYPE, spine_json_data["slots"][0]["name"]))
+        bone_name = list(slot_node.parents)[0][1]
+        images = container.get_dependent_ids(BONE_TYPE, bone_name, IMAGE_TYPE)
+        assert images
+
+        reachability = graph.reachability()
+        for node_id, node in graph._nodes.items():
+            if node.node_type == IMAGE_TYPE:
+                reached = reachability.reaches((BONE_TYPE, bone_name), node_id)
+                assert reached == (node_id[1] in images)
@@ -0,0 +1,418 @@
+from collections import Counter, namedtuple
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from spine_json_lib.data.data_types.skin import SkinLinkedMesh, SkinMesh
+from spine_json_lib.data.slots_usage import indices_from_bits
+from spine_json_lib.data.spine_anim_data import SpineAnimationData, get_skin_images
+from spine_json_lib.deserializer.spine_nodes import (
+    ATTACHMENT_TYPE,
+    IMAGE_TYPE,
+    SLOT_TYPE,
+    SpineGraph,
+    SpineGraphId,
+    SpineGraphParser,
+)
+
+# Everything an erase would remove, lists are sorted:
+# - animations, skins: the ones erased
+# - slots: slot ids removed
+# - attachments: (skin, slot, attachment) entries removed from the skins kept
+# - images: ids removed from the images references
+# - deforms: (animation, skin, slot, attachment) entries removed from the animations
+#   kept
+ErasePlan = namedtuple("ErasePlan", "animations skins slots attachments images deforms")
+
+
+class EraseIndex(object):
+    """
+    Reverse indexes of an animation used to know what erasing animations and skins
+    would remove without modifying anything:
+     - number of animations showing every slot and using every attachment
+     - where every attachment and slot is used in the skins
+     - deform entries by skin, slot and attachment
+    The graph of the animation is read but never modified.
+
+    Building it walks the whole animation once, planning an erase only visits the
+    elements related to the animations and skins erased.
+    """
+
+    def __init__(self, anim_data: SpineAnimationData, graph: SpineGraph) -> None:
+        self.anim_data = anim_data
+        self.graph = graph
+
+        usage_index = anim_data.get_slots_usage_index()
+        self.usage_index = usage_index
+        self.animations_bits: Dict[str, Tuple[int, int]] = dict(
+            zip(
+                anim_data.animations,
+                usage_index.animations_bits(
+                    [anim.slots for anim in anim_data.animations.values()]
+                ),
+            )
+        )
+
+        # Number of animations where every slot is visible and every attachment is used
+        self.slots_visible_count = [0] * len(usage_index.slot_names)
+        self.attachments_used_count = [0] * len(usage_index.attachment_names)
+        for visible_bits, used_bits in self.animations_bits.values():
+            for slot_idx in indices_from_bits(visible_bits):
+                self.slots_visible_count[slot_idx] += 1
+            for attachment_idx in indices_from_bits(used_bits):
+                self.attachments_used_count[attachment_idx] += 1
+
+        # Slots using every attachment as setup attachment
+        self.setup_slots: Dict[int, List[int]] = {}
+        for slot_idx, setup_bits in enumerate(usage_index.setup_attachment_bits):
+            for attachment_idx in indices_from_bits(setup_bits):
+                self.setup_slots.setdefault(attachment_idx, []).append(slot_idx)
+
+        self.skins = {skin.name: skin for skin in anim_data.skins}
+        self.attachment_entries: Dict[str, List[Tuple[str, str, Any]]] = {}
+        self.slot_entries: Dict[str, List[Tuple[str, str]]] = {}
+        for skin in anim_data.skins:
+            for slot_id, slot_attachments in skin.attachments.items():
+                for attachment_id, attachment in slot_attachments.items():
+                    self.attachment_entries.setdefault(attachment_id, []).append(
+                        (skin.name, slot_id, attachment)
+                    )
+                    self.slot_entries.setdefault(slot_id, []).append(
+                        (skin.name, attachment_id)
+                    )
+
+        self.deforms_by_skin: Dict[str, List[Tuple[str, str, str, str]]] = {}
+        self.deforms_by_slot: Dict[str, List[Tuple[str, str, str, str]]] = {}
+        self.deforms_by_attachment: Dict[str, List[Tuple[str, str, str, str]]] = {}
+        for anim_id, anim in anim_data.animations.items():
+            for skin_id, skin_deform in anim.deform.items():
+                for slot_id, slot_deform in skin_deform.items():
+                    for attachment_id in slot_deform:
+                        entry = (anim_id, skin_id, slot_id, attachment_id)
+                        self.deforms_by_skin.setdefault(skin_id, []).append(entry)
+                        self.deforms_by_slot.setdefault(slot_id, []).append(entry)
+                        self.deforms_by_attachment.setdefault(
+                            attachment_id, []
+                        ).append(entry)
+
+        # Elements already removable before erasing anything
+        self.invisible_slots = {
+            slot_idx
+            for slot_idx, count in enumerate(self.slots_visible_count)
+            if count == 0
+        }
+        self.unused_attachments = {
+            attachment_idx
+            for attachment_idx in range(len(usage_index.attachment_names))
+            if not self._is_attachment_used(attachment_idx, Counter(), set())
+        }
+        self.leaf_slots = {
+            node_id
+            for node_id in graph.get_tails_id()
+            if node_id[0] == SLOT_TYPE
+        }
+
+    def plan(
+        self,
+        animations: Iterable[str],
+        skins: Iterable[str],
+        images_references: Dict[str, Any],
+    ) -> ErasePlan:
+        """
+        What erasing the skins and then the animations given (cleaning the animation
+        afterwards) would remove. Ids not found are ignored.
+        """
+        animations = sorted(frozenset(animations) & self.animations_bits.keys())
+        skins = sorted(frozenset(skins) & self.skins.keys())
+        erased_skins = frozenset(skins)
+
+        invisible_slots, unused_attachments = self._unused_after_erasing(animations)
+        attachments_to_remove = self._attachments_to_remove(
+            unused_attachments, invisible_slots, erased_skins
+        )
+        invisible_names = {
+            self.usage_index.slot_names[slot_idx] for slot_idx in invisible_slots
+        }
+
+        graph_plan = _GraphErasePlan(self.graph)
+        skins_images = graph_plan.erase_skins(self.skins[skin] for skin in skins)
+        slots_to_remove = graph_plan.clean(
+            invisible_names, attachments_to_remove, self.leaf_slots
+        )
+
+        images = {
+            image_id
+            for image_id in skins_images | graph_plan.removed_images
+            if image_id in images_references
+        }
+
+        attachments = set()
+        for slot_id in slots_to_remove:
+            for skin_id, attachment_id in self.slot_entries.get(slot_id, []):
+                attachments.add((skin_id, slot_id, attachment_id))
+        for attachment_id in attachments_to_remove:
+            for skin_id, slot_id, _ in self.attachment_entries.get(attachment_id, []):
+                attachments.add((skin_id, slot_id, attachment_id))
+        attachments = {entry for entry in attachments if entry[0] not in erased_skins}
+
+        deforms = set()
+        for skin_id in skins:
+            deforms.update(self.deforms_by_skin.get(skin_id, []))
+        for slot_id in slots_to_remove:
+            deforms.update(self.deforms_by_slot.get(slot_id, []))
+        kept_skins = self.skins.keys() - erased_skins
+        for attachment_id in attachments_to_remove:
+            deforms.update(
+                entry
+                for entry in self.deforms_by_attachment.get(attachment_id, [])
+                if entry[1] in kept_skins
+            )
+        erased_animations = frozenset(animations)
+        deforms = {entry for entry in deforms if entry[0] not in erased_animations}
+
+        return ErasePlan(
+            animations=animations,
+            skins=skins,
+            slots=sorted(slots_to_remove),
+            attachments=sorted(attachments),
+            images=sorted(images),
+            deforms=sorted(deforms),
+        )
+
+    def _is_attachment_used(
+        self, attachment_idx: int, used_removed: Counter, invisible_slots: Set[int]
+    ) -> bool:
+        if self.attachments_used_count[attachment_idx] > used_removed[attachment_idx]:
+            return True
+        # Setup attachments are used while their slot is visible in any animation
+        return any(
+            slot_idx not in invisible_slots
+            for slot_idx in self.setup_slots.get(attachment_idx, [])
+        )
+
+    def _unused_after_erasing(self, animations: List[str]) -> Tuple[Set[int], Set[int]]:
+        visible_removed = Counter()
+        used_removed = Counter()
+        for anim_id in animations:
+            visible_bits, used_bits = self.animations_bits[anim_id]
+            visible_removed.update(indices_from_bits(visible_bits))
+            used_removed.update(indices_from_bits(used_bits))
+
+        invisible_slots = self.invisible_slots | {
+            slot_idx
+            for slot_idx, count in visible_removed.items()
+            if self.slots_visible_count[slot_idx] == count
+        }
+
+        # Only attachments losing animations or visible setup slots can become unused
+        candidates = {
+            attachment_idx
+            for attachment_idx, count in used_removed.items()
+            if self.attachments_used_count[attachment_idx] == count
+        }
+        for slot_idx in invisible_slots - self.invisible_slots:
+            candidates.update(
+                indices_from_bits(self.usage_index.setup_attachment_bits[slot_idx])
+            )
+        unused_attachments = self.unused_attachments | {
+            attachment_idx
+            for attachment_idx in candidates
+            if not self._is_attachment_used(
+                attachment_idx, used_removed, invisible_slots
+            )
+        }
+        return invisible_slots, unused_attachments
+
+    def _attachments_to_remove(
+        self,
+        unused_attachments: Set[int],
+        invisible_slots: Set[int],
+        erased_skins: frozenset,
+    ) -> Set[str]:
+        slot_index = self.usage_index.slot_index
+        attachments_to_remove = set()
+        for attachment_idx in unused_attachments:
+            attachment_id = self.usage_index.attachment_names[attachment_idx]
+            for skin_id, slot_id, attachment in self.attachment_entries[attachment_id]:
+                if skin_id in erased_skins:
+                    continue
+                # Skin meshes are kept while their slot is visible
+                slot_is_invisible = (
+                    slot_id in slot_index and slot_index[slot_id] in invisible_slots
+                )
+                if not slot_is_invisible and self._is_mesh(
+                    slot_id, attachment_id, attachment, erased_skins
+                ):
+                    continue
+                attachments_to_remove.add(attachment_id)
+                break
+        return attachments_to_remove
+
+    def _is_mesh(
+        self, slot_id: str, attachment_id: str, attachment: Any, erased_skins: frozenset
+    ) -> bool:
+        # Linked meshes of an erased skin are replaced by a copy of the linked mesh
+        while (
+            isinstance(attachment, SkinLinkedMesh) and attachment.skin in erased_skins
+        ):
+            attachment = self.skins[attachment.skin].attachments[slot_id][attachment_id]
+        return isinstance(attachment, SkinMesh)
+
+
+class _GraphErasePlan(object):
+    """
+    Replays on top of a SpineGraph the removal of references and nodes done when
+    erasing, keeping only the differences with the graph
+    """
+
+    def __init__(self, graph: SpineGraph) -> None:
+        self.graph = graph
+        self.edges_removed: Counter = Counter()
+        self.refs_removed: Counter = Counter()
+        self.removed_nodes: Set[SpineGraphId] = set()
+        self.removed_images: Set[str] = set()
+
+    def erase_skins(self, skins: Iterable[Any]) -> Set[str]:
+        """
+        Remove the references of the skins pruning the nodes orphaned
+        :return: images referenced by the skins that are not in the graph anymore
+        """
+        nodes = self.graph._nodes
+        skins_images = set()
+        touched_attachments = set()
+        touched_images = set()
+        for skin in skins:
+            images, attachments_images = get_skin_images(skin)
+            skins_images.update(images)
+            for slot_images in attachments_images.values():
+                skins_images.update(slot_images.values())
+
+            for slot_id, slot_attachments in skin.attachments.items():
+                slot_graph_id = (SLOT_TYPE, slot_id)
+                if slot_graph_id not in nodes:
+                    continue
+                for attachment_id, attachment in slot_attachments.items():
+                    (
+                        attachment_graph_id,
+                        image_graph_id,
+                    ) = SpineGraphParser.skin_attachment_ids(attachment_id, attachment)
+                    self._remove_reference(attachment_graph_id, image_graph_id)
+                    self._remove_reference(slot_graph_id, attachment_graph_id)
+                    touched_attachments.add(attachment_graph_id)
+                    touched_images.add(image_graph_id)
+
+        self._remove_attachments(
+            [node_id for node_id in touched_attachments if self._is_orphaned(node_id)]
+        )
+        self._remove_images(touched_images)
+
+        # Images pruned with the skins are not removed from the images references
+        self.removed_images = set()
+        return {
+            image_id
+            for image_id in skins_images
+            if (IMAGE_TYPE, image_id) not in nodes
+            or (IMAGE_TYPE, image_id) in self.removed_nodes
+        }
+
+    def clean(
+        self,
+        invisible_slots: Set[str],
+        attachments_to_remove: Set[str],
+        leaf_slots: Set[SpineGraphId],
+    ) -> Set[str]:
+        """
+        Remove invisible slots and unused attachments, then the slots left without
+        attachments and the attachments and images left without parents
+        :return: ids of every slot removed
+        """
+        graph = self.graph
+        nodes = graph._nodes
+        slots_removed = set()
+        for slot_id in invisible_slots:
+            slot_graph_id = (SLOT_TYPE, slot_id)
+            slots_removed.add(slot_graph_id)
+            if slot_graph_id in nodes:
+                self._drop_children(slot_graph_id)
+
+        removed_attachments = [
+            node_id
+            for node_id in (
+                (ATTACHMENT_TYPE, attachment_id)
+                for attachment_id in attachments_to_remove
+            )
+            if node_id in nodes and node_id not in self.removed_nodes
+        ]
+        self._remove_attachments(removed_attachments)
+
+        # Slots left without attachments
+        candidates = set(leaf_slots)
+        for attachment_graph_id in removed_attachments:
+            candidates.update(nodes[attachment_graph_id].parents)
+        candidates.update(
+            parent_id
+            for parent_id, _ in self.edges_removed
+            if parent_id[0] == SLOT_TYPE
+        )
+        for slot_graph_id in candidates - slots_removed:
+            if not any(
+                self._has_edge(slot_graph_id, child_id)
+                for child_id in self._children(slot_graph_id)
+            ):
+                slots_removed.add(slot_graph_id)
+
+        # Attachments left without slots
+        orphaned = set(graph.get_orphaned_ids(node_type=ATTACHMENT_TYPE))
+        for slot_graph_id in slots_removed:
+            if slot_graph_id in nodes:
+                orphaned.update(self._children(slot_graph_id))
+        self._remove_attachments(
+            [node_id for node_id in orphaned if self._is_orphaned(node_id)]
+        )
+
+        # Images left without attachments
+        self._remove_images(graph.get_orphaned_ids(node_type=IMAGE_TYPE))
+        return {slot_graph_id[1] for slot_graph_id in slots_removed}
+
+    def _children(self, node_id: SpineGraphId) -> List[SpineGraphId]:
+        return [
+            child_id
+            for child_id in self.graph._nodes[node_id].children
+            if child_id not in self.removed_nodes
+        ]
+
+    def _has_edge(self, parent_id: SpineGraphId, child_id: SpineGraphId) -> bool:
+        edge = (parent_id, child_id)
+        return self.graph.edge_refs(parent_id, child_id) > self.edges_removed[edge]
+
+    def _is_orphaned(self, node_id: SpineGraphId) -> bool:
+        return (
+            node_id not in self.removed_nodes
+            and self.graph.ref_count(node_id) == self.refs_removed[node_id]
+        )
+
+    def _remove_reference(
+        self, parent_id: SpineGraphId, child_id: SpineGraphId
+    ) -> None:
+        self.edges_removed[(parent_id, child_id)] += 1
+        self.refs_removed[child_id] += 1
+
+    def _drop_children(self, node_id: SpineGraphId) -> None:
+        """References from a removed node to its children go away with it"""
+        for child_id in self._children(node_id):
+            edge = (node_id, child_id)
+            refs = self.graph.edge_refs(node_id, child_id) - self.edges_removed[edge]
+            self.edges_removed[edge] += refs
+            self.refs_removed[child_id] += refs
+
+    def _remove_attachments(self, attachments: List[SpineGraphId]) -> None:
+        self.removed_nodes.update(attachments)
+        images = set()
+        for attachment_graph_id in attachments:
+            images.update(self._children(attachment_graph_id))
+            self._drop_children(attachment_graph_id)
+        self._remove_images(images)
+
+    def _remove_images(self, images: Iterable[SpineGraphId]) -> None:
+        for image_graph_id in images:
+            if self._is_orphaned(image_graph_id):
+                self.removed_nodes.add(image_graph_id)
+                self.removed_images.add(image_graph_id[1])
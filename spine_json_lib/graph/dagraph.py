@@ -1,7 +1,10 @@
 from typing import Any, TypeVar
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Optional
+from typing import Tuple
 from typing import Union
 
 from spine_json_lib.graph.factories import (
@@ -9,18 +12,27 @@ from spine_json_lib.graph.factories import (
     IGraphParser,
     DefaultNodeFactory,
 )
+from spine_json_lib.graph.frozen_graph import FrozenDAGraph
 from spine_json_lib.graph.graph_validator import GraphValidationErrors
 from spine_json_lib.graph.graph_validator import GraphValidator
+from spine_json_lib.graph.reachability import ReachabilityIndex
 from spine_json_lib.graph.spamnode import DEFAULT_NODE_TYPE
 from spine_json_lib.graph.spamnode import SpamNode
 
 UNIQUE_ID_ERROR_MESSAGE = "Multiples nodes with ID = {} where found, but ids need to be unique"
 GRAPH_PARSER_WRONG_TYPE = "graph_parser param needs to implement IGraphFactory"
-WRONG_NODE_ID_TYPE = "Only string type allowed for node_id param"
+WRONG_NODE_ID_TYPE = "Only string or tuple types allowed for node_id param"
 ID_NODE_NOT_FOUND = "Node with ID = {} was not found in the graph"
+DUPLICATED_NODE_ID = "Node with ID = {} can only be removed once"
 NODE_FACTORY_WRONG_TYPE = (
     "node_factory needs to be of a type that implements INodeFactory"
 )
+PATH_NODE_NOT_FOUND = "Could not find the node with id: {} inside the graph"
+CIRCULAR_EDGE_ERROR = "Adding an edge from {} to {} would create a circular reference"
+
+# Node ids can be plain strings or typed keys like (node_type, name)
+NodeId = Union[str, Tuple[Any, ...]]
+NODE_ID_TYPES = (str, tuple)
 
 # Create a generic variable that can be 'DAGraph', or any subclass.
 DAGraphType = TypeVar("DAGraphType", bound="DAGraph")
@@ -43,13 +55,26 @@ class DAGraph(object):
      - If you want to serialize of deserialize (JSONs <-> Graphs) a graph you will need to use
      a graph_parser an instance of an implementation of IGraphParser
 
+    Cycle detection:
+     - With detect_cycles=True (or calling enable_cycle_detection) the graph keeps
+     a topological order updated on every new edge (Pearce-Kelly algorithm) and
+     add_edge raises a ValueError for edges that would close a cycle.
+     Only the nodes between both ends of the edge in the order are visited.
+
     """
 
-    def __init__(self, node_factory=None):
+    def __init__(self, node_factory=None, detect_cycles=False):
         self.nodes_id_generator = 0
         self.nodes_counter = 0
         self._nodes = {}
 
+        # Topological position of every node, only when detecting cycles
+        self._topological_index: Optional[Dict[NodeId, int]] = None
+        self._next_topological_index = 0
+
+        # Cached reachability index, dropped on every change in the graph
+        self._reachability: Optional[ReachabilityIndex] = None
+
         if node_factory is None:
             node_factory = DefaultNodeFactory()
 
@@ -61,9 +86,12 @@ class DAGraph(object):
 
         self.nodes_factory = node_factory
 
+        if detect_cycles:
+            self.enable_cycle_detection()
+
     def add_node(
         self,
-        node_id: Union[None, int, str] = None,
+        node_id: Optional[NodeId] = None,
         node_data: Union[Dict[str, Any], None] = None,
         node_type: Union[int, str] = DEFAULT_NODE_TYPE,
         public_id: Union[int, str, None] = None,
@@ -73,9 +101,9 @@ class DAGraph(object):
         if node_id is None:
             _id_node = unique_id
         else:
-            if not isinstance(node_id, str):
+            if not isinstance(node_id, NODE_ID_TYPES):
                 raise TypeError(WRONG_NODE_ID_TYPE)
-            if node_id in self._nodes.keys():
+            if node_id in self._nodes:
                 raise ValueError(UNIQUE_ID_ERROR_MESSAGE.format(node_id))
             _id_node = node_id
 
@@ -89,20 +117,25 @@ class DAGraph(object):
 
         self.nodes_counter += 1
         self._nodes[_id_node] = new_node
+        self._reachability = None
+
+        if self._topological_index is not None:
+            self._topological_index[_id_node] = self._next_topological_index
+            self._next_topological_index += 1
         return new_node
 
-    def get_node(self, node_id: Union[int, str]) -> Optional[SpamNode]:
+    def get_node(self, node_id: NodeId) -> Optional[SpamNode]:
         """
         Find a node with certain id
         :param node_id:
         :return: the node instance
         """
-        if not isinstance(node_id, str):
+        if not isinstance(node_id, NODE_ID_TYPES):
             raise TypeError(WRONG_NODE_ID_TYPE)
 
         return self._nodes.get(node_id)
 
-    def add_edge(self, parent_id: str, child_id: str) -> None:
+    def add_edge(self, parent_id: NodeId, child_id: NodeId) -> None:
         """
         Add connection between two nodes
         :param parent_id:
@@ -110,44 +143,164 @@ class DAGraph(object):
         """
         node1 = self.get_node(parent_id)
         node2 = self.get_node(child_id)
+        if node1 and node2 and self._topological_index is not None:
+            self._update_topological_order(node1, node2)
         if node1:
             node1._add_child(node2)
         node2._add_parent(node1)
+        self._reachability = None
 
-    def remove_edge(self, parent_id: str, child_id: str) -> None:
+    def add_edges(self, edges: Iterable[Tuple[NodeId, NodeId]]) -> None:
+        """
+        Add connections between nodes in bulk, same as calling @add_edge
+        for every (parent_id, child_id) in edges
+        """
+        nodes = self._nodes
+        detect_cycles = self._topological_index is not None
+        self._reachability = None
+        for parent_id, child_id in edges:
+            node1 = nodes.get(parent_id)
+            node2 = nodes.get(child_id)
+            if detect_cycles and node1 and node2:
+                self._update_topological_order(node1, node2)
+            if node1:
+                node1._add_child(node2)
+            node2._add_parent(node1)
+
+    def remove_edge(self, parent_id: NodeId, child_id: NodeId) -> None:
         node1 = self.get_node(parent_id)
         node2 = self.get_node(child_id)
         if node1:
             del node1.children[child_id]
         del node2.parents[parent_id]
+        self._reachability = None
 
-    def remove_node_by_id(self, node_id: str) -> SpamNode:
+    def remove_node_by_id(self, node_id: NodeId) -> SpamNode:
         """Remove node with id == node_id from the graph"""
+        return self.remove_nodes([node_id])[0]
 
-        node = self.get_node(node_id)
-        if node is None:
-            raise ValueError(ID_NODE_NOT_FOUND.format(node_id))
+    def remove_nodes(self, nodes_ids: Iterable[NodeId]) -> List[SpamNode]:
+        """
+        Remove in bulk every node in nodes_ids from the graph.
+        All the ids are validated before removing anything, so if any of them is not
+        in the graph (or is repeated) the graph is left untouched.
+        :return: the removed nodes in the same order as nodes_ids
+        """
+        nodes = self._nodes
+        removed_nodes = []
+        removed_ids = set()
+        for node_id in nodes_ids:
+            if node_id in removed_ids:
+                raise ValueError(DUPLICATED_NODE_ID.format(node_id))
+            node = nodes.get(node_id)
+            if node is None:
+                raise ValueError(ID_NODE_NOT_FOUND.format(node_id))
+            removed_ids.add(node_id)
+            removed_nodes.append(node)
+
+        for node in removed_nodes:
+            node_id = node.id
+            for child in node.children.values():
+                del child.parents[node_id]
+
+            for parent in node.parents.values():
+                del parent.children[node_id]
+
+            del nodes[node_id]
+        self._reachability = None
+
+        if self._topological_index is not None:
+            for node in removed_nodes:
+                del self._topological_index[node.id]
+
+        self._nodes_removed(removed_nodes)
+        return removed_nodes
+
+    def enable_cycle_detection(self) -> None:
+        """
+        Start keeping a topological order of the nodes so edges closing a cycle
+        are rejected when added. Raises a ValueError if the graph has cycles already.
+        """
+        frozen = self.freeze()
+        try:
+            order = frozen.topological_order()
+        except ValueError:
+            raise ValueError(
+                "Cycle detection can not be enabled in a graph with circular references"
+            )
 
-        for _, child in node.children.items():
-            del child.parents[node_id]
+        self._topological_index = {
+            frozen.node_ids[idx]: position for position, idx in enumerate(order)
+        }
+        self._next_topological_index = len(order)
 
-        for _, parent in node.parents.items():
-            del parent.children[node_id]
+    def _update_topological_order(self, parent: SpamNode, child: SpamNode) -> None:
+        """
+        Pearce-Kelly: keep the topological order valid when adding parent -> child,
+        raising a ValueError (before changing anything) if the edge closes a cycle
+        """
+        if parent is child or child.id in parent.children:
+            return
+
+        index = self._topological_index
+        upper_bound = index[parent.id]
+        lower_bound = index[child.id]
+        if upper_bound < lower_bound:
+            return
+
+        # Nodes reachable from child that are not after parent in the order yet
+        forward = [child]
+        visited = {child.id}
+        stack = [child]
+        while stack:
+            node = stack.pop()
+            for next_id, next_node in node.children.items():
+                next_index = index[next_id]
+                if next_index == upper_bound:
+                    raise ValueError(CIRCULAR_EDGE_ERROR.format(parent.id, child.id))
+                if next_index < upper_bound and next_id not in visited:
+                    visited.add(next_id)
+                    forward.append(next_node)
+                    stack.append(next_node)
+
+        # Nodes reaching parent that are not before child in the order yet
+        backward = [parent]
+        visited = {parent.id}
+        stack = [parent]
+        while stack:
+            node = stack.pop()
+            for next_id, next_node in node.parents.items():
+                if index[next_id] > lower_bound and next_id not in visited:
+                    visited.add(next_id)
+                    backward.append(next_node)
+                    stack.append(next_node)
+
+        # Reuse the same positions placing every backward node before the forward ones
+        affected = sorted(backward, key=lambda n: index[n.id]) + sorted(
+            forward, key=lambda n: index[n.id]
+        )
+        positions = sorted(index[node.id] for node in affected)
+        for node, position in zip(affected, positions):
+            index[node.id] = position
 
-        del self._nodes[node_id]
-        return node
+    def _nodes_removed(self, removed_nodes: List[SpamNode]) -> None:
+        """
+        Called once after removing nodes from the graph. Override it in subclasses
+        keeping derived indexes over the graph to update them.
+        """
+        pass
 
     def generate_unique_id(self) -> str:
         """This generates an unique id for this Graph"""
 
         self.nodes_id_generator += 1
-        while str(self.nodes_id_generator) in self._nodes.keys():
+        while str(self.nodes_id_generator) in self._nodes:
             self.nodes_id_generator += 1
         return str(self.nodes_id_generator)
 
     def get_all_paths(
-        self, node_start: str, node_end: str, maximum_depth: int = 20
-    ) -> List[List[str]]:
+        self, node_start: NodeId, node_end: NodeId, maximum_depth: int = 20
+    ) -> List[List[NodeId]]:
         """
         :param maximum_depth: how deep we want to go looking for possible paths
         :return: All the possible paths from node_start to node_end
@@ -162,47 +315,112 @@ class DAGraph(object):
                 )
             )
 
-        if node_start not in self._nodes.keys():
-            raise ValueError(
-                "Could not find the node with id: {} inside the graph".format(
-                    node_start
-                )
-            )
-
-        if node_end not in self._nodes.keys():
-            raise ValueError(
-                "Could not find the node with id: {} inside the graph".format(node_end)
-            )
-
-        paths = list()
-        visited = set()
+        return list(
+            self.iter_paths(node_start, node_end, maximum_depth=maximum_depth)
+        )
 
-        def _look_for_paths(
-            start: str, end: str, path: List[str], depth: int, graph: DAGraphType
-        ) -> None:
-            if depth > maximum_depth:
-                return
+    def iter_paths(
+        self,
+        node_start: NodeId,
+        node_end: NodeId,
+        limit: Optional[int] = None,
+        maximum_depth: Optional[int] = None,
+    ) -> Iterator[List[NodeId]]:
+        """
+        Lazily yield the paths from node_start to node_end, so callers can stop early.
+        Only nodes that can still reach node_end are visited and memory is bounded by
+        the length of the current path.
+        :param limit: stop after yielding this many paths
+        :param maximum_depth: maximum number of nodes in a path
+        """
+        self._check_path_ends(node_start, node_end)
+        return self._iter_paths(
+            self.freeze(), node_start, node_end, limit, maximum_depth
+        )
 
-            if start == end:
-                paths.append(path + [start])
-                return
+    @staticmethod
+    def _iter_paths(
+        frozen: FrozenDAGraph,
+        node_start: NodeId,
+        node_end: NodeId,
+        limit: Optional[int],
+        maximum_depth: Optional[int],
+    ) -> Iterator[List[NodeId]]:
+        if limit is not None and limit <= 0:
+            return
+
+        node_ids = frozen.node_ids
+        reaches_end = bytearray(frozen.num_nodes)
+        for idx in frozen.bfs([node_end], reverse=True):
+            reaches_end[idx] = 1
+
+        end_idx = frozen.index_of(node_end)
+        start_idx = frozen.index_of(node_start)
+        if not reaches_end[start_idx]:
+            return
+
+        offsets, indices = frozen.children_offsets, frozen.children_indices
+        path = [start_idx]
+        on_path = {start_idx}
+        pending_children = [iter(indices[offsets[start_idx] : offsets[start_idx + 1]])]
+        yielded = 0
+
+        while pending_children:
+            if path[-1] == end_idx:
+                yield [node_ids[idx] for idx in path]
+                yielded += 1
+                if limit is not None and yielded >= limit:
+                    return
+                child_idx = None
+            elif maximum_depth is not None and len(path) >= maximum_depth:
+                child_idx = None
+            else:
+                child_idx = next(
+                    (
+                        idx
+                        for idx in pending_children[-1]
+                        if reaches_end[idx] and idx not in on_path
+                    ),
+                    None,
+                )
 
-            visited.add(start)
-            path.append(start)
+            if child_idx is None:
+                pending_children.pop()
+                on_path.discard(path.pop())
+                continue
 
-            for child_id in graph._nodes[start].children:
-                if child_id not in visited:
-                    _look_for_paths(
-                        start=child_id, end=end, path=path, depth=depth + 1, graph=graph
-                    )
+            path.append(child_idx)
+            on_path.add(child_idx)
+            pending_children.append(
+                iter(indices[offsets[child_idx] : offsets[child_idx + 1]])
+            )
 
-            visited.remove(start)
-            path.remove(start)
+    def count_paths(self, node_start: NodeId, node_end: NodeId) -> int:
+        """
+        Number of different paths from node_start to node_end without listing them,
+        in O(N + E) over the topological order of the graph.
+        Raises a ValueError if the graph has circular references.
+        """
+        self._check_path_ends(node_start, node_end)
+
+        frozen = self.freeze()
+        offsets, indices = frozen.children_offsets, frozen.children_indices
+        end_idx = frozen.index_of(node_end)
+
+        paths_to_end = [0] * frozen.num_nodes
+        paths_to_end[end_idx] = 1
+        for idx in reversed(frozen.topological_order()):
+            if idx != end_idx:
+                paths_to_end[idx] = sum(
+                    paths_to_end[child_idx]
+                    for child_idx in indices[offsets[idx] : offsets[idx + 1]]
+                )
+        return paths_to_end[frozen.index_of(node_start)]
 
-        _look_for_paths(
-            start=node_start, end=node_end, path=list(), depth=1, graph=self
-        )
-        return paths
+    def _check_path_ends(self, node_start: NodeId, node_end: NodeId) -> None:
+        for node_id in (node_start, node_end):
+            if node_id not in self._nodes:
+                raise ValueError(PATH_NODE_NOT_FOUND.format(node_id))
 
     def sequential_order_of_execution(self) -> List[str]:
         """
@@ -261,6 +479,22 @@ class DAGraph(object):
 
         return result_nodes
 
+    def freeze(self) -> FrozenDAGraph:
+        """
+        Build a read-only snapshot of the current graph with integer node indices and
+        flat edge arrays, meant for heavy analyses over big graphs
+        """
+        return FrozenDAGraph(self)
+
+    def reachability(self) -> ReachabilityIndex:
+        """
+        Index with the descendants of every node as bitsets, built on demand
+        and reused until the graph changes
+        """
+        if self._reachability is None:
+            self._reachability = ReachabilityIndex(self.freeze())
+        return self._reachability
+
     def validate(self) -> GraphValidationErrors:
         """Execute the necessary validations over the graph and return the GraphValidationErrors"""
         return GraphValidator().validate(self)
@@ -0,0 +1,156 @@
+from array import array
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+NODE_NOT_IN_SNAPSHOT = "Node with ID = {} was not found in the graph snapshot"
+CYCLE_IN_SNAPSHOT = "The graph snapshot has circular references, no topological order exists"
+NO_TYPE_CODE = -1
+
+
+class FrozenDAGraph(object):
+    """
+    Read-only snapshot of a DAGraph in compressed sparse row (CSR) format.
+
+    Nodes are mapped to integer indices (insertion order of the graph) and edges are
+    stored in flat integer arrays:
+     - children_indices[children_offsets[i]:children_offsets[i + 1]] are the children of i
+     - parents_indices[parents_offsets[i]:parents_offsets[i + 1]] are the parents of i
+     - type_codes[i] is the index of the node type of i inside type_names
+
+    The snapshot does not follow later changes in the graph, create a new one with
+    DAGraph.freeze() after editing it.
+    """
+
+    def __init__(self, graph) -> None:
+        nodes = graph._nodes
+        self.node_ids: Tuple[Any, ...] = tuple(nodes)
+        self.node_index: Dict[Any, int] = {
+            node_id: idx for idx, node_id in enumerate(self.node_ids)
+        }
+
+        type_index: Dict[Any, int] = {}
+        self.type_codes = array("l")
+
+        self.children_offsets = array("l", [0])
+        self.children_indices = array("l")
+        self.parents_offsets = array("l", [0])
+        self.parents_indices = array("l")
+
+        node_index = self.node_index
+        for node in nodes.values():
+            code = type_index.setdefault(node.node_type, len(type_index))
+            self.type_codes.append(code)
+
+            self.children_indices.extend(node_index[c_id] for c_id in node.children)
+            self.children_offsets.append(len(self.children_indices))
+            self.parents_indices.extend(node_index[p_id] for p_id in node.parents)
+            self.parents_offsets.append(len(self.parents_indices))
+
+        self.type_names: Tuple[Any, ...] = tuple(type_index)
+
+    @property
+    def num_nodes(self) -> int:
+        return len(self.node_ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.children_indices)
+
+    def index_of(self, node_id: Any) -> int:
+        try:
+            return self.node_index[node_id]
+        except KeyError:
+            raise ValueError(NODE_NOT_IN_SNAPSHOT.format(node_id))
+
+    def type_code(self, node_type: Any) -> int:
+        """Return the code used in type_codes for node_type or NO_TYPE_CODE if missing"""
+        try:
+            return self.type_names.index(node_type)
+        except ValueError:
+            return NO_TYPE_CODE
+
+    def children_of(self, index: int) -> array:
+        return self.children_indices[
+            self.children_offsets[index] : self.children_offsets[index + 1]
+        ]
+
+    def parents_of(self, index: int) -> array:
+        return self.parents_indices[
+            self.parents_offsets[index] : self.parents_offsets[index + 1]
+        ]
+
+    def out_degrees(self) -> array:
+        offsets = self.children_offsets
+        return array("l", [offsets[i + 1] - offsets[i] for i in range(self.num_nodes)])
+
+    def in_degrees(self) -> array:
+        offsets = self.parents_offsets
+        return array("l", [offsets[i + 1] - offsets[i] for i in range(self.num_nodes)])
+
+    def bfs(self, sources: Iterable[Any], reverse: bool = False) -> List[int]:
+        """
+        Breadth first search from every node id in sources.
+        :param reverse: walk from children to parents instead
+        :return: indices of the reached nodes (sources included) in visiting order
+        """
+        if reverse:
+            offsets, indices = self.parents_offsets, self.parents_indices
+        else:
+            offsets, indices = self.children_offsets, self.children_indices
+
+        visited = bytearray(self.num_nodes)
+        result = []
+        queue = deque()
+        for node_id in sources:
+            idx = self.index_of(node_id)
+            if not visited[idx]:
+                visited[idx] = 1
+                queue.append(idx)
+
+        while queue:
+            idx = queue.popleft()
+            result.append(idx)
+            for next_idx in indices[offsets[idx] : offsets[idx + 1]]:
+                if not visited[next_idx]:
+                    visited[next_idx] = 1
+                    queue.append(next_idx)
+        return result
+
+    def topological_order(self) -> List[int]:
+        """
+        :return: indices of every node so parents are always before their children
+        """
+        offsets, indices = self.children_offsets, self.children_indices
+        pending_parents = self.in_degrees()
+        order = [idx for idx, degree in enumerate(pending_parents) if degree == 0]
+
+        position = 0
+        while position < len(order):
+            idx = order[position]
+            position += 1
+            for child_idx in indices[offsets[idx] : offsets[idx + 1]]:
+                pending_parents[child_idx] -= 1
+                if pending_parents[child_idx] == 0:
+                    order.append(child_idx)
+
+        if len(order) != self.num_nodes:
+            raise ValueError(CYCLE_IN_SNAPSHOT)
+        return order
+
+    def get_heads_id(self, node_type: Optional[Any] = None) -> List[Any]:
+        """Ids of nodes without parents, optionally only the ones of node_type"""
+        return self._ids_without(self.parents_offsets, node_type)
+
+    def get_tails_id(self, node_type: Optional[Any] = None) -> List[Any]:
+        """Ids of nodes without children, optionally only the ones of node_type"""
+        return self._ids_without(self.children_offsets, node_type)
+
+    def _ids_without(self, offsets: array, node_type: Optional[Any]) -> List[Any]:
+        type_codes = self.type_codes
+        code = None if node_type is None else self.type_code(node_type)
+        return [
+            node_id
+            for idx, node_id in enumerate(self.node_ids)
+            if offsets[idx] == offsets[idx + 1]
+            and (code is None or type_codes[idx] == code)
+        ]
@@ -0,0 +1,65 @@
+from typing import Any, Dict, List, Optional
+
+from spine_json_lib.graph.frozen_graph import FrozenDAGraph
+
+
+def popcount(bits: int) -> int:
+    return bin(bits).count("1")
+
+
+class ReachabilityIndex(object):
+    """
+    Descendants of every node of a graph stored as bitsets (python ints where
+    bit i is the node with index i in the graph snapshot).
+
+    It is computed in a single pass over the nodes in reverse topological order, so
+    questions like "does A reach B" or "how many IMAGE nodes hang from A" are
+    answered with a bitwise AND and a popcount instead of walking the graph.
+
+    The index is a snapshot, use DAGraph.reachability() to get one always up to date.
+    """
+
+    def __init__(self, frozen_graph: FrozenDAGraph) -> None:
+        self.frozen_graph = frozen_graph
+
+        descendants = [0] * frozen_graph.num_nodes
+        offsets = frozen_graph.children_offsets
+        indices = frozen_graph.children_indices
+        for idx in reversed(frozen_graph.topological_order()):
+            bits = 0
+            for child_idx in indices[offsets[idx] : offsets[idx + 1]]:
+                bits |= descendants[child_idx] | (1 << child_idx)
+            descendants[idx] = bits
+        self.descendants: List[int] = descendants
+
+        self.type_masks: Dict[Any, int] = {}
+        for idx, code in enumerate(frozen_graph.type_codes):
+            node_type = frozen_graph.type_names[code]
+            self.type_masks[node_type] = self.type_masks.get(node_type, 0) | (1 << idx)
+
+    def descendants_mask(self, node_id: Any, node_type: Optional[Any] = None) -> int:
+        bits = self.descendants[self.frozen_graph.index_of(node_id)]
+        if node_type is not None:
+            bits &= self.type_masks.get(node_type, 0)
+        return bits
+
+    def reaches(self, node_start: Any, node_end: Any) -> bool:
+        """True if there is a path from node_start to node_end"""
+        end_bit = 1 << self.frozen_graph.index_of(node_end)
+        return bool(self.descendants_mask(node_start) & end_bit)
+
+    def count_descendants(self, node_id: Any, node_type: Optional[Any] = None) -> int:
+        return popcount(self.descendants_mask(node_id, node_type))
+
+    def get_descendants_id(
+        self, node_id: Any, node_type: Optional[Any] = None
+    ) -> List[Any]:
+        """Ids of the nodes reachable from node_id, optionally only the ones of node_type"""
+        node_ids = self.frozen_graph.node_ids
+        bits = self.descendants_mask(node_id, node_type)
+        result = []
+        while bits:
+            lowest_bit = bits & -bits
+            result.append(node_ids[lowest_bit.bit_length() - 1])
+            bits ^= lowest_bit
+        return result
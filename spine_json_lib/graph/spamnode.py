@@ -1,4 +1,4 @@
-from typing import Union, Any, TypeVar
+from typing import Union, Any, TypeVar, FrozenSet
 
 DEFAULT_NODE_TYPE = 0
 CIRCULAR_PARENTSHIP_NODE_ERROR = "A node cannot be its own {}"
@@ -8,6 +8,8 @@ CHILD_TYPE_FORBIDDEN = "The type of the child is forbidden for this node"
 EXECUTED = "EXECUTED"
 PENDING = "PENDING"
 
+NO_FORBIDDEN_CHILD_TYPES: FrozenSet[Any] = frozenset()
+
 
 SpamNodeType = TypeVar("SpamNodeType", bound="SpamNode")
 
@@ -16,8 +18,23 @@ class SpamNode(object):
     """
     This is a node base class to be used in the Graph as the main data container
     By default a node can have N number of children and M number of parents (N>=0, M>=0)
+
+    Forbidden children types are kept as a frozenset, factories creating many nodes
+    of the same type should pass the same frozenset to share it between nodes.
     """
 
+    __slots__ = (
+        "_id",
+        "_data",
+        "_node_type",
+        "public_id",
+        "order",
+        "state",
+        "_child_types_forbidden",
+        "children",
+        "parents",
+    )
+
     def __init__(
         self,
         id_value,
@@ -36,8 +53,10 @@ class SpamNode(object):
         self.state = EXECUTED
 
         if children_types_forbidden is None:
-            children_types_forbidden = []
-        self._child_types_forbidden = children_types_forbidden[:]
+            children_types_forbidden = NO_FORBIDDEN_CHILD_TYPES
+        elif not isinstance(children_types_forbidden, frozenset):
+            children_types_forbidden = frozenset(children_types_forbidden)
+        self._child_types_forbidden = children_types_forbidden
 
         self.children = {}
         self.parents = {}
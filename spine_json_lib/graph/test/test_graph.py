@@ -1,3 +1,5 @@
+import random
+
 import pytest
 
 from spine_json_lib.graph.graph_validator import GraphErrorType
@@ -13,6 +15,8 @@ from spine_json_lib.graph.dagraph import (
     UNIQUE_ID_ERROR_MESSAGE,
     WRONG_NODE_ID_TYPE,
     ID_NODE_NOT_FOUND,
+    DUPLICATED_NODE_ID,
+    CIRCULAR_EDGE_ERROR,
 )
 from typing import Any
 from typing import Optional
@@ -154,6 +158,33 @@ class TestGraph:
             graph.remove_node_by_id(node_id=DEFAULT_ID)
         assert ID_NODE_NOT_FOUND.format(DEFAULT_ID) in str(excinfo.value)
 
+    @pytest.mark.parametrize(
+        "graph_data",
+        [
+            {
+                "nodes": ["1", "2", "3", "4"],
+                "edges": [("1", "2"), ("2", "3"), ("1", "3"), ("3", "4")],
+            }
+        ],
+    )
+    def test_graph_remove_nodes(self, test_graph):
+        # Nothing is removed if any id is not valid
+        with pytest.raises(ValueError) as excinfo:
+            test_graph.remove_nodes(["2", "wrong_id"])
+        assert ID_NODE_NOT_FOUND.format("wrong_id") in str(excinfo.value)
+        assert test_graph.get_node("2") is not None
+
+        with pytest.raises(ValueError) as excinfo:
+            test_graph.remove_nodes(["2", "2"])
+        assert DUPLICATED_NODE_ID.format("2") in str(excinfo.value)
+        assert test_graph.get_node("2") is not None
+
+        removed = test_graph.remove_nodes(["3", "2"])
+        assert [node.id for node in removed] == ["3", "2"]
+        assert test_graph.get_node("2") is None and test_graph.get_node("3") is None
+        assert not test_graph.get_node("1").children
+        assert not test_graph.get_node("4").parents
+
     def test_graph_multi_graphs(self, node_factory):
         graph1 = DAGraph(node_factory)
         graph2 = DAGraph(node_factory)
@@ -350,3 +381,150 @@ class TestGraph:
 
         with pytest.raises(TypeError):
             DAGraph.create_from_json_file(object, "PATH", node_factory)
+
+    @pytest.mark.parametrize(
+        "graph_data",
+        [
+            {
+                "nodes": ["1", "2", "3", "4", "5"],
+                "edges": [("1", "2"), ("1", "3"), ("2", "4"), ("3", "4"), ("5", "4")],
+                "types": {"4": NODE_TYPE_BROWN, "5": NODE_TYPE_BROWN},
+            }
+        ],
+    )
+    def test_graph_freeze(self, test_graph):
+        frozen = test_graph.freeze()
+        assert frozen.num_nodes == 5 and frozen.num_edges == 5
+
+        index = frozen.index_of
+        assert list(frozen.out_degrees()) == [2, 1, 1, 0, 1]
+        assert list(frozen.in_degrees()) == [0, 1, 1, 3, 0]
+        assert sorted(frozen.children_of(index("1"))) == [index("2"), index("3")]
+
+        order = frozen.topological_order()
+        position = {idx: pos for pos, idx in enumerate(order)}
+        for child_idx, parent_idx in [(index("4"), index("2")), (index("2"), index("1"))]:
+            assert position[parent_idx] < position[child_idx]
+
+        reached = frozen.bfs(["2"])
+        assert [frozen.node_ids[idx] for idx in reached] == ["2", "4"]
+        reached = frozen.bfs(["4"], reverse=True)
+        assert sorted(frozen.node_ids[idx] for idx in reached) == ["1", "2", "3", "4", "5"]
+
+        assert frozen.get_heads_id() == ["1", "5"]
+        assert frozen.get_heads_id(node_type=NODE_TYPE_BROWN) == ["5"]
+        assert frozen.get_tails_id(node_type=NODE_TYPE_BLACK) == []
+
+        # Snapshots are not affected by later changes in the graph
+        test_graph.add_edge(parent_id="4", child_id="1")
+        assert frozen.num_edges == 5
+        with pytest.raises(ValueError):
+            test_graph.freeze().topological_order()
+
+    def test_graph_cycle_detection(self):
+        graph = DAGraph(detect_cycles=True)
+        for node_id in ["1", "2", "3", "4"]:
+            graph.add_node(node_id=node_id)
+        graph.add_edges([("3", "4"), ("2", "3"), ("1", "2")])
+
+        with pytest.raises(ValueError) as excinfo:
+            graph.add_edge(parent_id="4", child_id="1")
+        assert CIRCULAR_EDGE_ERROR.format("4", "1") in str(excinfo.value)
+        # The rejected edge is not added
+        assert not graph.get_node("4").children
+
+        graph.remove_edge(parent_id="2", child_id="3")
+        graph.add_edge(parent_id="4", child_id="1")
+
+    def test_graph_cycle_detection_random_edges(self):
+        rand = random.Random(17)
+        graph = DAGraph()
+        graph.enable_cycle_detection()
+        nodes_ids = [str(idx) for idx in range(60)]
+        for node_id in nodes_ids:
+            graph.add_node(node_id=node_id)
+
+        for _ in range(600):
+            parent_id, child_id = rand.sample(nodes_ids, 2)
+            try:
+                graph.add_edge(parent_id=parent_id, child_id=child_id)
+            except ValueError:
+                # Rejected edges are the ones where child already reaches parent
+                frozen = graph.freeze()
+                reached = [frozen.node_ids[idx] for idx in frozen.bfs([child_id])]
+                assert parent_id in reached
+
+        errors = graph.validate().errors
+        assert all(GraphErrorType.CIRCULAR_REFS.name not in error for error in errors)
+        index = graph._topological_index
+        for node_id in nodes_ids:
+            for child_id in graph.get_node(node_id).children:
+                assert index[node_id] < index[child_id]
+
+    def test_graph_enable_cycle_detection_with_cycles(self):
+        graph = DAGraph()
+        graph.add_node(node_id="1")
+        graph.add_node(node_id="2")
+        graph.add_edges([("1", "2"), ("2", "1")])
+        with pytest.raises(ValueError):
+            graph.enable_cycle_detection()
+
+    @pytest.mark.parametrize(
+        "graph_data",
+        [
+            {
+                "nodes": ["1", "2", "3", "4", "5"],
+                "edges": [("1", "2"), ("2", "3"), ("2", "4"), ("5", "4")],
+                "types": {"3": NODE_TYPE_BROWN, "4": NODE_TYPE_BROWN},
+            }
+        ],
+    )
+    def test_graph_reachability(self, test_graph):
+        reachability = test_graph.reachability()
+        assert reachability.reaches("1", "4")
+        assert not reachability.reaches("5", "3")
+        assert not reachability.reaches("4", "1")
+        assert sorted(reachability.get_descendants_id("1")) == ["2", "3", "4"]
+        assert reachability.count_descendants("1", node_type=NODE_TYPE_BROWN) == 2
+        assert reachability.get_descendants_id("5", node_type=NODE_TYPE_BROWN) == ["4"]
+
+        # Cached until the graph changes
+        assert test_graph.reachability() is reachability
+        test_graph.add_edge(parent_id="5", child_id="3")
+        assert test_graph.reachability() is not reachability
+        assert test_graph.reachability().reaches("5", "3")
+
+    def test_graph_count_and_iter_paths(self):
+        # Chain of 12 diamonds: 2^12 different paths from the first to the last node
+        graph = DAGraph()
+        graph.add_node(node_id="0")
+        for i in range(12):
+            for node_id in ("{}a".format(i), "{}b".format(i), str(i + 1)):
+                graph.add_node(node_id=node_id)
+            graph.add_edges(
+                [
+                    (str(i), "{}a".format(i)),
+                    (str(i), "{}b".format(i)),
+                    ("{}a".format(i), str(i + 1)),
+                    ("{}b".format(i), str(i + 1)),
+                ]
+            )
+
+        assert graph.count_paths("0", "12") == 2 ** 12
+        assert graph.count_paths("12", "0") == 0
+        assert graph.count_paths("3", "3") == 1
+
+        first_paths = list(graph.iter_paths("0", "12", limit=3))
+        assert len(first_paths) == 3
+        assert len(set(map(tuple, first_paths))) == 3
+        assert all(path[0] == "0" and path[-1] == "12" for path in first_paths)
+
+        assert len(list(graph.iter_paths("0", "2"))) == graph.count_paths("0", "2")
+        assert list(graph.iter_paths("0", "2", maximum_depth=4)) == []
+        assert len(list(graph.iter_paths("0", "2", maximum_depth=5))) == 4
+
+        with pytest.raises(ValueError):
+            graph.count_paths("0", "missing")
+        # Unknown ids are reported on the call, not when iterating
+        with pytest.raises(ValueError):
+            graph.iter_paths("missing", "12")
@@ -0,0 +1,307 @@
+import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from spine_json_lib.data.data_types.skin import PATH_TYPE
+
+INDEX_VERSION = 2
+SKELETON_EXTENSION = ".json"
+IMAGES_EXTENSIONS = (".png",)
+
+# (skin, slot, attachment) using an image
+ImageUsage = Tuple[str, str, str]
+
+
+def get_skeleton_images(json_data: Dict[str, Any]) -> Dict[str, List[ImageUsage]]:
+    """
+    Images used by the skins of a spine json, read straight from the json data.
+    Image ids are the same keys of SpineAnimationEditor.images_references.
+    :return: {image_id: [(skin, slot, attachment), ...]}
+    """
+    skins = json_data.get("skins", [])
+    # Spine 3.8 skins are a list, previous versions use a dict by skin name
+    if isinstance(skins, list):
+        skins = {skin.get("name", ""): skin.get("attachments", {}) for skin in skins}
+
+    images: Dict[str, List[ImageUsage]] = {}
+    for skin_name, skin_attachments in skins.items():
+        for slot_id, slot_attachments in skin_attachments.items():
+            for attachment_id, attachment in slot_attachments.items():
+                if attachment.get("type") == PATH_TYPE:
+                    continue
+                image_id = (
+                    attachment.get("path") or attachment.get("name") or attachment_id
+                )
+                images.setdefault(image_id, []).append(
+                    (skin_name, slot_id, attachment_id)
+                )
+    return images
+
+
+def read_skeleton_images(json_path: str) -> Optional[Dict[str, List[ImageUsage]]]:
+    """Images used in a spine json file or None if the file is not a spine json"""
+    return _read_skeleton_file(json_path)[0]
+
+
+def _read_skeleton_file(
+    json_path: str,
+) -> Tuple[Optional[Dict[str, List[ImageUsage]]], Optional[str]]:
+    """Images used in a spine json file and its skeleton.images folder, if any"""
+    try:
+        with open(json_path) as f:
+            json_data = json.load(f)
+    except (ValueError, UnicodeDecodeError):
+        return None, None
+
+    if not isinstance(json_data, dict) or "spine" not in json_data.get("skeleton", {}):
+        return None, None
+    return get_skeleton_images(json_data), json_data["skeleton"].get("images") or None
+
+
+class ImageUsageIndex(object):
+    """
+    Index of the images used by every spine json in a directory (recursively), by
+    file, skin, slot and attachment, so questions about images shared by several
+    skeletons are answered without loading them:
+    - get_unused_images(images_folder): images in a folder not used by any skeleton,
+      found in the skeleton.images folder of each skeleton
+    - get_images_only_used_by_skin(skin): images only used by skins with that name
+
+    update() only reads again the files added or modified (by size and modification
+    time) since the last update and the index can be saved to a json file and
+    loaded back to be updated later.
+    """
+
+    def __init__(self, root: str) -> None:
+        self.root = root
+        # {relative path: {"mtime_ns", "size", "images": {image_id: usages} or None,
+        #                  "images_path": skeleton.images or None}}
+        self.files: Dict[str, Dict[str, Any]] = {}
+        # Reverse index {image_id: {relative path: usages}}
+        self._images: Dict[str, Dict[str, List[ImageUsage]]] = {}
+        # Usages of every image by skin name in all the files {image_id: Counter}
+        self._images_skins: Dict[str, Counter] = {}
+        # Images used by a single skin name {skin name: {image_id, ...}}
+        self._skins_only_images: Dict[str, Set[str]] = {}
+
+    @staticmethod
+    def from_directory(root: str, workers: int = 1) -> "ImageUsageIndex":
+        index = ImageUsageIndex(root=root)
+        index.update(workers=workers)
+        return index
+
+    @staticmethod
+    def load(index_json: str) -> "ImageUsageIndex":
+        with open(index_json) as f:
+            index_data = json.load(f)
+
+        if index_data.get("version") != INDEX_VERSION:
+            raise ValueError(
+                "Image usage index {} has version {} but {} was expected".format(
+                    index_json, index_data.get("version"), INDEX_VERSION
+                )
+            )
+
+        index = ImageUsageIndex(root=index_data["root"])
+        for file_path, file_data in index_data["files"].items():
+            images = file_data["images"]
+            if images is not None:
+                images = {
+                    image_id: [tuple(usage) for usage in usages]
+                    for image_id, usages in images.items()
+                }
+            index._set_file(
+                file_path,
+                file_data["mtime_ns"],
+                file_data["size"],
+                images,
+                file_data["images_path"],
+            )
+        return index
+
+    def save(self, index_json: str) -> None:
+        base_dir = os.path.dirname(index_json)
+        if base_dir and not os.path.isdir(base_dir):
+            os.makedirs(base_dir)
+
+        with open(index_json, "w") as outfile:
+            json.dump(
+                {"version": INDEX_VERSION, "root": self.root, "files": self.files},
+                outfile,
+                separators=(",", ":"),
+            )
+
+    def update(self, workers: int = 1) -> List[str]:
+        """
+        Index again the spine json files added or modified since the last update and
+        forget the ones removed.
+        :param workers: number of processes reading the files in parallel
+        :return: relative paths of the files indexed again
+        """
+        stats = {}
+        for dir_path, _, file_names in os.walk(self.root):
+            for file_name in file_names:
+                if not file_name.endswith(SKELETON_EXTENSION):
+                    continue
+                full_path = os.path.join(dir_path, file_name)
+                file_stat = os.stat(full_path)
+                relative_path = os.path.relpath(full_path, self.root).replace(
+                    os.sep, "/"
+                )
+                stats[relative_path] = (file_stat.st_mtime_ns, file_stat.st_size)
+
+        for file_path in [path for path in self.files if path not in stats]:
+            self._remove_file(file_path)
+
+        changed_files = sorted(
+            file_path
+            for file_path, (mtime_ns, size) in stats.items()
+            if file_path not in self.files
+            or self.files[file_path]["mtime_ns"] != mtime_ns
+            or self.files[file_path]["size"] != size
+        )
+        full_paths = [os.path.join(self.root, path) for path in changed_files]
+        if workers <= 1 or len(full_paths) <= 1:
+            files_images = [_read_skeleton_file(path) for path in full_paths]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                files_images = list(executor.map(_read_skeleton_file, full_paths))
+
+        for file_path, (images, images_path) in zip(changed_files, files_images):
+            mtime_ns, size = stats[file_path]
+            self._set_file(file_path, mtime_ns, size, images, images_path)
+        return changed_files
+
+    def get_skeletons(self) -> List[str]:
+        """Relative paths of the spine json files indexed"""
+        return sorted(
+            file_path
+            for file_path, file_data in self.files.items()
+            if file_data["images"] is not None
+        )
+
+    def get_used_images(self) -> FrozenSet[str]:
+        return frozenset(self._images)
+
+    def get_image_usages(self, image_id: str) -> Dict[str, List[ImageUsage]]:
+        """Skins, slots and attachments using an image by skeleton relative path"""
+        return dict(self._images.get(image_id, {}))
+
+    def get_unused_images(
+        self, images_folder: str, extensions: Iterable[str] = IMAGES_EXTENSIONS
+    ) -> List[str]:
+        """
+        Ids of the images inside images_folder not used by any skeleton. The images of
+        a skeleton are looked for in its skeleton.images folder, relative to the json
+        file, or directly inside images_folder if the skeleton doesn't set one.
+        """
+        images_folder = os.path.abspath(images_folder)
+        used_ids = set()
+        used_paths = set()
+        for file_path, file_data in self.files.items():
+            images = file_data["images"] or {}
+            images_dir = self._get_images_dir(file_path)
+            if images_dir is None:
+                used_ids.update(images)
+            else:
+                used_paths.update(
+                    os.path.normpath(os.path.join(images_dir, image_id))
+                    for image_id in images
+                )
+
+        return sorted(
+            image_id
+            for image_id in list_images(images_folder, extensions)
+            if image_id not in used_ids
+            and os.path.normpath(os.path.join(images_folder, image_id))
+            not in used_paths
+        )
+
+    def _get_images_dir(self, file_path: str) -> Optional[str]:
+        """Absolute skeleton.images folder of an indexed file or None if not set"""
+        images_path = self.files[file_path]["images_path"]
+        if images_path is None:
+            return None
+        return os.path.abspath(
+            os.path.join(self.root, os.path.dirname(file_path), images_path)
+        )
+
+    def get_images_only_used_by_skin(self, skin_name: str) -> List[str]:
+        """Ids of the images only used by skins named skin_name in any skeleton"""
+        return sorted(self._skins_only_images.get(skin_name, ()))
+
+    def _set_file(
+        self,
+        file_path: str,
+        mtime_ns: int,
+        size: int,
+        images: Optional[Dict[str, List[ImageUsage]]],
+        images_path: Optional[str] = None,
+    ) -> None:
+        self._remove_file(file_path)
+        self.files[file_path] = {
+            "mtime_ns": mtime_ns,
+            "size": size,
+            "images": images,
+            "images_path": images_path,
+        }
+        for image_id, usages in (images or {}).items():
+            self._images.setdefault(image_id, {})[file_path] = usages
+            self._update_image_skins(image_id, usages, 1)
+
+    def _remove_file(self, file_path: str) -> None:
+        file_data = self.files.pop(file_path, None)
+        if file_data is None:
+            return
+
+        for image_id, usages in (file_data["images"] or {}).items():
+            files_usages = self._images[image_id]
+            del files_usages[file_path]
+            if not files_usages:
+                del self._images[image_id]
+            self._update_image_skins(image_id, usages, -1)
+
+    def _update_image_skins(
+        self, image_id: str, usages: List[ImageUsage], increment: int
+    ) -> None:
+        """Add (or remove with increment -1) usages of an image to its skins"""
+        image_skins = self._images_skins.setdefault(image_id, Counter())
+        if len(image_skins) == 1:
+            (skin_name,) = image_skins
+            self._skins_only_images[skin_name].discard(image_id)
+            if not self._skins_only_images[skin_name]:
+                del self._skins_only_images[skin_name]
+
+        for usage in usages:
+            image_skins[usage[0]] += increment
+            if not image_skins[usage[0]]:
+                del image_skins[usage[0]]
+
+        if not image_skins:
+            del self._images_skins[image_id]
+        elif len(image_skins) == 1:
+            (skin_name,) = image_skins
+            self._skins_only_images.setdefault(skin_name, set()).add(image_id)
+
+
+def list_images(
+    images_folder: str, extensions: Iterable[str] = IMAGES_EXTENSIONS
+) -> List[str]:
+    """
+    Ids of the images inside images_folder (recursively): their path relative to the
+    folder without extension, as spine names them
+    """
+    extensions = tuple(extensions)
+    images = []
+    for dir_path, _, file_names in os.walk(images_folder):
+        for file_name in file_names:
+            image_id, extension = os.path.splitext(file_name)
+            if extension.lower() not in extensions:
+                continue
+            relative_dir = os.path.relpath(dir_path, images_folder)
+            if relative_dir != os.curdir:
+                image_id = os.path.join(relative_dir, image_id)
+            images.append(image_id.replace(os.sep, "/"))
+    return images
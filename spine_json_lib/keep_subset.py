@@ -0,0 +1,165 @@
+from collections import namedtuple
+from typing import FrozenSet, Iterable, Optional, Set
+
+from spine_json_lib.data.data_types.draworder import DrawOrderRemap
+from spine_json_lib.data.spine_anim_data import SpineAnimationData
+from spine_json_lib.deserializer.spine_nodes import SpineGraphParser
+
+# What keeping a subset of the animations and skins removed:
+# - slots: slot ids removed
+# - attachments: attachment ids removed from every skin kept
+# - images: ids of the images not used anymore, to remove from the images references
+KeptSubset = namedtuple("KeptSubset", "slots attachments images")
+
+
+def keep_subset(
+    anim_data: SpineAnimationData,
+    animations: Optional[Iterable[str]] = None,
+    skins: Optional[Iterable[str]] = None,
+    clean: bool = True,
+) -> KeptSubset:
+    """
+    Keep only the animations and skins given (None keeps all of them) building the
+    minimal skeleton they need. The result is the same as erasing the rest of skins and
+    animations and cleaning the animation, but the discarded animations are never
+    visited and the slots, attachments, deforms and images are found walking only
+    the animations and skins kept, editing each of them once.
+    :param clean: False only discards the animations and skins, as the safe mode of
+        the erase methods
+    """
+    if animations is not None:
+        kept_animations = frozenset(animations)
+        anim_data.animations = {
+            animation_id: animation
+            for animation_id, animation in anim_data.animations.items()
+            if animation_id in kept_animations
+        }
+
+    slot_names = frozenset(slot.name for slot in anim_data.slots)
+    skins_images = set()
+    if skins is not None:
+        kept_skins = frozenset(skins)
+        images, attachments_images = anim_data.remove_skins(
+            [skin.name for skin in anim_data.skins if skin.name not in kept_skins]
+        )
+        # As erase_skins, only the images named by the skins removed are dropped
+        skins_images.update(images)
+        for slot_images in attachments_images.values():
+            for attachment_images in slot_images.values():
+                skins_images.update(attachment_images.values())
+    images_before = _get_used_images(anim_data, slot_names)
+    skins_images -= images_before
+    skins_images.discard(None)
+
+    if not clean:
+        return KeptSubset(slots=[], attachments=frozenset(), images=skins_images)
+
+    (
+        invisible_slots,
+        attachments_to_remove,
+    ) = anim_data.get_unused_slots_and_attachments()
+    slots_to_remove = set(invisible_slots) | _get_slots_without_attachments(
+        anim_data, attachments_to_remove
+    )
+
+    _keep_skins_entries(anim_data, slots_to_remove, attachments_to_remove)
+    _keep_animations_entries(anim_data, slots_to_remove, attachments_to_remove)
+    _keep_slots(anim_data, slots_to_remove, attachments_to_remove)
+
+    return KeptSubset(
+        slots=list(slots_to_remove),
+        attachments=attachments_to_remove,
+        images=skins_images | images_before - _get_used_images(anim_data, slot_names),
+    )
+
+
+def _get_used_images(
+    anim_data: SpineAnimationData, slot_names: FrozenSet[str]
+) -> Set[str]:
+    """Images used by the skin attachments of the slots of the skeleton"""
+    images = set()
+    for skin in anim_data.skins:
+        for slot_id, slot_attachments in skin.attachments.items():
+            if slot_id not in slot_names:
+                continue
+            for attachment_id, attachment in slot_attachments.items():
+                _, image_graph_id = SpineGraphParser.skin_attachment_ids(
+                    attachment_id, attachment
+                )
+                images.add(image_graph_id[1])
+    return images
+
+
+def _get_slots_without_attachments(
+    anim_data: SpineAnimationData, attachments_to_remove: FrozenSet[str]
+) -> Set[str]:
+    """Slots left without attachments in every skin"""
+    slots_with_attachments = set()
+    for skin in anim_data.skins:
+        for slot_id, slot_attachments in skin.attachments.items():
+            if not attachments_to_remove.issuperset(slot_attachments):
+                slots_with_attachments.add(slot_id)
+    return {
+        slot.name
+        for slot in anim_data.slots
+        if slot.name not in slots_with_attachments
+    }
+
+
+def _keep_skins_entries(
+    anim_data: SpineAnimationData,
+    slots_to_remove: Set[str],
+    attachments_to_remove: FrozenSet[str],
+) -> None:
+    for skin in anim_data.skins:
+        skin.attachments = {
+            slot_id: {
+                attachment_id: attachment
+                for attachment_id, attachment in slot_attachments.items()
+                if attachment_id not in attachments_to_remove
+            }
+            for slot_id, slot_attachments in skin.attachments.items()
+            if slot_id not in slots_to_remove
+        }
+
+
+def _keep_animations_entries(
+    anim_data: SpineAnimationData,
+    slots_to_remove: Set[str],
+    attachments_to_remove: FrozenSet[str],
+) -> None:
+    remap = DrawOrderRemap([slot.name for slot in anim_data.slots], slots_to_remove)
+    skin_names = frozenset(skin.name for skin in anim_data.skins)
+    for animation in anim_data.animations.values():
+        animation.slots = {
+            slot_id: slot_timeline
+            for slot_id, slot_timeline in animation.slots.items()
+            if slot_id not in slots_to_remove
+        }
+        # Deforms of attachments removed are only dropped in the skins kept
+        animation.deform = {
+            skin_id: {
+                slot_id: {
+                    attachment_id: keyframes
+                    for attachment_id, keyframes in slot_deform.items()
+                    if skin_id not in skin_names
+                    or attachment_id not in attachments_to_remove
+                }
+                for slot_id, slot_deform in skin_deform.items()
+                if slot_id not in slots_to_remove
+            }
+            for skin_id, skin_deform in animation.deform.items()
+        }
+        animation.remap_draw_order(remap)
+
+
+def _keep_slots(
+    anim_data: SpineAnimationData,
+    slots_to_remove: Set[str],
+    attachments_to_remove: FrozenSet[str],
+) -> None:
+    slots = [slot for slot in anim_data.slots if slot.name not in slots_to_remove]
+    for slot in slots:
+        if slot.attachment is not None and slot.attachment in attachments_to_remove:
+            slot.attachment = None
+    anim_data.slots = slots
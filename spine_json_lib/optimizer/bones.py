@@ -0,0 +1,94 @@
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Set
+
+from spine_json_lib.data.data_types.vertices import (
+    decode_weighted_vertices,
+    encode_weighted_vertices,
+    is_weighted,
+)
+from spine_json_lib.data.spine_anim_data import SpineAnimationData
+
+
+def iter_weighted_attachments(data: SpineAnimationData) -> Iterator[Any]:
+    """Attachments of the skins with weighted vertices"""
+    for skin in data.skins:
+        for slot_attachments in skin.attachments.values():
+            for attachment in slot_attachments.values():
+                if is_weighted(attachment):
+                    yield attachment
+
+
+def get_referenced_bones(data: SpineAnimationData) -> Set[str]:
+    """
+    Bones used by slots, constraints, animations or the weights of the vertices of
+    any attachment. Bones referenced only as parents are not included.
+    """
+    referenced = {slot.bone for slot in data.slots}
+    for constraint in list(data.ik) + list(data.transform) + list(data.path):
+        referenced.update(constraint.bones or ())
+    # Path constraints target slots instead of bones
+    referenced.update(constraint.target for constraint in data.ik)
+    referenced.update(constraint.target for constraint in data.transform)
+    for animation in data.animations.values():
+        referenced.update(animation.bones)
+
+    for attachment in iter_weighted_attachments(data):
+        referenced.update(
+            data.bones[int(influence[0])].name
+            for influences in decode_weighted_vertices(attachment.vertices)
+            for influence in influences
+        )
+    return referenced
+
+
+def remove_unreferenced_bones(data: SpineAnimationData) -> List[str]:
+    """
+    Remove recursively the bones without children that nothing references, the root
+    bone is always kept, and update the bone indexes of the weighted vertices.
+    :return: names of the bones removed
+    """
+    referenced = get_referenced_bones(data)
+    children = Counter(bone.parent for bone in data.bones)
+    bones_by_name = {bone.name: bone for bone in data.bones}
+
+    removed: Set[str] = set()
+    pending = [
+        bone
+        for bone in data.bones
+        if bone.parent is not None
+        and bone.name not in referenced
+        and not children[bone.name]
+    ]
+    while pending:
+        bone = pending.pop()
+        removed.add(bone.name)
+        parent = bones_by_name[bone.parent]
+        children[parent.name] -= 1
+        if (
+            parent.parent is not None
+            and parent.name not in referenced
+            and not children[parent.name]
+        ):
+            pending.append(parent)
+
+    if not removed:
+        return []
+
+    new_indexes: Dict[int, int] = {}
+    bones = []
+    for index, bone in enumerate(data.bones):
+        if bone.name not in removed:
+            new_indexes[index] = len(bones)
+            bones.append(bone)
+
+    for attachment in iter_weighted_attachments(data):
+        attachment.vertices = encode_weighted_vertices(
+            [
+                (new_indexes[int(bone_index)], x, y, weight)
+                for bone_index, x, y, weight in influences
+            ]
+            for influences in decode_weighted_vertices(attachment.vertices)
+        )
+
+    data.bones = bones
+    return [bone.name for bone in bones_by_name.values() if bone.name in removed]
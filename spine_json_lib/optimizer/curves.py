@@ -0,0 +1,159 @@
+from typing import Any, Optional, Sequence, Tuple
+
+STEPPED_CURVE = "stepped"
+
+# Iterations of the bisection solving the time of a bezier curve, the error is 2^-n
+BEZIER_ITERATIONS = 24
+
+# (cx1, cy1, cx2, cy2) control points of a bezier curve from (0, 0) to (1, 1)
+BezierCurve = Tuple[float, float, float, float]
+
+
+def get_bezier_curve(keyframe: Any) -> Optional[BezierCurve]:
+    """
+    Control points of the bezier curve going from keyframe to the next one, None if
+    the curve is linear or stepped. Spine 3.8 stores them as curve, c2, c3 and c4,
+    older versions as a list of 4 values in curve.
+    """
+    curve = keyframe.curve
+    if isinstance(curve, (int, float)) and not isinstance(curve, bool):
+        return (
+            float(curve),
+            _float_or(keyframe.c2, 0.0),
+            _float_or(keyframe.c3, 1.0),
+            _float_or(keyframe.c4, 1.0),
+        )
+    if isinstance(curve, (list, tuple)) and len(curve) == 4:
+        return tuple(float(value) for value in curve)
+    return None
+
+
+def is_stepped(keyframe: Any) -> bool:
+    return keyframe.curve == STEPPED_CURVE
+
+
+def is_linear(keyframe: Any) -> bool:
+    return not is_stepped(keyframe) and get_bezier_curve(keyframe) is None
+
+
+def bezier_parameter(curve: BezierCurve, fraction: float) -> float:
+    """Parameter of the bezier curve where its time coordinate is fraction"""
+    cx1, _, cx2, _ = curve
+    low, high = 0.0, 1.0
+    for _ in range(BEZIER_ITERATIONS):
+        s = (low + high) / 2
+        if _bezier_coordinate(cx1, cx2, s) < fraction:
+            low = s
+        else:
+            high = s
+    return (low + high) / 2
+
+
+def bezier_percent(curve: BezierCurve, fraction: float) -> float:
+    """Value of the bezier curve for a fraction of the time between both keyframes"""
+    _, cy1, _, cy2 = curve
+    return _bezier_coordinate(cy1, cy2, bezier_parameter(curve, fraction))
+
+
+def curve_percent(keyframe: Any, fraction: float) -> float:
+    """
+    Percentage of the change between keyframe and the next one applied after a
+    fraction (0 to 1) of the time between them
+    """
+    if is_stepped(keyframe):
+        return 1.0 if fraction >= 1.0 else 0.0
+    curve = get_bezier_curve(keyframe)
+    if curve is None:
+        return fraction
+    return bezier_percent(curve, fraction)
+
+
+def curve_percent_range(
+    keyframe: Any, fraction_from: float, fraction_to: float
+) -> Tuple[float, float]:
+    """
+    Minimum and maximum percentages of the change between keyframe and the next one
+    applied between two fractions of the time between them. Bezier curves are bound
+    by the control points of the piece of curve between both fractions, the range is
+    wider than the exact one but the difference shrinks with the fractions distance.
+    """
+    if is_stepped(keyframe):
+        return 0.0, 1.0 if fraction_to >= 1.0 else 0.0
+    curve = get_bezier_curve(keyframe)
+    if curve is None:
+        return fraction_from, fraction_to
+
+    # Parameters widened by the error of the bisection
+    error = 2.0 ** -BEZIER_ITERATIONS
+    s_from = max(bezier_parameter(curve, fraction_from) - error, 0.0)
+    s_to = min(bezier_parameter(curve, fraction_to) + error, 1.0)
+    control_points = (0.0, curve[1], curve[3], 1.0)
+    piece = [
+        _blossom(control_points, parameters)
+        for parameters in (
+            (s_from, s_from, s_from),
+            (s_from, s_from, s_to),
+            (s_from, s_to, s_to),
+            (s_to, s_to, s_to),
+        )
+    ]
+    return min(piece), max(piece)
+
+
+def wrap_angle(angle: float) -> float:
+    """Angle in degrees equivalent to angle in the range [-180, 180]"""
+    return angle - 360.0 * round(angle / 360.0)
+
+
+def interpolate(
+    values_from: Sequence[float],
+    values_to: Sequence[float],
+    percent: float,
+    angles: bool = False,
+) -> Tuple[float, ...]:
+    """
+    Values between two keyframes, angles are rotated by the shortest way as the
+    spine runtime does
+    """
+    if angles:
+        return tuple(
+            value_from + wrap_angle(value_to - value_from) * percent
+            for value_from, value_to in zip(values_from, values_to)
+        )
+    return tuple(
+        value_from + (value_to - value_from) * percent
+        for value_from, value_to in zip(values_from, values_to)
+    )
+
+
+def values_distance(
+    values_a: Sequence[float], values_b: Sequence[float], angles: bool = False
+) -> float:
+    """Maximum absolute difference between the channels of two sets of values"""
+    if angles:
+        return max(
+            (abs(wrap_angle(a - b)) for a, b in zip(values_a, values_b)), default=0.0
+        )
+    return max((abs(a - b) for a, b in zip(values_a, values_b)), default=0.0)
+
+
+def _bezier_coordinate(c1: float, c2: float, s: float) -> float:
+    # Cubic bezier from 0 to 1 with control points c1 and c2
+    inverse = 1 - s
+    return 3 * inverse * inverse * s * c1 + 3 * inverse * s * s * c2 + s * s * s
+
+
+def _blossom(control_points: Sequence[float], parameters: Sequence[float]) -> float:
+    # De Casteljau with a different parameter on every step, with the parameters of
+    # the ends of a piece gives the control points of that piece of the curve
+    points = list(control_points)
+    for parameter in parameters:
+        points = [
+            point + (next_point - point) * parameter
+            for point, next_point in zip(points, points[1:])
+        ]
+    return points[0]
+
+
+def _float_or(value: Any, default: float) -> float:
+    return default if value is None else float(value)
@@ -0,0 +1,152 @@
+from collections import namedtuple
+from typing import Iterable, List, Tuple
+
+from spine_json_lib.data.data_types.animation import Animation
+from spine_json_lib.data.data_types.deform import Deform
+from spine_json_lib.optimizer.timelines import (
+    DeformCodec,
+    get_time,
+    iter_keyframe_lists,
+)
+
+# Result of sparsifying the deform timelines of animations:
+# - keyframes_trimmed: keyframes whose vertices changed to skip zeros with offset
+# - keyframes_removed: keyframes equal to the setup mesh between two equal ones
+# - timelines_removed: timelines equal to the setup mesh in all their keyframes
+# - vertices_removed: vertex values no longer stored (nor interpolated)
+# - bytes_saved: bytes of the vertices and offsets no longer written in compact json
+DeformReport = namedtuple(
+    "DeformReport",
+    "keyframes_trimmed keyframes_removed timelines_removed vertices_removed "
+    "bytes_saved",
+)
+
+
+def sparsify_deform_keyframes(keyframes: List[Deform]) -> Tuple[List[Deform], int]:
+    """
+    Store in every keyframe only the vertices between the first and the last not 0
+    using offset and drop the keyframes equal to the setup mesh (all vertices 0)
+    whose neighbours are also equal to it, so nothing changes while interpolating.
+    :return: keyframes kept and number of keyframes trimmed
+    """
+    trimmed = sum(trim_deform_vertices(keyframe) for keyframe in keyframes)
+
+    kept = [keyframes[0]] if keyframes else []
+    for index in range(1, len(keyframes) - 1):
+        if not (
+            _is_setup_mesh(kept[-1])
+            and _is_setup_mesh(keyframes[index])
+            and _is_setup_mesh(keyframes[index + 1])
+        ):
+            kept.append(keyframes[index])
+    if len(keyframes) > 1:
+        kept.append(keyframes[-1])
+    return kept, trimmed
+
+
+def sparsify_animations_deforms(animations: Iterable[Animation]) -> DeformReport:
+    """
+    Sparsify the deform timelines of the animations and remove the ones equal to the
+    setup mesh in all their keyframes, unless their last keyframe is the one
+    defining the duration of the animation.
+    """
+    keyframes_trimmed = keyframes_removed = timelines_removed = 0
+    values_before = values_after = bytes_before = bytes_after = 0
+    for animation in animations:
+        for skin_deform in animation.deform.values():
+            for slot_deform in skin_deform.values():
+                for attachment_id, keyframes in slot_deform.items():
+                    values_before += _count_values(keyframes)
+                    bytes_before += _vertices_bytes(keyframes)
+                    kept, trimmed = sparsify_deform_keyframes(keyframes)
+                    keyframes_trimmed += trimmed
+                    keyframes_removed += len(keyframes) - len(kept)
+                    slot_deform[attachment_id] = kept
+                    values_after += _count_values(kept)
+                    bytes_after += _vertices_bytes(kept)
+
+        setup_timelines = [
+            (skin_id, slot_id, attachment_id)
+            for skin_id, skin_deform in animation.deform.items()
+            for slot_id, slot_deform in skin_deform.items()
+            for attachment_id, keyframes in slot_deform.items()
+            if all(_is_setup_mesh(keyframe) for keyframe in keyframes)
+        ]
+        if not setup_timelines:
+            continue
+
+        setup_keyframes = {
+            id(animation.deform[skin_id][slot_id][attachment_id])
+            for skin_id, slot_id, attachment_id in setup_timelines
+        }
+        duration = max(
+            (
+                get_time(keyframes[-1])
+                for keyframes in iter_keyframe_lists(animation)
+                if keyframes and id(keyframes) not in setup_keyframes
+            ),
+            default=0.0,
+        )
+        for skin_id, slot_id, attachment_id in setup_timelines:
+            keyframes = animation.deform[skin_id][slot_id][attachment_id]
+            if keyframes and get_time(keyframes[-1]) > duration:
+                continue
+            del animation.deform[skin_id][slot_id][attachment_id]
+            timelines_removed += 1
+        _remove_empty_deforms(animation)
+
+    return DeformReport(
+        keyframes_trimmed=keyframes_trimmed,
+        keyframes_removed=keyframes_removed,
+        timelines_removed=timelines_removed,
+        vertices_removed=values_before - values_after,
+        bytes_saved=bytes_before - bytes_after,
+    )
+
+
+def trim_deform_vertices(keyframe: Deform) -> bool:
+    """Skip the zeros around the vertices of a keyframe, True if any was skipped"""
+    vertices = keyframe.vertices or []
+    non_zero = [index for index, value in enumerate(vertices) if value != 0]
+    if not non_zero:
+        keyframe.offset = None
+        keyframe.vertices = None
+        return bool(vertices)
+
+    first, last = non_zero[0], non_zero[-1]
+    if first == 0 and last == len(vertices) - 1:
+        return False
+    keyframe.offset = (DeformCodec.get_offset(keyframe) + first) or None
+    keyframe.vertices = vertices[first : last + 1]
+    return True
+
+
+def _is_setup_mesh(keyframe: Deform) -> bool:
+    return not any(keyframe.vertices or ())
+
+
+def _count_values(keyframes: Iterable[Deform]) -> int:
+    return sum(len(keyframe.vertices or ()) for keyframe in keyframes)
+
+
+def _vertices_bytes(keyframes: Iterable[Deform]) -> int:
+    """Bytes of the vertices and offsets of the keyframes in compact json"""
+    total = 0
+    for keyframe in keyframes:
+        if keyframe.vertices:
+            # "vertices":[v1,v2,...],
+            total += 14 + sum(len(repr(value)) + 1 for value in keyframe.vertices)
+        offset = DeformCodec.get_offset(keyframe)
+        if offset:
+            # "offset":n,
+            total += 10 + len(str(offset))
+    return total
+
+
+def _remove_empty_deforms(animation: Animation) -> None:
+    for skin_id in list(animation.deform):
+        skin_deform = animation.deform[skin_id]
+        for slot_id in [slot_id for slot_id, slot in skin_deform.items() if not slot]:
+            del skin_deform[slot_id]
+        if not skin_deform:
+            del animation.deform[skin_id]
@@ -0,0 +1,169 @@
+from collections import namedtuple
+from typing import Iterable, List, Sequence, Tuple
+
+from spine_json_lib.data.data_types.animation import Animation
+from spine_json_lib.data.data_types.deform import Deform
+from spine_json_lib.data.data_types.skin import Skin38, SkinLinkedMesh, SkinMesh
+from spine_json_lib.data.data_types.vertices import (
+    Influence,
+    decode_weighted_vertices,
+    encode_weighted_vertices,
+    is_weighted,
+)
+from spine_json_lib.optimizer.deform import trim_deform_vertices
+from spine_json_lib.optimizer.timelines import DeformCodec
+
+DEFAULT_SKIN = "default"
+
+# Result of limiting the bones influencing the vertices of weighted meshes:
+# - meshes: number of meshes changed
+# - vertices_limited: vertices that lost influences
+# - influences_before, influences_after: bone transforms applied to the vertices of
+#   the weighted meshes every frame, the skinning work
+# - deform_keyframes: deform keyframes adapted to the new layout of the vertices
+InfluenceReport = namedtuple(
+    "InfluenceReport",
+    "meshes vertices_limited influences_before influences_after deform_keyframes",
+)
+
+
+def limit_vertex_influences(
+    influences: Sequence[Influence], max_influences: int
+) -> List[int]:
+    """
+    Indexes of the influences kept for a vertex: the max_influences with more
+    weight, in their original order
+    """
+    by_weight = sorted(
+        range(len(influences)), key=lambda index: influences[index][3], reverse=True
+    )
+    return sorted(by_weight[:max_influences])
+
+
+def limit_mesh_influences(
+    mesh: SkinMesh, deforms: Iterable[List[Deform]], max_influences: int
+) -> Tuple[int, int, int, int]:
+    """
+    Keep the max_influences bones with more weight of every vertex of a weighted mesh
+    renormalizing their weights, and remove the offsets of the influences removed
+    from its deform timelines, as they have 2 values (x, y) for every influence.
+    :return: vertices limited, influences before and after, deform keyframes changed
+    """
+    decoded = decode_weighted_vertices(mesh.vertices)
+    influences_before = sum(len(influences) for influences in decoded)
+
+    limited = []
+    # Position of every influence kept in the deform vertices
+    kept_positions = []
+    vertices_limited = 0
+    position = 0
+    for influences in decoded:
+        kept = limit_vertex_influences(influences, max_influences)
+        kept_positions.extend(position + index for index in kept)
+        position += len(influences)
+        if len(kept) == len(influences):
+            limited.append(influences)
+            continue
+
+        vertices_limited += 1
+        total_weight = sum(influences[index][3] for index in kept) or 1
+        limited.append(
+            [
+                influences[index][:3] + (influences[index][3] / total_weight,)
+                for index in kept
+            ]
+        )
+
+    if not vertices_limited:
+        return 0, influences_before, influences_before, 0
+
+    mesh.vertices = encode_weighted_vertices(limited)
+    deform_keyframes = 0
+    for keyframes in deforms:
+        for keyframe in keyframes:
+            _remove_deform_influences(keyframe, influences_before, kept_positions)
+            deform_keyframes += 1
+    return vertices_limited, influences_before, len(kept_positions), deform_keyframes
+
+
+def limit_bone_influences(
+    skins: Iterable[Skin38], animations: Iterable[Animation], max_influences: int
+) -> InfluenceReport:
+    """
+    Limit the bones influencing every vertex of the weighted meshes of the skins to
+    max_influences, adapting the deform timelines of the meshes in the animations and
+    the ones of the linked meshes sharing their deforms
+    """
+    if max_influences < 1:
+        raise ValueError(
+            "At least 1 influence by vertex is needed, got {}".format(max_influences)
+        )
+
+    skins = list(skins)
+    animations = list(animations)
+    meshes = vertices_limited = influences_before = influences_after = 0
+    deform_keyframes = 0
+    for skin in skins:
+        for slot_id, slot_attachments in skin.attachments.items():
+            for attachment_id, attachment in slot_attachments.items():
+                if not isinstance(attachment, SkinMesh) or not is_weighted(attachment):
+                    continue
+
+                deform_ids = [(skin.name, attachment_id)] + _get_linked_meshes(
+                    skins, skin.name, slot_id, attachment_id
+                )
+                deforms = [
+                    animation.deform[deform_skin][slot_id][deform_attachment]
+                    for animation in animations
+                    for deform_skin, deform_attachment in deform_ids
+                    if deform_attachment
+                    in animation.deform.get(deform_skin, {}).get(slot_id, {})
+                ]
+                limited, before, after, keyframes = limit_mesh_influences(
+                    attachment, deforms, max_influences
+                )
+                meshes += 1 if limited else 0
+                vertices_limited += limited
+                influences_before += before
+                influences_after += after
+                deform_keyframes += keyframes
+
+    return InfluenceReport(
+        meshes=meshes,
+        vertices_limited=vertices_limited,
+        influences_before=influences_before,
+        influences_after=influences_after,
+        deform_keyframes=deform_keyframes,
+    )
+
+
+def _get_linked_meshes(
+    skins: Iterable[Skin38], skin_name: str, slot_id: str, attachment_id: str
+) -> List[Tuple[str, str]]:
+    """(skin, attachment) of the linked meshes using the deforms of a mesh"""
+    return [
+        (skin.name, linked_id)
+        for skin in skins
+        for linked_id, linked_mesh in skin.attachments.get(slot_id, {}).items()
+        if isinstance(linked_mesh, SkinLinkedMesh)
+        and linked_mesh.parent == attachment_id
+        and (linked_mesh.skin or DEFAULT_SKIN) == skin_name
+        and linked_mesh.deform is not False
+    ]
+
+
+def _remove_deform_influences(
+    keyframe: Deform, influences_count: int, kept_positions: Sequence[int]
+) -> None:
+    vertices = keyframe.vertices or []
+    offset = DeformCodec.get_offset(keyframe)
+    full_vertices = [0] * (influences_count * 2)
+    full_vertices[offset : offset + len(vertices)] = vertices
+
+    keyframe.offset = None
+    keyframe.vertices = [
+        value
+        for position in kept_positions
+        for value in full_vertices[position * 2 : position * 2 + 2]
+    ]
+    trim_deform_vertices(keyframe)
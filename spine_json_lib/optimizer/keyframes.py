@@ -0,0 +1,245 @@
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from spine_json_lib.data.data_types.animation import Animation
+from spine_json_lib.optimizer.curves import (
+    curve_percent,
+    curve_percent_range,
+    get_bezier_curve,
+    interpolate,
+    is_stepped,
+    values_distance,
+    wrap_angle,
+)
+from spine_json_lib.optimizer.timelines import (
+    KeyframeCodec,
+    get_time,
+    iter_timelines,
+    set_keyframes,
+)
+
+# Pieces every segment between two keyframes with a bezier curve is split into to
+# bound its error, linear and stepped segments are checked exactly as their error
+# is always maximum at the keyframes (or right before them)
+SEGMENT_SAMPLES = 8
+# Times a piece of a bezier segment can be halved to prove its error is small enough
+MAX_SPLITS = 7
+# Fraction of a segment right before its end, where stepped segments jump
+BEFORE_END_FRACTION = 1 - 1e-9
+
+# Differences allowed for rounding errors when the epsilon is 0
+FLOAT_TOLERANCE = 1e-9
+
+
+def remove_redundant_keyframes(
+    keyframes: List[Any],
+    codec: KeyframeCodec,
+    epsilon: float = 0.0,
+    samples: int = SEGMENT_SAMPLES,
+) -> List[Any]:
+    """
+    Keyframes of a timeline without the ones that can be reproduced interpolating
+    their neighbours: identical values, values in the line between the neighbours
+    or any other that the curve of the previous keyframe kept reproduces with an
+    error of at most epsilon. First and last keyframes are always kept.
+    Epsilon is in the units of every channel: degrees, pixels, scale factor, mixes
+    and color components from 0 to 1.
+    :return: the keyframes kept, in the same order
+    """
+    if len(keyframes) <= 2:
+        return list(keyframes)
+
+    values = [codec.decode(keyframe) for keyframe in keyframes]
+    times = [get_time(keyframe) for keyframe in keyframes]
+    tolerance = epsilon + FLOAT_TOLERANCE
+
+    kept = [keyframes[0]]
+    start = 0
+    for index in range(1, len(keyframes) - 1):
+        # Dropping keyframe index means interpolating from start up to index + 1
+        if not _can_merge(
+            keyframes, times, values, codec, start, index + 1, tolerance, samples
+        ):
+            kept.append(keyframes[index])
+            start = index
+    kept.append(keyframes[-1])
+    return kept
+
+
+def remove_animations_redundant_keyframes(
+    animations: Iterable[Animation], epsilon: float = 0.0
+) -> Dict[str, int]:
+    """
+    Remove the redundant keyframes of every interpolated timeline of the animations
+    :return: number of keyframes removed by type of timeline
+    """
+    removed = Counter()
+    for animation in animations:
+        for timeline in iter_timelines(animation):
+            keyframes = remove_redundant_keyframes(
+                timeline.keyframes, timeline.codec, epsilon=epsilon
+            )
+            if len(keyframes) < len(timeline.keyframes):
+                removed[timeline.kind] += len(timeline.keyframes) - len(keyframes)
+                set_keyframes(timeline, keyframes)
+    return dict(removed)
+
+
+def _can_merge(
+    keyframes: Sequence[Any],
+    times: Sequence[float],
+    values: Sequence[Tuple[float, ...]],
+    codec: KeyframeCodec,
+    start: int,
+    end: int,
+    tolerance: float,
+    samples: int,
+) -> bool:
+    """
+    True if interpolating from keyframe start to keyframe end with the curve of
+    start reproduces every keyframe and segment between them
+    """
+    duration = times[end] - times[start]
+    if duration <= 0:
+        return False
+
+    held_values = codec.held_values(keyframes[start])
+    for index in range(start, end):
+        if codec.held_values(keyframes[index]) != held_values:
+            return False
+
+        if times[index + 1] - times[index] <= 0:
+            return False
+
+        segment = _MergedSegment(
+            keyframes[index],
+            keyframes[start],
+            values[index : index + 2],
+            (values[start], values[end]),
+            (
+                (times[index] - times[start]) / duration,
+                (times[index + 1] - times[start]) / duration,
+            ),
+            codec.angles,
+        )
+        if not segment.within_tolerance(tolerance, samples):
+            return False
+    return True
+
+
+class _MergedSegment(object):
+    """
+    Segment between a keyframe and the next one compared with the part of the merged
+    segment, from keyframe start to keyframe end, covering the same time
+    """
+
+    def __init__(
+        self,
+        keyframe: Any,
+        start_keyframe: Any,
+        original_values: Sequence[Tuple[float, ...]],
+        merged_values: Sequence[Tuple[float, ...]],
+        merged_fractions: Tuple[float, float],
+        angles: bool,
+    ) -> None:
+        self.keyframe = keyframe
+        self.start_keyframe = start_keyframe
+        self.original_values = original_values
+        self.merged_values = merged_values
+        self.merged_fractions = merged_fractions
+        self.angles = angles
+
+    def within_tolerance(self, tolerance: float, samples: int) -> bool:
+        if (
+            get_bezier_curve(self.keyframe) is None
+            and get_bezier_curve(self.start_keyframe) is None
+        ):
+            # Differences between linear or stepped segments are linear inside them
+            # and stepped ones jump right at the end
+            if is_stepped(self.keyframe) == is_stepped(self.start_keyframe):
+                fractions = (0.0,)
+            else:
+                fractions = (0.0, BEFORE_END_FRACTION)
+            return all(self.error(fraction) <= tolerance for fraction in fractions)
+
+        # Pieces of the segment are split until the error bound of each one is
+        # within tolerance, if any of them is still too big after MAX_SPLITS the
+        # keyframe is kept as the error cannot be proved small enough
+        pending = [
+            (step / samples, min((step + 1) / samples, BEFORE_END_FRACTION), 0)
+            for step in range(samples)
+        ]
+        while pending:
+            fraction_from, fraction_to, splits = pending.pop()
+            middle = (fraction_from + fraction_to) / 2
+            if self.error(middle) > tolerance:
+                return False
+            if self.error_bound(fraction_from, fraction_to) <= tolerance:
+                continue
+            if splits >= MAX_SPLITS:
+                return False
+            pending.append((fraction_from, middle, splits + 1))
+            pending.append((middle, fraction_to, splits + 1))
+        return True
+
+    def error(self, fraction: float) -> float:
+        original = interpolate(
+            self.original_values[0],
+            self.original_values[1],
+            curve_percent(self.keyframe, fraction),
+            self.angles,
+        )
+        merged = interpolate(
+            self.merged_values[0],
+            self.merged_values[1],
+            curve_percent(self.start_keyframe, self._merged_fraction(fraction)),
+            self.angles,
+        )
+        return values_distance(original, merged, self.angles)
+
+    def error_bound(self, fraction_from: float, fraction_to: float) -> float:
+        """Maximum error possible between two fractions of the segment"""
+        original_ranges = self._value_ranges(
+            self.original_values,
+            curve_percent_range(self.keyframe, fraction_from, fraction_to),
+        )
+        merged_ranges = self._value_ranges(
+            self.merged_values,
+            curve_percent_range(
+                self.start_keyframe,
+                self._merged_fraction(fraction_from),
+                self._merged_fraction(fraction_to),
+            ),
+        )
+        bound = 0.0
+        for (original_min, original_max), (merged_min, merged_max) in zip(
+            original_ranges, merged_ranges
+        ):
+            lowest = original_min - merged_max
+            highest = original_max - merged_min
+            if self.angles:
+                # Both angles may be turns apart
+                turns = 360.0 * round((lowest + highest) / 720.0)
+                lowest -= turns
+                highest -= turns
+            bound = max(bound, abs(lowest), abs(highest))
+        return bound
+
+    def _merged_fraction(self, fraction: float) -> float:
+        merged_from, merged_to = self.merged_fractions
+        return merged_from + (merged_to - merged_from) * fraction
+
+    def _value_ranges(
+        self, values: Sequence[Tuple[float, ...]], percent_range: Tuple[float, float]
+    ) -> List[Tuple[float, float]]:
+        ranges = []
+        for value_from, value_to in zip(values[0], values[1]):
+            change = value_to - value_from
+            if self.angles:
+                change = wrap_angle(change)
+            limits = (
+                value_from + change * percent_range[0],
+                value_from + change * percent_range[1],
+            )
+            ranges.append((min(limits), max(limits)))
+        return ranges
@@ -0,0 +1,303 @@
+import copy
+import math
+from collections import Counter, namedtuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from spine_json_lib.data.data_types.animation import Animation
+from spine_json_lib.optimizer.curves import (
+    curve_percent,
+    interpolate,
+    is_stepped,
+    wrap_angle,
+)
+from spine_json_lib.optimizer.keyframes import FLOAT_TOLERANCE
+from spine_json_lib.optimizer.timelines import (
+    KeyframeCodec,
+    get_time,
+    iter_timelines,
+    sample,
+    set_keyframes,
+)
+
+DEFAULT_FPS = 30
+# Spine exports the times of the keyframes with 4 decimals
+TIME_DECIMALS = 4
+# Parts in which every interval between keyframes is split to measure the error
+ERROR_SUBDIVISIONS = 16
+
+# Result of resampling animations:
+# - keyframes_before, keyframes_after: number of keyframes by type of timeline
+# - max_errors: {type of timeline: {channel: maximum difference with the original}}
+ResampleReport = namedtuple(
+    "ResampleReport", "keyframes_before keyframes_after max_errors"
+)
+
+
+def resample_keyframes(
+    keyframes: List[Any],
+    codec: KeyframeCodec,
+    fps: float = DEFAULT_FPS,
+    tolerance: Optional[float] = None,
+) -> Tuple[List[Any], Tuple[float, ...]]:
+    """
+    Keyframes of a timeline emitted again every 1 / fps seconds with linear curves,
+    evaluating the curves of the original keyframes. Stepped segments and changes
+    of held attributes are kept where they are.
+    With a tolerance the frames and the original keyframes are sampled and only the
+    linear keyframes needed to reproduce all of them within tolerance are emitted
+    (adaptive rate). The tolerance is a bound at those samples only: between them
+    the original curves may be further away, the errors returned are measured on a
+    denser grid and can exceed it. The original keyframes are kept when resampling
+    does not reduce their number.
+    :return: keyframes and maximum difference with the original ones by channel
+    """
+    if fps <= 0:
+        raise ValueError("Frames per second must be positive, got {}".format(fps))
+
+    no_errors = (0.0,) * len(codec.channel_names())
+    if len(keyframes) < 2:
+        return list(keyframes), no_errors
+
+    times = [get_time(keyframe) for keyframe in keyframes]
+    values = [codec.decode(keyframe) for keyframe in keyframes]
+    kept_segments, boundaries = _get_fixed_segments(keyframes, times, codec)
+
+    # Samples as (time, values, index of the original keyframe, kept as it is)
+    samples = []
+    for index in range(len(keyframes) - 1):
+        if index in kept_segments:
+            samples.append((times[index], values[index], index, True))
+            continue
+
+        start, end = times[index], times[index + 1]
+        sample_times = _frame_times(start, end, fps)
+        if (index in boundaries or tolerance is not None) and (
+            not sample_times or sample_times[0] != start
+        ):
+            sample_times.insert(0, start)
+        for time in sample_times:
+            percent = curve_percent(keyframes[index], (time - start) / (end - start))
+            sample_values = interpolate(
+                values[index], values[index + 1], percent, codec.angles
+            )
+            samples.append((time, sample_values, index, False))
+    samples.append((times[-1], values[-1], len(keyframes) - 1, True))
+
+    if tolerance is not None:
+        samples = _simplify_samples(
+            samples, boundaries, codec.angles, tolerance + FLOAT_TOLERANCE
+        )
+    if len(samples) >= len(keyframes):
+        return list(keyframes), no_errors
+
+    resampled = [
+        copy.deepcopy(keyframes[index])
+        if is_kept
+        else _linear_keyframe(keyframes[index], codec, time, sample_values)
+        for time, sample_values, index, is_kept in samples
+    ]
+    return resampled, _get_max_errors(keyframes, values, resampled, codec)
+
+
+def resample_animations(
+    animations: Iterable[Animation],
+    fps: float = DEFAULT_FPS,
+    tolerance: Optional[float] = None,
+) -> ResampleReport:
+    """Resample every interpolated timeline of the animations"""
+    keyframes_before = Counter()
+    keyframes_after = Counter()
+    max_errors: Dict[str, Dict[str, float]] = {}
+    for animation in animations:
+        for timeline in iter_timelines(animation):
+            keyframes, errors = resample_keyframes(
+                timeline.keyframes, timeline.codec, fps=fps, tolerance=tolerance
+            )
+            keyframes_before[timeline.kind] += len(timeline.keyframes)
+            keyframes_after[timeline.kind] += len(keyframes)
+            if len(keyframes) < len(timeline.keyframes):
+                set_keyframes(timeline, keyframes)
+
+            kind_errors = max_errors.setdefault(timeline.kind, {})
+            for channel, error in zip(timeline.codec.channel_names(), errors):
+                kind_errors[channel] = max(kind_errors.get(channel, 0.0), error)
+
+    return ResampleReport(
+        keyframes_before=dict(keyframes_before),
+        keyframes_after=dict(keyframes_after),
+        max_errors=max_errors,
+    )
+
+
+def _get_fixed_segments(
+    keyframes: Sequence[Any], times: Sequence[float], codec: KeyframeCodec
+) -> Tuple[Set[int], Set[int]]:
+    """
+    Segments (by index of their first keyframe) that are not resampled: stepped or
+    without duration. And boundaries, keyframes whose time is always kept: the
+    first one, the ones around fixed segments and where held attributes change.
+    """
+    kept_segments = set()
+    boundaries = {0}
+    for index in range(len(keyframes) - 1):
+        if is_stepped(keyframes[index]) or times[index + 1] <= times[index]:
+            kept_segments.add(index)
+            boundaries.update((index, index + 1))
+        if codec.held_values(keyframes[index]) != codec.held_values(
+            keyframes[index + 1]
+        ):
+            boundaries.add(index + 1)
+    return kept_segments, boundaries
+
+
+def _simplify_samples(
+    samples: List[Tuple[float, Tuple[float, ...], int, bool]],
+    boundaries: Set[int],
+    angles: bool,
+    tolerance: float,
+) -> List[Tuple[float, Tuple[float, ...], int, bool]]:
+    """
+    Minimum samples, in a greedy way, such that the lines between them pass within
+    tolerance of every sample removed. For every channel it keeps the range of
+    slopes from the last sample kept that pass close enough of the samples skipped,
+    so each sample is visited once.
+    """
+    # Samples that are kept: the ones of fixed segments, the ones after them and
+    # boundaries where held attributes change
+    must_keep = [
+        is_kept
+        or position == 0
+        or samples[position - 1][3]
+        or (index in boundaries and samples[position - 1][2] != index)
+        for position, (_, _, index, is_kept) in enumerate(samples)
+    ]
+
+    channels = [list(samples[0][1])]
+    for position in range(1, len(samples)):
+        previous, current = channels[-1], samples[position][1]
+        if angles:
+            # Rotations between samples go the shortest way
+            channels.append(
+                [
+                    value + wrap_angle(new_value - old_value)
+                    for value, old_value, new_value in zip(
+                        previous, samples[position - 1][1], current
+                    )
+                ]
+            )
+        else:
+            channels.append(list(current))
+
+    kept = [0]
+    anchor = 0
+    low = high = None
+    position = 1
+    while position < len(samples):
+        if position > anchor + 1 and not _fits_slopes(
+            samples, channels, anchor, position, low, high, angles
+        ):
+            # The line can't reach this sample, the previous one is needed
+            anchor = position - 1
+            kept.append(anchor)
+            low = high = None
+            continue
+
+        if must_keep[position]:
+            kept.append(position)
+            anchor = position
+            low = high = None
+        else:
+            duration = samples[position][0] - samples[anchor][0]
+            sample_low = [
+                (value - tolerance - anchor_value) / duration
+                for value, anchor_value in zip(channels[position], channels[anchor])
+            ]
+            sample_high = [
+                (value + tolerance - anchor_value) / duration
+                for value, anchor_value in zip(channels[position], channels[anchor])
+            ]
+            low = sample_low if low is None else list(map(max, low, sample_low))
+            high = sample_high if high is None else list(map(min, high, sample_high))
+        position += 1
+
+    if kept[-1] != len(samples) - 1:
+        kept.append(len(samples) - 1)
+    return [samples[position] for position in kept]
+
+
+def _fits_slopes(
+    samples: Sequence[Tuple[float, Tuple[float, ...], int, bool]],
+    channels: Sequence[Sequence[float]],
+    anchor: int,
+    position: int,
+    low: Sequence[float],
+    high: Sequence[float],
+    angles: bool,
+) -> bool:
+    """True if the line from anchor to position is within the slopes allowed"""
+    duration = samples[position][0] - samples[anchor][0]
+    if duration <= 0:
+        return False
+    for channel, (value, anchor_value) in enumerate(
+        zip(channels[position], channels[anchor])
+    ):
+        if angles and abs(value - anchor_value) >= 180:
+            return False
+        slope = (value - anchor_value) / duration
+        if not low[channel] <= slope <= high[channel]:
+            return False
+    return True
+
+
+def _frame_times(start: float, end: float, fps: float) -> List[float]:
+    """Times of the frames from start (included) to end (excluded)"""
+    frame_times = []
+    for frame in range(math.floor(start * fps), math.ceil(end * fps) + 1):
+        time = round(frame / fps, TIME_DECIMALS)
+        if start <= time < end:
+            frame_times.append(time)
+    return frame_times
+
+
+def _linear_keyframe(
+    keyframe: Any, codec: KeyframeCodec, time: float, values: Sequence[float]
+) -> Any:
+    """Copy of keyframe at time with values and a linear curve to the next one"""
+    new_keyframe = copy.deepcopy(keyframe)
+    new_keyframe.time = time
+    new_keyframe.curve = None
+    new_keyframe.c2 = new_keyframe.c3 = new_keyframe.c4 = None
+    codec.encode(new_keyframe, values)
+    return new_keyframe
+
+
+def _get_max_errors(
+    keyframes: Sequence[Any],
+    values: Sequence[Tuple[float, ...]],
+    resampled: Sequence[Any],
+    codec: KeyframeCodec,
+) -> Tuple[float, ...]:
+    """
+    Maximum difference by channel between two timelines, compared at the times of
+    the keyframes of both and ERROR_SUBDIVISIONS - 1 times evenly spread between
+    each two of them
+    """
+    key_times = sorted(
+        {get_time(keyframe) for keyframe in keyframes}
+        | {get_time(keyframe) for keyframe in resampled}
+    )
+    check_times = [key_times[0]]
+    for time, next_time in zip(key_times, key_times[1:]):
+        step = (next_time - time) / ERROR_SUBDIVISIONS
+        check_times.extend(time + part * step for part in range(1, ERROR_SUBDIVISIONS))
+        check_times.append(next_time)
+    resampled_values = [codec.decode(keyframe) for keyframe in resampled]
+    original = sample(keyframes, values, codec, check_times)
+    result = sample(resampled, resampled_values, codec, check_times)
+
+    errors = [0.0] * len(codec.channel_names())
+    for original_values, result_values in zip(original, result):
+        for channel, (a, b) in enumerate(zip(original_values, result_values)):
+            difference = abs(wrap_angle(a - b)) if codec.angles else abs(a - b)
+            errors[channel] = max(errors[channel], difference)
+    return tuple(errors)
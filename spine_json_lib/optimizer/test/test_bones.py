@@ -0,0 +1,78 @@
+import os
+
+from spine_json_lib.data.data_types.bone import Bone
+from spine_json_lib.data.data_types.vertices import (
+    decode_weighted_vertices,
+    encode_weighted_vertices,
+)
+from spine_json_lib.optimizer.bones import iter_weighted_attachments
+from spine_json_lib.spine_animation_editor import SpineAnimationEditor
+
+SPINE_JSON_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "../../test/data/original/elvira_original.json",
+)
+
+
+def test_remove_unreferenced_bones():
+    animation_editor = SpineAnimationEditor.from_json_file(json_path=SPINE_JSON_PATH)
+    original_data = animation_editor.to_json_data()
+
+    # Chain of helper bones before the ones weighting the meshes
+    data = animation_editor.spine_anim_data.data
+    for attachment in iter_weighted_attachments(data):
+        attachment.vertices = encode_weighted_vertices(
+            [
+                (bone_index + 3 if bone_index > 0 else bone_index, x, y, weight)
+                for bone_index, x, y, weight in influences
+            ]
+            for influences in decode_weighted_vertices(attachment.vertices)
+        )
+    data.bones = (
+        data.bones[:1]
+        + [
+            Bone({"name": "helper", "parent": "root"}),
+            Bone({"name": "helper_tip", "parent": "helper"}),
+            Bone({"name": "used_helper", "parent": "root"}),
+        ]
+        + data.bones[1:]
+    )
+    data.ik[0].bones = data.ik[0].bones + ["used_helper"]
+    animation_editor = SpineAnimationEditor(json_data=animation_editor.to_json_data())
+
+    bones_removed = animation_editor.remove_unreferenced_bones()
+
+    assert sorted(bones_removed) == ["helper", "helper_tip"]
+    result_data = animation_editor.to_json_data()
+    assert [bone["name"] for bone in result_data["bones"]] == [
+        "root",
+        "used_helper",
+    ] + [bone["name"] for bone in original_data["bones"][1:]]
+    for result_skin, original_skin in zip(
+        result_data["skins"], original_data["skins"]
+    ):
+        for slot_id, attachments in original_skin["attachments"].items():
+            for attachment_id, attachment in attachments.items():
+                if attachment.get("type") != "mesh":
+                    continue
+                result_attachment = result_skin["attachments"][slot_id][attachment_id]
+                if len(attachment["vertices"]) > len(attachment["uvs"]):
+                    # Weights moved one position by used_helper
+                    original_indexes = [
+                        influence[0] + (influence[0] > 0)
+                        for influences in decode_weighted_vertices(
+                            attachment["vertices"]
+                        )
+                        for influence in influences
+                    ]
+                    result_indexes = [
+                        influence[0]
+                        for influences in decode_weighted_vertices(
+                            result_attachment["vertices"]
+                        )
+                        for influence in influences
+                    ]
+                    assert result_indexes == original_indexes
+    assert animation_editor.spine_graph.graph.get_node(("BONE", "helper")) is None
+
+    assert animation_editor.remove_unreferenced_bones() == []
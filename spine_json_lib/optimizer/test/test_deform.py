@@ -0,0 +1,82 @@
+import json
+import os
+
+from spine_json_lib.data.data_types.deform import Deform
+from spine_json_lib.optimizer.deform import sparsify_deform_keyframes
+from spine_json_lib.spine_animation_editor import SpineAnimationEditor
+
+SPINE_JSON_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "../../test/data/original/elvira_original.json",
+)
+
+
+def _full_vertices(keyframe, size):
+    vertices = [0] * size
+    offset = keyframe.get("offset", 0)
+    stored = keyframe.get("vertices", [])
+    vertices[offset : offset + len(stored)] = stored
+    return vertices
+
+
+def test_sparsify_deform_keyframes():
+    keyframes = [
+        Deform({"time": 0, "vertices": [0, 0, 1.5, 0, 2, 0]}),
+        Deform({"time": 0.2, "offset": 2, "vertices": [0, 0, 3, 0]}),
+        Deform({"time": 0.4, "vertices": [0, 0, 0, 0]}),
+        Deform({"time": 0.6}),
+        Deform({"time": 0.8, "offset": 4, "vertices": [0]}),
+        Deform({"time": 1, "vertices": [1]}),
+    ]
+
+    kept, trimmed = sparsify_deform_keyframes(keyframes)
+
+    assert trimmed == 4
+    assert [keyframe.time for keyframe in kept] == [0, 0.2, 0.4, 0.8, 1]
+    assert [(keyframe.offset, keyframe.vertices) for keyframe in kept] == [
+        (2, [1.5, 0, 2]),
+        (4, [3]),
+        (None, None),
+        (None, None),
+        (None, [1]),
+    ]
+
+
+def test_sparsify_deforms():
+    with open(SPINE_JSON_PATH) as f:
+        json_data = json.load(f)
+    nose_deform = json_data["animations"]["breathe"]["deform"]["basic"]["nose"]
+    # Full vertex arrays as some exporters write them
+    nose_deform["nose"] = [
+        {"time": 0, "vertices": [0] * 40},
+        {"time": 0.3, "vertices": [0] * 40},
+        {"time": 0.6, "vertices": [0] * 4 + [0.5] * 30 + [0] * 6},
+        {"time": 0.9, "vertices": [0] * 40},
+    ]
+    # Does nothing and finishes before the animation ends
+    nose_deform["nose_shadow"] = [{"time": 0}, {"time": 0.5, "vertices": [0, 0]}]
+    animation_editor = SpineAnimationEditor(json_data=json_data)
+    original_data = animation_editor.to_json_data()
+
+    report = animation_editor.sparsify_deforms()
+
+    assert report.keyframes_trimmed == 5
+    assert report.keyframes_removed == 0
+    assert report.timelines_removed == 1
+    assert report.vertices_removed == 40 * 4 + 2 - 30
+    assert report.bytes_saved > 0
+
+    result_data = animation_editor.to_json_data()
+    result_deform = result_data["animations"]["breathe"]["deform"]["basic"]["nose"]
+    assert list(result_deform) == ["nose"]
+    for original, result in zip(
+        original_data["animations"]["breathe"]["deform"]["basic"]["nose"]["nose"],
+        result_deform["nose"],
+    ):
+        assert _full_vertices(original, 40) == _full_vertices(result, 40)
+    assert result_deform["nose"][2] == {
+        "time": 0.6,
+        "offset": 4,
+        "vertices": [0.5] * 30,
+    }
+    SpineAnimationEditor(json_data=result_data)
@@ -0,0 +1,97 @@
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from spine_json_lib.data.data_types.deform import Deform
+from spine_json_lib.data.data_types.skin import SkinMesh
+from spine_json_lib.data.data_types.vertices import (
+    decode_weighted_vertices,
+    is_weighted,
+)
+from spine_json_lib.optimizer.influences import limit_mesh_influences
+from spine_json_lib.spine_animation_editor import SpineAnimationEditor
+
+SPINE_JSON_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "../../test/data/original/elvira_original.json",
+)
+
+
+def test_limit_mesh_influences():
+    mesh = SkinMesh(
+        {
+            "type": "mesh",
+            "uvs": [0, 0, 1, 1],
+            # Vertex with 3 influences and vertex with 1
+            "vertices": [3, 0, 1.5, 2.5, 0.1, 1, 3.5, 4.5, 0.6, 2, 5.5, 6.5, 0.3]
+            + [1, 2, 7.5, 8.5, 1],
+        }
+    )
+    deform = [
+        Deform({"time": 0, "vertices": [1, 1, 2, 2, 3, 3, 4, 4]}),
+        Deform({"time": 1, "offset": 6, "vertices": [4, 4]}),
+        Deform({"time": 2, "vertices": [1, 1]}),
+    ]
+
+    result = limit_mesh_influences(mesh, [deform], max_influences=2)
+
+    assert result == (1, 4, 3, 3)
+    assert mesh.vertices == pytest.approx(
+        [2, 1, 3.5, 4.5, 2 / 3, 2, 5.5, 6.5, 1 / 3, 1, 2, 7.5, 8.5, 1]
+    )
+    assert [(keyframe.offset, keyframe.vertices) for keyframe in deform] == [
+        (None, [2, 2, 3, 3, 4, 4]),
+        (4, [4, 4]),
+        (None, None),
+    ]
+
+
+def test_limit_bone_influences():
+    animation_editor = SpineAnimationEditor.from_json_file(json_path=SPINE_JSON_PATH)
+
+    report = animation_editor.limit_bone_influences(max_influences=2)
+
+    assert report.meshes > 0
+    assert report.influences_after < report.influences_before
+    assert report.deform_keyframes == 2
+    for skin in animation_editor.spine_anim_data.data.skins:
+        for slot_attachments in skin.attachments.values():
+            for attachment in slot_attachments.values():
+                if isinstance(attachment, SkinMesh) and len(attachment.vertices) > len(
+                    attachment.uvs
+                ):
+                    for influences in decode_weighted_vertices(attachment.vertices):
+                        assert len(influences) <= 2
+                        assert sum(weight for _, _, _, weight in influences) == (
+                            pytest.approx(1, abs=1e-4)
+                        )
+
+    nose_mesh = animation_editor.spine_anim_data.data.get_skin("basic").attachments[
+        "nose"
+    ]["nose"]
+    influences = sum(map(len, decode_weighted_vertices(nose_mesh.vertices)))
+    nose_deform = animation_editor.spine_anim_data.data.animations["breathe"].deform[
+        "basic"
+    ]["nose"]["nose"]
+    for keyframe in nose_deform:
+        assert (keyframe.offset or 0) + len(keyframe.vertices or ()) <= influences * 2
+    SpineAnimationEditor(json_data=animation_editor.to_json_data())
+
+
+# 2 vertices moved by 1 bone each
+WEIGHTED_VERTICES = [1, 0, 5, 5, 1, 1, 0, 6, 6, 1]
+
+
+@pytest.mark.parametrize(
+    "attachment, weighted",
+    [
+        (SimpleNamespace(vertices=[0, 0, 1, 1], uvs=[0, 0, 1, 1]), False),
+        (SimpleNamespace(vertices=WEIGHTED_VERTICES, uvs=[0, 0, 1, 1]), True),
+        (SimpleNamespace(vertices=[0, 0, 1, 1], vertexCount=2), False),
+        (SimpleNamespace(vertices=WEIGHTED_VERTICES, vertexCount=2), True),
+        (SimpleNamespace(vertices=None, uvs=None), False),
+    ],
+)
+def test_is_weighted(attachment, weighted):
+    assert is_weighted(attachment) == weighted
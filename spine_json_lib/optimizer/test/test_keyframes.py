@@ -0,0 +1,216 @@
+import copy
+import os
+
+import pytest
+
+from spine_json_lib.data.data_types.animation import Animation
+from spine_json_lib.optimizer.curves import values_distance
+from spine_json_lib.optimizer.keyframes import (
+    remove_animations_redundant_keyframes,
+    remove_redundant_keyframes,
+)
+from spine_json_lib.optimizer.timelines import (
+    IK_CODEC,
+    ROTATE_CODEC,
+    TRANSLATE_CODEC,
+    TimelineEntry,
+    get_time,
+    iter_timelines,
+    sample,
+)
+from spine_json_lib.spine_animation_editor import SpineAnimationEditor
+
+SPINE_JSON_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "../../test/data/original/masquerade_skeleton.json",
+)
+ELVIRA_JSON_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "../../test/data/original/elvira_original.json",
+)
+
+
+def _bone_animation(kind, keyframes):
+    return Animation({"bones": {"bone": {kind: keyframes}}})
+
+
+def _times(keyframes):
+    return [get_time(keyframe) for keyframe in keyframes]
+
+
+def _dense_times(keyframes, fps=120):
+    """Times every 1/fps seconds and right before every keyframe"""
+    duration = get_time(keyframes[-1])
+    times = [step / fps for step in range(int(duration * fps) + 1)]
+    times.extend(get_time(keyframe) - 1e-7 for keyframe in keyframes)
+    return sorted(time for time in set(times) if time >= 0)
+
+
+def _assert_same_timeline(original, timeline, epsilon):
+    times = _dense_times(original.keyframes)
+    expected = sample(
+        original.keyframes,
+        [original.codec.decode(keyframe) for keyframe in original.keyframes],
+        original.codec,
+        times,
+    )
+    result = sample(
+        timeline.keyframes,
+        [timeline.codec.decode(keyframe) for keyframe in timeline.keyframes],
+        timeline.codec,
+        times,
+    )
+    for time, expected_values, values in zip(times, expected, result):
+        assert values_distance(expected_values, values, original.codec.angles) <= (
+            epsilon + 1e-6
+        ), time
+
+
+def test_remove_collinear_keyframes():
+    animation = _bone_animation(
+        "translate",
+        [
+            {"time": 0, "x": 0, "y": 0},
+            {"time": 0.5, "x": 5, "y": 1},
+            {"time": 1, "x": 10, "y": 2},
+            {"time": 1.5, "x": 10, "y": 2},
+            {"time": 2, "x": 10, "y": 2},
+            {"time": 2.5, "x": 0, "y": 2},
+        ],
+    )
+    keyframes = animation.bones["bone"].translate
+
+    assert _times(remove_redundant_keyframes(keyframes, TRANSLATE_CODEC)) == [
+        0,
+        1,
+        2,
+        2.5,
+    ]
+
+
+def test_keep_keyframes_changing_interpolation():
+    keyframes = _bone_animation(
+        "translate",
+        [
+            {"time": 0, "x": 0, "curve": "stepped"},
+            {"time": 0.5, "x": 0},
+            {"time": 1, "x": 7.5},
+            {"time": 1.5, "x": 15, "curve": 0.25, "c3": 0.75},
+            {"time": 2, "x": 20},
+        ],
+    ).bones["bone"].translate
+
+    # Keyframe at 0.5 ends the stepped segment and keyframe at 1.5 starts a curve
+    assert _times(remove_redundant_keyframes(keyframes, TRANSLATE_CODEC)) == [
+        0,
+        0.5,
+        1.5,
+        2,
+    ]
+
+
+def test_remove_keyframes_with_epsilon():
+    keyframes = _bone_animation(
+        "translate",
+        [
+            {"time": 0, "x": 0},
+            {"time": 0.5, "x": 5.05},
+            {"time": 1, "x": 10},
+        ],
+    ).bones["bone"].translate
+
+    assert len(remove_redundant_keyframes(keyframes, TRANSLATE_CODEC)) == 3
+    assert len(remove_redundant_keyframes(keyframes, TRANSLATE_CODEC, 0.1)) == 2
+
+
+def test_keep_keyframes_changing_at_segments_ends():
+    keyframes = _bone_animation(
+        "translate",
+        [
+            {"time": 0, "x": 0, "curve": "stepped"},
+            # Rises at the end of the segment
+            {"time": 1, "x": 0, "curve": 1, "c2": 0, "c3": 1, "c4": 0},
+            {"time": 2, "x": 7.9},
+        ],
+    ).bones["bone"].translate
+
+    result = remove_redundant_keyframes(keyframes, TRANSLATE_CODEC, 1.0)
+
+    assert _times(result) == [0, 1, 2]
+    _assert_same_timeline(
+        TimelineEntry("translate", None, None, keyframes, TRANSLATE_CODEC),
+        TimelineEntry("translate", None, None, result, TRANSLATE_CODEC),
+        epsilon=1.0,
+    )
+
+
+def test_remove_rotate_keyframes_wrapping_angles():
+    keyframes = _bone_animation(
+        "rotate",
+        [
+            {"time": 0, "angle": 170},
+            {"time": 0.5, "angle": -180},
+            {"time": 1, "angle": -170},
+        ],
+    ).bones["bone"].rotate
+
+    # 170 -> 180 -> 190 is a straight rotation going the shortest way
+    assert _times(remove_redundant_keyframes(keyframes, ROTATE_CODEC)) == [0, 1]
+
+
+def test_keep_ik_keyframes_changing_bend():
+    keyframes = Animation(
+        {
+            "ik": {
+                "ik": [
+                    {"time": 0, "mix": 1, "bendPositive": True},
+                    {"time": 0.5, "mix": 1, "bendPositive": False},
+                    {"time": 1, "mix": 1, "bendPositive": False},
+                    {"time": 1.5, "mix": 1, "bendPositive": False},
+                ]
+            }
+        }
+    ).ik["ik"]
+
+    assert _times(remove_redundant_keyframes(keyframes, IK_CODEC)) == [0, 0.5, 1.5]
+
+
+@pytest.mark.parametrize("epsilon", [0.0, 0.01])
+def test_remove_animations_redundant_keyframes(epsilon):
+    animation_editor = SpineAnimationEditor.from_json_file(json_path=SPINE_JSON_PATH)
+    animations = animation_editor.spine_anim_data.data.animations
+    original_timelines = {
+        animation_id: list(iter_timelines(copy.deepcopy(animation)))
+        for animation_id, animation in animations.items()
+    }
+
+    removed = animation_editor.remove_redundant_keyframes(epsilon=epsilon)
+    assert removed["translate"] > 0
+    assert remove_animations_redundant_keyframes(animations.values(), epsilon) == {}
+
+    for animation_id, animation in animations.items():
+        timelines = list(iter_timelines(animation))
+        assert len(timelines) == len(original_timelines[animation_id])
+        for original, timeline in zip(original_timelines[animation_id], timelines):
+            _assert_same_timeline(original, timeline, epsilon)
+
+
+def test_remove_keyframes_within_epsilon_between_samples():
+    animation_editor = SpineAnimationEditor.from_json_file(json_path=ELVIRA_JSON_PATH)
+    animations = animation_editor.spine_anim_data.data.animations
+    original_timelines = [
+        timeline
+        for animation in copy.deepcopy(animations).values()
+        for timeline in iter_timelines(animation)
+    ]
+
+    animation_editor.remove_redundant_keyframes(epsilon=0.1)
+
+    timelines = [
+        timeline
+        for animation in animations.values()
+        for timeline in iter_timelines(animation)
+    ]
+    assert len(timelines) == len(original_timelines)
+    for original, timeline in zip(original_timelines, timelines):
+        _assert_same_timeline(original, timeline, epsilon=0.1)
@@ -0,0 +1,163 @@
+import copy
+import math
+import os
+
+import pytest
+
+from spine_json_lib.data.data_types.animation import Animation
+from spine_json_lib.optimizer.curves import wrap_angle
+from spine_json_lib.optimizer.resample import resample_keyframes
+from spine_json_lib.optimizer.timelines import (
+    ROTATE_CODEC,
+    TRANSLATE_CODEC,
+    get_time,
+    iter_timelines,
+    sample,
+)
+from spine_json_lib.spine_animation_editor import SpineAnimationEditor
+
+SPINE_JSON_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "../../test/data/original/masquerade_skeleton.json",
+)
+
+
+def _baked_translate(fps, duration):
+    frames = int(duration * fps)
+    return Animation(
+        {
+            "bones": {
+                "bone": {
+                    "translate": [
+                        {
+                            "time": round(frame / fps, 4),
+                            "x": 100 * math.sin(2 * math.pi * frame / frames),
+                            "y": 10 * frame / frames,
+                        }
+                        for frame in range(frames + 1)
+                    ]
+                }
+            }
+        }
+    ).bones["bone"].translate
+
+
+def test_resample_fixed_rate():
+    keyframes = _baked_translate(fps=60, duration=1)
+
+    resampled, errors = resample_keyframes(keyframes, TRANSLATE_CODEC, fps=30)
+
+    assert len(resampled) == 31
+    assert [get_time(keyframe) for keyframe in resampled[:3]] == [0, 0.0333, 0.0667]
+    # Linear y is reproduced exactly, x loses the frames in between
+    chord_error = 100 * (1 - math.cos(2 * math.pi / 60))
+    assert errors[0] == pytest.approx(chord_error, abs=1e-3)
+    assert errors[1] == pytest.approx(0.0, abs=1e-3)
+
+
+@pytest.mark.parametrize("tolerance", [0.01, 0.5, 2])
+def test_resample_adaptive(tolerance):
+    keyframes = _baked_translate(fps=60, duration=1)
+
+    resampled, errors = resample_keyframes(
+        keyframes, TRANSLATE_CODEC, fps=60, tolerance=tolerance
+    )
+
+    assert len(resampled) < len(keyframes)
+    assert max(errors) <= tolerance + 1e-6
+
+
+def test_resample_keeps_stepped_segments():
+    keyframes = Animation(
+        {
+            "bones": {
+                "bone": {
+                    "rotate": [
+                        {"time": 0, "angle": 0},
+                        {"time": 0.5, "angle": 90, "curve": "stepped"},
+                        {"time": 1, "angle": 180},
+                        {"time": 2, "angle": 180},
+                    ]
+                }
+            }
+        }
+    ).bones["bone"].rotate
+
+    resampled, errors = resample_keyframes(
+        keyframes, ROTATE_CODEC, fps=30, tolerance=0.1
+    )
+
+    assert [get_time(keyframe) for keyframe in resampled] == [0, 0.5, 1, 2]
+    assert resampled[1].curve == "stepped"
+    assert errors == (0.0,)
+
+
+def test_resample_animations():
+    animation_editor = SpineAnimationEditor.from_json_file(json_path=SPINE_JSON_PATH)
+
+    report = animation_editor.resample_animations(fps=30, tolerance=0.5)
+
+    animations = animation_editor.spine_anim_data.data.animations.values()
+    assert sum(report.keyframes_after.values()) < sum(
+        report.keyframes_before.values()
+    )
+    assert sum(report.keyframes_after.values()) == sum(
+        len(timeline.keyframes)
+        for animation in animations
+        for timeline in iter_timelines(animation)
+    )
+    assert set(report.max_errors["translate"]) == {"x", "y"}
+    assert set(report.max_errors["color"]) == {
+        "color.r",
+        "color.g",
+        "color.b",
+        "color.a",
+    }
+    assert max(report.max_errors["rotate"].values()) <= 0.5 + 1e-6
+    animation_editor.to_json_data()
+
+
+def _dense_errors(original, resampled, codec, fps=240):
+    start, end = get_time(original[0]), get_time(original[-1])
+    times = [start + frame / fps for frame in range(int((end - start) * fps) + 1)]
+    original_values = sample(
+        original, [codec.decode(keyframe) for keyframe in original], codec, times
+    )
+    resampled_values = sample(
+        resampled, [codec.decode(keyframe) for keyframe in resampled], codec, times
+    )
+    errors = [0.0] * len(codec.channel_names())
+    for a_values, b_values in zip(original_values, resampled_values):
+        for channel, (a, b) in enumerate(zip(a_values, b_values)):
+            difference = abs(wrap_angle(a - b)) if codec.angles else abs(a - b)
+            errors[channel] = max(errors[channel], difference)
+    return errors
+
+
+def test_resample_errors_between_samples():
+    animation_editor = SpineAnimationEditor.from_json_file(json_path=SPINE_JSON_PATH)
+    animations = animation_editor.spine_anim_data.data.animations
+    original_animations = copy.deepcopy(animations)
+
+    report = animation_editor.resample_animations(fps=30, tolerance=0.05)
+
+    # The tolerance holds at the samples only, the report measures between them too
+    measured = {}
+    for animation_id, animation in animations.items():
+        for timeline, original in zip(
+            iter_timelines(animation),
+            iter_timelines(original_animations[animation_id]),
+        ):
+            if len(original.keyframes) < 2:
+                continue
+            errors = _dense_errors(
+                original.keyframes, timeline.keyframes, timeline.codec
+            )
+            kind_errors = measured.setdefault(timeline.kind, {})
+            for channel, error in zip(timeline.codec.channel_names(), errors):
+                kind_errors[channel] = max(kind_errors.get(channel, 0.0), error)
+
+    assert report.max_errors["scale"]["x"] > 0.05
+    for kind, kind_errors in measured.items():
+        for channel, error in kind_errors.items():
+            assert report.max_errors[kind][channel] >= error - 1e-3
@@ -0,0 +1,297 @@
+from bisect import bisect_right
+from collections import namedtuple
+from typing import Any, Iterator, List, Sequence, Tuple
+
+from spine_json_lib.data.data_types.animation import Animation
+from spine_json_lib.optimizer.curves import curve_percent, interpolate
+
+# Timeline of an animation with interpolated values:
+# - kind: type of timeline ("rotate", "color", "ik", "deform"...)
+# - owner, attribute: where the list of keyframes is stored, owner[attribute] when
+#   owner is a dict and getattr(owner, attribute) when it is a SpineData
+# - keyframes: list of keyframes sorted by time
+# - codec: KeyframeCodec reading and writing the values of the keyframes
+TimelineEntry = namedtuple("TimelineEntry", "kind owner attribute keyframes codec")
+
+
+class KeyframeCodec(object):
+    """
+    Reads and writes as a tuple of floats (channels) the values a kind of keyframe
+    interpolates. Held attributes are not interpolated, they keep their value until
+    the next keyframe.
+    """
+
+    def __init__(
+        self,
+        attributes: Sequence[str],
+        defaults: Sequence[float],
+        angles: bool = False,
+        held_attributes: Sequence[str] = (),
+    ) -> None:
+        self.attributes = tuple(attributes)
+        self.defaults = tuple(defaults)
+        self.angles = angles
+        self.held_attributes = tuple(held_attributes)
+
+    def decode(self, keyframe: Any) -> Tuple[float, ...]:
+        return tuple(
+            float(default if value is None else value)
+            for value, default in zip(
+                (getattr(keyframe, attribute) for attribute in self.attributes),
+                self.defaults,
+            )
+        )
+
+    def encode(self, keyframe: Any, values: Sequence[float]) -> None:
+        for attribute, value in zip(self.attributes, values):
+            setattr(keyframe, attribute, value)
+
+    def held_values(self, keyframe: Any) -> Tuple[Any, ...]:
+        return tuple(getattr(keyframe, attribute) for attribute in self.held_attributes)
+
+    def channel_names(self) -> Tuple[str, ...]:
+        return self.attributes
+
+
+class ColorCodec(KeyframeCodec):
+    """Colors are hex strings (rrggbbaa or rrggbb), every component is a channel 0-1"""
+
+    def __init__(self, attributes: Sequence[str], defaults: Sequence[str]) -> None:
+        super(ColorCodec, self).__init__(attributes=attributes, defaults=())
+        self.color_defaults = tuple(defaults)
+
+    def decode(self, keyframe: Any) -> Tuple[float, ...]:
+        values = []
+        for attribute, default in zip(self.attributes, self.color_defaults):
+            color = getattr(keyframe, attribute) or default
+            values.extend(
+                int(color[idx : idx + 2], 16) / 255.0 for idx in range(0, len(color), 2)
+            )
+        return tuple(values)
+
+    def encode(self, keyframe: Any, values: Sequence[float]) -> None:
+        position = 0
+        for attribute, default in zip(self.attributes, self.color_defaults):
+            components = len(default) // 2
+            setattr(
+                keyframe,
+                attribute,
+                "".join(
+                    "{:02x}".format(int(round(min(max(value, 0.0), 1.0) * 255)))
+                    for value in values[position : position + components]
+                ),
+            )
+            position += components
+
+    def channel_names(self) -> Tuple[str, ...]:
+        return tuple(
+            "{}.{}".format(attribute, component)
+            for attribute, default in zip(self.attributes, self.color_defaults)
+            for component in "rgba"[: len(default) // 2]
+        )
+
+
+class DeformCodec(KeyframeCodec):
+    """
+    Every vertex value of a deform is a channel, vertices before offset and after the
+    ones stored are 0
+    """
+
+    def __init__(self, size: int) -> None:
+        super(DeformCodec, self).__init__(attributes=(), defaults=())
+        self.size = size
+
+    @staticmethod
+    def get_offset(keyframe: Any) -> int:
+        # Missing offsets take the default value of the class, an empty list
+        offset = keyframe.offset
+        return offset if isinstance(offset, int) and not isinstance(offset, bool) else 0
+
+    @staticmethod
+    def get_size(keyframe: Any) -> int:
+        return DeformCodec.get_offset(keyframe) + len(keyframe.vertices or ())
+
+    def decode(self, keyframe: Any) -> Tuple[float, ...]:
+        offset = self.get_offset(keyframe)
+        vertices = keyframe.vertices or ()
+        values = [0.0] * self.size
+        values[offset : offset + len(vertices)] = [float(value) for value in vertices]
+        return tuple(values)
+
+    def encode(self, keyframe: Any, values: Sequence[float]) -> None:
+        """Stores only the vertices between the first and the last not 0"""
+        non_zero = [idx for idx, value in enumerate(values) if value != 0]
+        if not non_zero:
+            keyframe.offset = None
+            keyframe.vertices = None
+            return
+
+        first, last = non_zero[0], non_zero[-1]
+        keyframe.offset = first or None
+        keyframe.vertices = list(values[first : last + 1])
+
+    def channel_names(self) -> Tuple[str, ...]:
+        # Vertices are reported together, their number changes between meshes
+        return ("vertices",) * self.size
+
+
+ROTATE_CODEC = KeyframeCodec(attributes=("angle",), defaults=(0,), angles=True)
+TRANSLATE_CODEC = KeyframeCodec(attributes=("x", "y"), defaults=(0, 0))
+SCALE_CODEC = KeyframeCodec(attributes=("x", "y"), defaults=(1, 1))
+SHEAR_CODEC = TRANSLATE_CODEC
+COLOR_CODEC = ColorCodec(attributes=("color",), defaults=("ffffffff",))
+TWO_COLOR_CODEC = ColorCodec(
+    attributes=("light", "dark"), defaults=("ffffffff", "000000")
+)
+IK_CODEC = KeyframeCodec(
+    attributes=("mix",),
+    defaults=(1,),
+    held_attributes=("bendPositive", "compress", "stretch"),
+)
+TRANSFORM_CODEC = KeyframeCodec(
+    attributes=("rotateMix", "translateMix", "scaleMix", "shearMix"),
+    defaults=(1, 1, 1, 1),
+)
+PATH_CODECS = {
+    "position": KeyframeCodec(attributes=("position",), defaults=(0,)),
+    "spacing": KeyframeCodec(attributes=("spacing",), defaults=(1,)),
+    "mix": KeyframeCodec(attributes=("rotateMix", "translateMix"), defaults=(1, 1)),
+}
+BONE_CODECS = {
+    "rotate": ROTATE_CODEC,
+    "translate": TRANSLATE_CODEC,
+    "scale": SCALE_CODEC,
+    "shear": SHEAR_CODEC,
+}
+SLOT_CODECS = {"color": COLOR_CODEC, "twoColor": TWO_COLOR_CODEC}
+
+
+def iter_timelines(animation: Animation) -> Iterator[TimelineEntry]:
+    """Every timeline of an animation with values interpolated between keyframes"""
+    for bone_timeline in animation.bones.values():
+        for kind, codec in BONE_CODECS.items():
+            keyframes = getattr(bone_timeline, kind)
+            if keyframes:
+                yield TimelineEntry(kind, bone_timeline, kind, keyframes, codec)
+
+    for slot_timeline in animation.slots.values():
+        for kind, codec in SLOT_CODECS.items():
+            keyframes = getattr(slot_timeline, kind)
+            if keyframes:
+                yield TimelineEntry(kind, slot_timeline, kind, keyframes, codec)
+
+    for ik_id, keyframes in animation.ik.items():
+        if keyframes:
+            yield TimelineEntry("ik", animation.ik, ik_id, keyframes, IK_CODEC)
+
+    for transform_id, keyframes in animation.transform.items():
+        if keyframes:
+            yield TimelineEntry(
+                "transform",
+                animation.transform,
+                transform_id,
+                keyframes,
+                TRANSFORM_CODEC,
+            )
+
+    for path_timelines in animation.path.values():
+        for kind, keyframes in path_timelines.items():
+            if keyframes and kind in PATH_CODECS:
+                yield TimelineEntry(
+                    kind, path_timelines, kind, keyframes, PATH_CODECS[kind]
+                )
+
+    for skin_deform in animation.deform.values():
+        for slot_deform in skin_deform.values():
+            for attachment_id, keyframes in slot_deform.items():
+                if keyframes:
+                    size = max(DeformCodec.get_size(keyframe) for keyframe in keyframes)
+                    codec = DeformCodec(size=size)
+                    yield TimelineEntry(
+                        "deform", slot_deform, attachment_id, keyframes, codec
+                    )
+
+
+def iter_keyframe_lists(animation: Animation) -> Iterator[List[Any]]:
+    """Keyframes of every timeline of an animation, including the not interpolated"""
+    for timeline in list(animation.bones.values()) + list(animation.slots.values()):
+        for keyframes in vars(timeline).values():
+            if isinstance(keyframes, list):
+                yield keyframes
+    yield from animation.ik.values()
+    yield from animation.transform.values()
+    for path_timelines in animation.path.values():
+        yield from path_timelines.values()
+    for skin_deform in animation.deform.values():
+        for slot_deform in skin_deform.values():
+            yield from slot_deform.values()
+    yield animation.events
+    yield animation.drawOrder
+
+
+def set_keyframes(timeline: TimelineEntry, keyframes: List[Any]) -> None:
+    if isinstance(timeline.owner, dict):
+        timeline.owner[timeline.attribute] = keyframes
+    else:
+        setattr(timeline.owner, timeline.attribute, keyframes)
+
+
+def get_time(keyframe: Any) -> float:
+    return keyframe.time or 0.0
+
+
+def evaluate(
+    keyframes: Sequence[Any],
+    values: Sequence[Tuple[float, ...]],
+    codec: KeyframeCodec,
+    time: float,
+) -> Tuple[float, ...]:
+    """
+    Values of a timeline at a time given its keyframes and their decoded values,
+    before the first keyframe and after the last one their values are kept
+    """
+    times = [get_time(keyframe) for keyframe in keyframes]
+    index = bisect_right(times, time) - 1
+    if index < 0:
+        return tuple(values[0])
+    if index >= len(keyframes) - 1:
+        return tuple(values[-1])
+
+    return _interpolate_segment(keyframes, times, values, codec, index, time)
+
+
+def sample(
+    keyframes: Sequence[Any],
+    values: Sequence[Tuple[float, ...]],
+    codec: KeyframeCodec,
+    sample_times: Sequence[float],
+) -> List[Tuple[float, ...]]:
+    """Same as evaluate for a sorted list of times, walking the keyframes once"""
+    times = [get_time(keyframe) for keyframe in keyframes]
+    samples = []
+    index = -1
+    for time in sample_times:
+        while index + 1 < len(times) and times[index + 1] <= time:
+            index += 1
+        if index < 0:
+            samples.append(tuple(values[0]))
+        elif index >= len(keyframes) - 1:
+            samples.append(tuple(values[-1]))
+        else:
+            samples.append(
+                _interpolate_segment(keyframes, times, values, codec, index, time)
+            )
+    return samples
+
+
+def _interpolate_segment(
+    keyframes: Sequence[Any],
+    times: Sequence[float],
+    values: Sequence[Tuple[float, ...]],
+    codec: KeyframeCodec,
+    index: int,
+    time: float,
+) -> Tuple[float, ...]:
+    fraction = (time - times[index]) / (times[index + 1] - times[index])
+    percent = curve_percent(keyframes[index], fraction)
+    return interpolate(values[index], values[index + 1], percent, codec.angles)
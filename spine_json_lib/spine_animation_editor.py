@@ -3,16 +3,33 @@ import json
 import os
 from collections import namedtuple
 
-from typing import List, TypeVar
+from typing import Any, Dict, List, Optional, Set, TypeVar
 
 from spine_json_lib.data.constants import SPINE_3_8_VERSION
 from spine_json_lib.data.data_types.bone import Bone
+from spine_json_lib.data.data_types.draworder import DrawOrderRemap
 from spine_json_lib.data.data_types.ik import Ik
 from spine_json_lib.data.data_types.skin import SkinPath
 from spine_json_lib.data.data_types.slot import Slot
+from spine_json_lib.data.float_precision import FloatPrecision
 from spine_json_lib.data.spine_anim_data import JsonSpineAnimationData
 from spine_json_lib.data.spine_exceptions import SpineJsonEditorError
-from spine_json_lib.deserializer.spine_nodes import SpineGraphParser, NodeType
+from spine_json_lib.deserializer.spine_nodes import (
+    SpineGraphParser,
+    NodeType,
+    IMAGE_TYPE,
+)
+from spine_json_lib.erase_plan import EraseIndex, ErasePlan
+from spine_json_lib.keep_subset import KeptSubset, keep_subset
+from spine_json_lib.optimizer.bones import remove_unreferenced_bones
+from spine_json_lib.optimizer.deform import DeformReport, sparsify_animations_deforms
+from spine_json_lib.optimizer.influences import InfluenceReport, limit_bone_influences
+from spine_json_lib.optimizer.keyframes import remove_animations_redundant_keyframes
+from spine_json_lib.optimizer.resample import (
+    DEFAULT_FPS,
+    ResampleReport,
+    resample_animations,
+)
 from spine_json_lib.spine_graph_container import SpineGraphContainer
 
 ANIMATION_EMPTY_ATTACHMENT = {"time": 0, "name": None}
@@ -55,6 +72,7 @@ class SpineAnimationEditor(object):
 
         json_data = self.spine_anim_data.to_json_data()
         self.spine_graph = SpineGraphContainer(json_data)
+        self._erase_index = None
 
     @staticmethod
     def from_json_file(json_path: str) -> SpineAnimationEditorType:
@@ -63,19 +81,69 @@ class SpineAnimationEditor(object):
 
         return SpineAnimationEditor(json_data=spine_json_data)
 
+    def plan_erase(
+        self,
+        animations: Optional[List[str]] = None,
+        skins: Optional[List[str]] = None,
+        strict_mode: bool = True,
+    ) -> ErasePlan:
+        """
+        Dry run of erasing the skins and then the animations given, cleaning the
+        animation afterwards. Returns what would be removed without modifying anything:
+        - slots and images ids
+        - (skin, slot, attachment) entries of the skins kept
+        - (animation, skin, slot, attachment) deform entries of the animations kept
+        The indexes used are built on the first call and reused until the animation is
+        modified through the editor.
+        """
+        animations = animations or []
+        skins = skins or []
+
+        not_found_animations = [
+            animation_name
+            for animation_name in animations
+            if animation_name not in self.spine_anim_data.data.animations
+        ]
+        if not_found_animations and strict_mode:
+            raise ValueError(
+                "Animations with ids {} could not be found inside the spine file".format(
+                    not_found_animations
+                )
+            )
+        for skin_name in skins:
+            if self.spine_anim_data.data.get_skin(skin_name) is None:
+                raise SpineJsonEditorError(
+                    message="Trying to remove skin with name {} but was not found".format(
+                        skin_name
+                    )
+                )
+
+        if self._erase_index is None:
+            self._erase_index = EraseIndex(
+                self.spine_anim_data.data, self.spine_graph.graph
+            )
+        return self._erase_index.plan(
+            animations=animations, skins=skins, images_references=self.images_references
+        )
+
+    def invalidate_erase_index(self) -> None:
+        """Call it after modifying the animation data or graph outside the editor"""
+        self._erase_index = None
+
     def erase_skins(self, skins_to_erase, is_safe_mode=False):
-        images_skins_refs = []
-        skin_attachments_removed = {}
-        for skin_name in skins_to_erase:
-            (
-                skin_removed_images,
-                attachments_removed,
-            ) = self.spine_anim_data.data.remove_skin(skin_name=skin_name)
-            images_skins_refs += skin_removed_images
-            skin_attachments_removed[skin_name] = attachments_removed
+        self.invalidate_erase_index()
+        skins = {
+            skin_name: self.spine_anim_data.data.get_skin(skin_name)
+            for skin_name in skins_to_erase
+        }
+        (
+            images_skins_refs,
+            skin_attachments_removed,
+        ) = self.spine_anim_data.data.remove_skins(skin_names=skins_to_erase)
 
-        json_data = self.spine_anim_data.to_json_data()
-        self.spine_graph = SpineGraphContainer(json_data)
+        # Update the graph in place instead of building it again
+        for skin in skins.values():
+            self.spine_graph.remove_skin(skin.attachments)
 
         # Flattening images refs in skins
         for skin_name, attachments in skin_attachments_removed.items():
@@ -84,14 +152,11 @@ class SpineAnimationEditor(object):
                     images_skins_refs.append(attachment_path)
 
         # Check which attachments are not being used in the remaining skins
-        images_to_remove = []
-
-        for img in images_skins_refs:
-            image_graph_id = SpineGraphParser._to_graph_id(
-                node_type_name=NodeType.IMAGE.name, node_base_id=img
-            )
-            if not self.spine_graph.graph.get_node(image_graph_id):
-                images_to_remove.append(img)
+        images_to_remove = [
+            img
+            for img in images_skins_refs
+            if not self.spine_graph.graph.get_node((IMAGE_TYPE, img))
+        ]
 
         if is_safe_mode:
             removed_data = [], []
@@ -107,20 +172,13 @@ class SpineAnimationEditor(object):
         strict_mode: bool = True,
         is_safe_mode=False,
     ) -> ErasingResult:
-        if self.images_references is None:
-            raise SpineJsonEditorError(
-                message="Internal value error: 'images_json' not initialized"
-            )
-
-        if not isinstance(animations_to_erase, list):
-            raise TypeError(
-                "animations_to_erase needs to be a list of the animation ids to erase"
-            )
-
-        self._erase_raw_animations_data(
-            animations_to_erase=animations_to_erase, strict_mode=strict_mode
+        self._check_animations_ids(
+            animations_to_erase, strict_mode=strict_mode, action="erase"
         )
 
+        self.invalidate_erase_index()
+        self._erase_raw_animations_data(animations_to_erase=animations_to_erase)
+
         # After removing animations we have to clean references to slots/attachments
         # that were only used only in the part of the animations removed
         # or are not visible anymore
@@ -130,6 +188,49 @@ class SpineAnimationEditor(object):
             removed_data = self.clean_animation()
         return ErasingResult(self.spine_anim_data.to_json_data(), removed_data)
 
+    def keep_animations(
+        self,
+        animations_to_keep: List[str],
+        strict_mode: bool = True,
+        is_safe_mode=False,
+    ) -> ErasingResult:
+        """
+        Erase every animation but the ones in animations_to_keep, with the same result
+        as erase_animations. The skeleton is built from the animations kept: the
+        discarded ones are never visited and only the slots, attachments, deforms and
+        images of what is kept are walked, without cleaning the graph.
+        """
+        self._check_animations_ids(
+            animations_to_keep, strict_mode=strict_mode, action="keep"
+        )
+        kept_subset = self._keep_subset(
+            animations=animations_to_keep, skins=None, is_safe_mode=is_safe_mode
+        )
+        return ErasingResult(
+            self.spine_anim_data.to_json_data(),
+            (kept_subset.slots, kept_subset.attachments),
+        )
+
+    def keep_skins(self, skins_to_keep, is_safe_mode=False):
+        """
+        Erase every skin but the ones in skins_to_keep, with the same result as
+        erase_skins, see keep_animations. The images returned are every image removed
+        from the images references.
+        """
+        skins_names = [skin.name for skin in self.spine_anim_data.data.skins]
+        for skin_name in skins_to_keep:
+            if skin_name not in skins_names:
+                raise SpineJsonEditorError(
+                    message="Trying to keep skin with name {} but was not found".format(
+                        skin_name
+                    )
+                )
+
+        kept_subset = self._keep_subset(
+            animations=None, skins=skins_to_keep, is_safe_mode=is_safe_mode
+        )
+        return (kept_subset.slots, kept_subset.attachments), sorted(kept_subset.images)
+
     def clean_animation(self):
         """
         - This method clean empty SLOTS and ATTACHMENTS that are not being
@@ -139,11 +240,13 @@ class SpineAnimationEditor(object):
         - Also we recursively look for slots that are leaves in the animation
         meaning that they have not any attachment attached and can be safely removed.
         - We cannot remove BONES because it affect the weight on meshes and the vertices
-        information saved in the binary.
+        information saved in the binary. remove_unreferenced_bones() removes the ones
+        nothing uses updating the weights.
         """
+        self.invalidate_erase_index()
         # Save slots before removing. Needed to recalculate offsets when removing
         # slots in a drawOrder array.
-        slots_before_removing = copy.deepcopy(self.spine_anim_data.data.slots)
+        slots_before_removing = list(self.spine_anim_data.data.slots)
         (
             slots_to_remove,
             attachments_to_remove,
@@ -190,14 +293,28 @@ class SpineAnimationEditor(object):
         return list(slots_to_remove), attachments_to_remove
 
     def remove_slots(self, slots_ids, original_slots):
+        self.invalidate_erase_index()
         self._clean_slots_in_skins(slots_ids)
         self._clean_slots_in_animations(slots_ids)
         self._clean_draw_order_refs(slots_ids, original_slots)
 
     def remove_attachments(self, attachments_ids):
+        self.invalidate_erase_index()
         self._clean_attachments_in_skins(attachment_ids=attachments_ids)
         self._clean_attachments_in_slots(attachments_ids=attachments_ids)
 
+    def remove_unreferenced_bones(self) -> List[str]:
+        """
+        Remove recursively the bones without children not used by any slot,
+        constraint, animation or weighted vertex, remapping the bone indexes of the
+        weighted vertices.
+        :return: names of the bones removed
+        """
+        self.invalidate_erase_index()
+        bones_removed = remove_unreferenced_bones(self.spine_anim_data.data)
+        self.spine_graph.remove_bones(bones_removed)
+        return bones_removed
+
     def scale_animation(self, scaleX, scaleY):
         # To scale the animation we have to scale the root bone,
         # but also all the bones with 'noScale', 'onlyTranslation' and 'noScaleOrReflection'
@@ -209,20 +326,68 @@ class SpineAnimationEditor(object):
                 bone.scale(scaleX=scaleX, scaleY=scaleY)
         spine_data.get_bone("root").scale(scaleX=scaleX, scaleY=scaleY)
 
+    def remove_redundant_keyframes(self, epsilon: float = 0.0) -> Dict[str, int]:
+        """
+        Remove the keyframes of every animation that interpolating the keyframes
+        around them reproduces with an error of at most epsilon
+        :return: number of keyframes removed by type of timeline
+        """
+        return remove_animations_redundant_keyframes(
+            self.spine_anim_data.data.animations.values(), epsilon=epsilon
+        )
+
+    def resample_animations(
+        self, fps: float = DEFAULT_FPS, tolerance: Optional[float] = None
+    ) -> ResampleReport:
+        """
+        Replace the keyframes of every animation by linear keyframes every 1 / fps
+        seconds, or only where needed to keep the error under tolerance if given.
+        The tolerance is checked at the frames and the original keyframes, the
+        report measures the errors between them too
+        """
+        return resample_animations(
+            self.spine_anim_data.data.animations.values(), fps=fps, tolerance=tolerance
+        )
+
+    def sparsify_deforms(self) -> DeformReport:
+        """
+        Store only the vertices that differ from the setup mesh in every deform
+        keyframe and remove the deform keyframes and timelines that do nothing
+        """
+        self.invalidate_erase_index()
+        return sparsify_animations_deforms(
+            self.spine_anim_data.data.animations.values()
+        )
+
+    def limit_bone_influences(self, max_influences: int) -> InfluenceReport:
+        """
+        Keep at most max_influences bones moving every vertex of the weighted meshes,
+        the ones with more weight, and adapt the deform timelines of the meshes
+        """
+        return limit_bone_influences(
+            self.spine_anim_data.data.skins,
+            self.spine_anim_data.data.animations.values(),
+            max_influences=max_influences,
+        )
+
     @property
     def spine_version(self):
         return self.spine_anim_data.spine_version
 
-    def to_json_data(self):
-        return self.spine_anim_data.to_json_data()
+    def to_json_data(self, precision: Optional[FloatPrecision] = None):
+        """
+        :param precision: decimals of the floats written by class of field, the bytes
+            saved are added to precision.bytes_saved
+        """
+        return self.spine_anim_data.to_json_data(precision=precision)
 
-    def to_json(self, output_json):
+    def to_json(self, output_json, precision: Optional[FloatPrecision] = None):
         base_dir = os.path.dirname(output_json)
         if not os.path.isdir(base_dir):
             os.makedirs(base_dir)
 
         with open(output_json, "w") as outfile:
-            json.dump(self.to_json_data(), outfile, indent=4)
+            json.dump(self.to_json_data(precision=precision), outfile, indent=4)
 
     def get_images_references(self):
         paths = {}
@@ -260,17 +425,95 @@ class SpineAnimationEditor(object):
         with open(images_json, "w") as outfile:
             json.dump(self.images_references, outfile)
 
-    def _erase_raw_animations_data(
-        self, animations_to_erase: List[str], strict_mode: bool
+    def get_animations_manifest(self) -> Dict[str, Any]:
+        """
+        Dependencies of every animation, to preload only the images each one needs:
+        - slots: slots keyed in its slot or deform timelines
+        - attachments: attachments it can show, setup ones of its visible slots included
+        - images: ids of the images those attachments use in any skin
+        Images are listed once in "images" with the same data as images_references,
+        so the scale tags of the slots are honored.
+        """
+        spine_data = self.spine_anim_data.data
+        graph = self.spine_graph.graph
+
+        # Images used by every attachment of a slot in any skin
+        slots_images: Dict[str, Dict[str, Set[str]]] = {}
+        for skin in spine_data.skins:
+            for slot_id, slot_attachments in skin.attachments.items():
+                for attachment_id, attachment in slot_attachments.items():
+                    if isinstance(attachment, SkinPath):
+                        continue
+                    image_id = attachment.path or attachment.name or attachment_id
+                    if (
+                        image_id in self.images_references
+                        and graph.get_node((IMAGE_TYPE, image_id)) is not None
+                    ):
+                        slots_images.setdefault(slot_id, {}).setdefault(
+                            attachment_id, set()
+                        ).add(image_id)
+
+        images = set()
+        animations = {}
+        shown_attachments = spine_data.get_animations_shown_attachments()
+        for anim_id, anim_attachments in shown_attachments.items():
+            anim_data = spine_data.animations[anim_id]
+            keyed_slots = set(anim_data.slots)
+            for skin_deform in anim_data.deform.values():
+                keyed_slots.update(skin_deform)
+
+            anim_images = set()
+            for slot_id, attachments in anim_attachments.items():
+                slot_images = slots_images.get(slot_id, {})
+                for attachment_id in attachments:
+                    anim_images.update(slot_images.get(attachment_id, ()))
+            images |= anim_images
+
+            animations[anim_id] = {
+                "slots": sorted(keyed_slots),
+                "attachments": sorted(
+                    {
+                        attachment_id
+                        for attachments in anim_attachments.values()
+                        for attachment_id in attachments
+                    }
+                ),
+                "images": sorted(anim_images),
+            }
+
+        return {
+            "images": {
+                image_id: self.images_references[image_id]
+                for image_id in sorted(images)
+            },
+            "animations": animations,
+        }
+
+    def save_animations_manifest(self, manifest_json):
+        base_dir = os.path.dirname(manifest_json)
+        if not os.path.isdir(base_dir):
+            os.makedirs(base_dir)
+
+        with open(manifest_json, "w") as outfile:
+            json.dump(self.get_animations_manifest(), outfile, separators=(",", ":"))
+
+    def _check_animations_ids(
+        self, animations_ids: List[str], strict_mode: bool, action: str
     ) -> None:
-        # Erasing animation from the json
-        not_found_animations = []
-        for animation_name in animations_to_erase:
-            if animation_name in self.spine_anim_data.data.animations:
-                del self.spine_anim_data.data.animations[animation_name]
-            else:
-                not_found_animations.append(animation_name)
+        if self.images_references is None:
+            raise SpineJsonEditorError(
+                message="Internal value error: 'images_json' not initialized"
+            )
+
+        if not isinstance(animations_ids, list):
+            message = "animations_to_{0} needs to be a list of the animation ids to {0}"
+            raise TypeError(message.format(action))
 
+        not_found_animations = [
+            animation_name
+            for animation_name in animations_ids
+            if animation_name not in self.spine_anim_data.data.animations
+        ]
         if not_found_animations and strict_mode:
             raise ValueError(
                 "Animations with ids {} could not be found inside the spine file".format(
@@ -278,19 +521,45 @@ class SpineAnimationEditor(object):
                 )
             )
 
+    def _keep_subset(
+        self,
+        animations: Optional[List[str]],
+        skins: Optional[List[str]],
+        is_safe_mode: bool,
+    ) -> KeptSubset:
+        self.invalidate_erase_index()
+        if skins is not None:
+            kept_skins = frozenset(skins)
+            for skin in self.spine_anim_data.data.skins:
+                if skin.name not in kept_skins:
+                    self.spine_graph.remove_skin(skin.attachments)
+
+        kept_subset = keep_subset(
+            self.spine_anim_data.data,
+            animations=animations,
+            skins=skins,
+            clean=not is_safe_mode,
+        )
+        self.spine_graph.prune_slots_and_attachments(
+            kept_subset.slots, list(kept_subset.attachments)
+        )
+        self._clean_images_references(images_ids=sorted(kept_subset.images))
+        return kept_subset
+
+    def _erase_raw_animations_data(self, animations_to_erase: List[str]) -> None:
+        # Erasing animation from the json, ids not found were already checked
+        for animation_name in animations_to_erase:
+            self.spine_anim_data.data.animations.pop(animation_name, None)
+
     def _clean_images_references(self, images_ids: List[str]) -> None:
-        copy_json = copy.deepcopy(self.images_references)
         removed_images = []
-        for img_id, img_abs_path in self.images_references.items():
-            if img_id in images_ids:
+        for img_id in images_ids:
+            if self.images_references.pop(img_id, None) is not None:
                 removed_images.append(img_id)
-                del copy_json[img_id]
 
         if removed_images:
             print("Removed images: {}".format(removed_images))
 
-        self.images_references = copy_json
-
     def _clean_slots_in_skins(self, slots_ids: List[str]) -> None:
         skins_data = copy.deepcopy(self.spine_anim_data.data.skins)
         for index_skin, data in enumerate(self.spine_anim_data.data.skins):
@@ -326,12 +595,11 @@ class SpineAnimationEditor(object):
         copy_slots_data = copy.deepcopy(self.spine_anim_data.data.slots)
         for slot_idx, slot_data in enumerate(self.spine_anim_data.data.slots):
             default_attachment_id = slot_data.get("attachment")
-            if default_attachment_id is not None:
-                attachment_graph_id = SpineGraphParser._to_graph_id(
-                    NodeType.ATTACHMENT.name, default_attachment_id
-                )
-                if attachment_graph_id in attachments_ids:
-                    copy_slots_data[slot_idx].attachment = None
+            if (
+                default_attachment_id is not None
+                and default_attachment_id in attachments_ids
+            ):
+                copy_slots_data[slot_idx].attachment = None
 
         self.spine_anim_data.data.slots = copy_slots_data
 
@@ -347,7 +615,6 @@ class SpineAnimationEditor(object):
     def _clean_draw_order_refs(
         self, slots_ids: List[str], original_slots: List[Slot]
     ) -> None:
+        remap = DrawOrderRemap([slot.name for slot in original_slots], slots_ids)
         for animation in self.spine_anim_data.data.animations.values():
-            animation.remove_draw_order_with_ids(
-                slots_ids=slots_ids, original_slots=original_slots
-            )
+            animation.remap_draw_order(remap)
@@ -1,9 +1,14 @@
 from typing import List, Dict, Any, Tuple
 
 from spine_json_lib.deserializer.spine_nodes import (
+    SpineGraph,
     SpineGraphParser,
     SpineNodeFactory,
-    NodeType,
+    ATTACHMENT_TYPE,
+    BONE_TYPE,
+    IMAGE_TYPE,
+    SLOT_TYPE,
+    SpineGraphId,
 )
 
 from spine_json_lib.graph.spamnode import SpamNode
@@ -11,11 +16,15 @@ from spine_json_lib.graph.spamnode import SpamNode
 
 class SpineGraphContainer(object):
     def __init__(self, spine_json_data: Dict[str, Any]) -> None:
-        self.graph = SpineGraphParser.create_from_json_data(
+        self.graph: SpineGraph = SpineGraphParser.create_from_json_data(
             json_data=spine_json_data, node_factory=SpineNodeFactory()
         )
 
     def get_heads_with_type(self, node_type):
+        if node_type in SpineGraph.REF_COUNTED_TYPES:
+            # Reference counted nodes are heads only when orphaned
+            return self.graph.get_orphaned_ids(node_type=node_type)
+
         heads_nodes = self.graph.get_heads_id()
 
         return list(
@@ -33,12 +42,9 @@ class SpineGraphContainer(object):
         nodes_removed = []
         root_node = self.get_heads_with_type(node_type=type_name)
         while root_node:
+            # Graph ids are (node_type, base_id) keys
             nodes_removed += [
-                SpineGraphParser._to_base_id(
-                    node_type_name=type_name,
-                    graph_id=self.graph.remove_node_by_id(s_id).id,
-                )
-                for s_id in root_node
+                node.id[1] for node in self.graph.remove_nodes(root_node)
             ]
 
             root_node = self.get_heads_with_type(node_type=type_name)
@@ -64,39 +70,93 @@ class SpineGraphContainer(object):
         nodes_removed = []
         leaf_nodes = self.get_leafs_of_type(node_type=type_name)
         while leaf_nodes:
+            # Graph ids are (node_type, base_id) keys
             nodes_removed += [
-                SpineGraphParser._to_base_id(
-                    node_type_name=type_name,
-                    graph_id=self.graph.remove_node_by_id(s_id).id,
-                )
-                for s_id in leaf_nodes
+                node.id[1] for node in self.graph.remove_nodes(leaf_nodes)
             ]
 
             leaf_nodes = self.get_leafs_of_type(node_type=type_name)
         return nodes_removed
 
-    def remove_attachment(self, attachment_id: str) -> SpamNode:
+    def get_dependent_ids(
+        self, node_type: str, node_id: str, dependent_type: str
+    ) -> List[str]:
+        """
+        Ids of the nodes of type @dependent_type hanging from the node @node_id of type
+        @node_type, for example every IMAGE used under a BONE
+        """
+        reachability = self.graph.reachability()
+        return [
+            graph_id[1]
+            for graph_id in reachability.get_descendants_id(
+                (node_type, node_id), node_type=dependent_type
+            )
+        ]
+
+    def remove_skin(self, skin_attachments: Dict[str, Any]) -> Tuple[List[str], List[str]]:
+        """
+        Remove from graph the references of the attachments in a skin
+        (slot_id -> attachment_id -> attachment data) and prune the attachments
+        and images not used anymore.
+        :return: ids of the attachments and images removed
+        """
+        graph = self.graph
+        graph.checkpoint()
+        for slot_id, slot_attachments in skin_attachments.items():
+            slot_graph_id = (SLOT_TYPE, slot_id)
+            if graph.get_node(slot_graph_id) is None:
+                continue
+            for attachment_id, attachment_data in slot_attachments.items():
+                attachment_graph_id, image_graph_id = SpineGraphParser.skin_attachment_ids(
+                    attachment_id, attachment_data
+                )
+                graph.remove_reference(attachment_graph_id, image_graph_id)
+                graph.remove_reference(slot_graph_id, attachment_graph_id)
+
+        removed_attachments = graph.remove_nodes(
+            graph.get_orphaned_ids(node_type=ATTACHMENT_TYPE, since_checkpoint=True)
+        )
+        removed_images = graph.remove_nodes(
+            graph.get_orphaned_ids(node_type=IMAGE_TYPE, since_checkpoint=True)
+        )
+        return (
+            [node.id[1] for node in removed_attachments],
+            [node.id[1] for node in removed_images],
+        )
+
+    def remove_attachment(self, attachment_id: SpineGraphId) -> SpamNode:
         attachment_node = self.graph.get_node(attachment_id)
 
         self.graph.remove_node_by_id(attachment_id)
         return attachment_node
 
     def remove_attachments(self, attachment_ids: List[str]) -> List[SpamNode]:
-        removed_nodes = []
-        for attachment_id in attachment_ids:
-            graph_attachment_id = SpineGraphParser._to_graph_id(
-                NodeType.ATTACHMENT.name, attachment_id
-            )
-            removed_node = self.remove_attachment(graph_attachment_id)
-            removed_nodes.append(removed_node)
-        return removed_nodes
+        return self.graph.remove_nodes(
+            [(ATTACHMENT_TYPE, attachment_id) for attachment_id in attachment_ids]
+        )
 
     def remove_slots(self, slots_ids: List[str]) -> List[SpamNode]:
-        removed_slots = []
-        for slot_id in slots_ids:
-            slot_graph_id = SpineGraphParser._to_graph_id(
-                node_type_name=NodeType.SLOT.name, node_base_id=slot_id
-            )
-            slot = self.graph.remove_node_by_id(slot_graph_id)
-            removed_slots.append(slot)
-        return removed_slots
+        return self.graph.remove_nodes([(SLOT_TYPE, slot_id) for slot_id in slots_ids])
+
+    def remove_bones(self, bones_ids: List[str]) -> List[SpamNode]:
+        return self.graph.remove_nodes([(BONE_TYPE, bone_id) for bone_id in bones_ids])
+
+    def prune_slots_and_attachments(
+        self, slots_ids: List[str], attachment_ids: List[str]
+    ) -> None:
+        """
+        Remove slots and attachments and then the attachments and images left without
+        references, found from the reference counts instead of scanning the graph
+        """
+        graph = self.graph
+        nodes = graph._nodes
+        graph.remove_nodes(
+            [
+                node_id
+                for node_id in [(SLOT_TYPE, slot_id) for slot_id in slots_ids]
+                + [(ATTACHMENT_TYPE, attachment_id) for attachment_id in attachment_ids]
+                if node_id in nodes
+            ]
+        )
+        graph.remove_nodes(graph.get_orphaned_ids(node_type=ATTACHMENT_TYPE))
+        graph.remove_nodes(graph.get_orphaned_ids(node_type=IMAGE_TYPE))
@@ -0,0 +1,126 @@
+import json
+from collections import Counter, namedtuple
+from typing import Any, Dict, Iterable, Union
+
+from spine_json_lib.data.data_types.skin import MESH_TYPE, REGION_TYPE
+
+# Stats of an animation:
+# - duration: time of the last keyframe in seconds
+# - keyframes: number of keyframes by timeline type
+# - deform_keys, deform_values: number of deform keyframes and of vertex values in them
+AnimationStats = namedtuple(
+    "AnimationStats", "duration keyframes deform_keys deform_values"
+)
+
+# Stats of a skeleton, keyframes and deform numbers are the sum of every animation
+SkeletonStats = namedtuple(
+    "SkeletonStats",
+    "spine_version bones slots skins attachments mesh_vertices keyframes "
+    "animations deform_keys deform_values",
+)
+
+# Timelines keyed by bone/slot/path constraint name in the animations
+NESTED_TIMELINES = ("bones", "slots", "path")
+# Timelines keyed by constraint name
+CONSTRAINT_TIMELINES = ("ik", "transform")
+# Timelines that are a list of keyframes
+LIST_TIMELINES = ("events", "drawOrder")
+DEFORM_TIMELINE = "deform"
+
+
+def scan_stats(path_or_dict: Union[str, Dict[str, Any]]) -> SkeletonStats:
+    """
+    Counts of the elements of a spine json read straight from the json data, without
+    building the SpineData objects or the graph used by SpineAnimationEditor.
+    :param path_or_dict: path of the spine json file or its already loaded data
+    """
+    if isinstance(path_or_dict, str):
+        with open(path_or_dict) as f:
+            json_data = json.load(f)
+    else:
+        json_data = path_or_dict
+
+    skins = json_data.get("skins", [])
+    # Spine 3.8 skins are a list, previous versions use a dict by skin name
+    skins_attachments = (
+        [skin.get("attachments", {}) for skin in skins]
+        if isinstance(skins, list)
+        else list(skins.values())
+    )
+
+    attachments = Counter()
+    mesh_vertices = 0
+    for skin_attachments in skins_attachments:
+        for slot_attachments in skin_attachments.values():
+            for attachment in slot_attachments.values():
+                attachment_type = attachment.get("type", REGION_TYPE)
+                attachments[attachment_type] += 1
+                if attachment_type == MESH_TYPE:
+                    # uvs has 2 values for every vertex of the mesh, weighted or not
+                    mesh_vertices += len(attachment.get("uvs", ())) // 2
+
+    keyframes = Counter()
+    deform_keys = 0
+    deform_values = 0
+    animations = {}
+    for anim_id, anim_data in json_data.get("animations", {}).items():
+        anim_stats = _scan_animation(anim_data)
+        animations[anim_id] = anim_stats
+        keyframes.update(anim_stats.keyframes)
+        deform_keys += anim_stats.deform_keys
+        deform_values += anim_stats.deform_values
+
+    return SkeletonStats(
+        spine_version=json_data.get("skeleton", {}).get("spine"),
+        bones=len(json_data.get("bones", [])),
+        slots=len(json_data.get("slots", [])),
+        skins=len(skins),
+        attachments=dict(attachments),
+        mesh_vertices=mesh_vertices,
+        keyframes=dict(keyframes),
+        animations=animations,
+        deform_keys=deform_keys,
+        deform_values=deform_values,
+    )
+
+
+def _scan_animation(anim_data: Dict[str, Any]) -> AnimationStats:
+    keyframes = Counter()
+    duration = 0.0
+
+    def scan_keys(timeline_type: str, keys: Iterable[Dict[str, Any]]) -> None:
+        nonlocal duration
+        for key in keys:
+            keyframes[timeline_type] += 1
+            duration = max(duration, key.get("time", 0))
+
+    for timeline in NESTED_TIMELINES:
+        for timelines in anim_data.get(timeline, {}).values():
+            for timeline_type, keys in timelines.items():
+                scan_keys(timeline_type, keys)
+
+    for timeline in CONSTRAINT_TIMELINES:
+        for keys in anim_data.get(timeline, {}).values():
+            scan_keys(timeline, keys)
+
+    for timeline in LIST_TIMELINES:
+        scan_keys(timeline, anim_data.get(timeline, []))
+
+    deform_keys = 0
+    deform_values = 0
+    for skin_deform in anim_data.get(DEFORM_TIMELINE, {}).values():
+        for slot_deform in skin_deform.values():
+            for keys in slot_deform.values():
+                for key in keys:
+                    deform_keys += 1
+                    deform_values += len(key.get("vertices", ()))
+                    duration = max(duration, key.get("time", 0))
+    if deform_keys:
+        keyframes[DEFORM_TIMELINE] += deform_keys
+
+    return AnimationStats(
+        duration=duration,
+        keyframes=dict(keyframes),
+        deform_keys=deform_keys,
+        deform_values=deform_values,
+    )
@@ -0,0 +1,56 @@
+import json
+import os
+
+from spine_json_lib.data.float_precision import FloatPrecision
+from spine_json_lib.spine_animation_editor import SpineAnimationEditor
+
+SPINE_JSON_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data/original/elvira_original.json"
+)
+
+
+def _compact_size(json_data):
+    return len(json.dumps(json_data, separators=(",", ":")))
+
+
+def test_float_precision():
+    with open(SPINE_JSON_PATH) as f:
+        json_data = json.load(f)
+    json_data["bones"][1].update(
+        {"x": 12.345678901234, "rotation": 9.99999999, "scaleX": 1.00001}
+    )
+    json_data["animations"]["breathe"]["bones"]["character"] = {
+        "shear": [{"time": 0.333333333, "x": 1.23456}],
+        "translate": [{"time": 0.5, "x": 1.23456, "y": 2.0}],
+    }
+    animation_editor = SpineAnimationEditor(json_data=json_data)
+    original_data = animation_editor.to_json_data()
+
+    precision = FloatPrecision(positions=2, angles=1, scales=3, uvs=4, times=3)
+    result_data = animation_editor.to_json_data(precision=precision)
+
+    assert result_data["bones"][1] == {
+        "name": "character",
+        "parent": "root",
+        "x": 12.35,
+        "rotation": 10,
+    }
+    assert result_data["animations"]["breathe"]["bones"]["character"] == {
+        "shear": [{"time": 0.333, "x": 1.2}],
+        "translate": [{"time": 0.5, "x": 1.23, "y": 2}],
+    }
+
+    # Bone indexes and counts of weighted vertices are kept, weights untouched
+    mesh = result_data["skins"][1]["attachments"]["wing_l_5"]["wing_l_2"]
+    assert mesh["vertices"][:7] == [2, 74, 282.17, 1.58, 0.99996, 75, -134.99]
+    assert len(mesh["vertices"]) == len(
+        original_data["skins"][1]["attachments"]["wing_l_5"]["wing_l_2"]["vertices"]
+    )
+
+    assert sum(precision.bytes_saved.values()) == _compact_size(
+        original_data
+    ) - _compact_size(result_data)
+    assert precision.bytes_saved["scales"] > 0
+
+    # The result is a valid spine json
+    SpineAnimationEditor(json_data=result_data)
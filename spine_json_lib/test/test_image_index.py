@@ -0,0 +1,121 @@
+import json
+import os
+
+import pytest
+
+from spine_json_lib.image_index import ImageUsageIndex
+
+SPINE_JSON_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data/original/original.json"
+)
+SPINE_JSON_ERASE_SKIN_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data/original/masquerade_skeleton.json"
+)
+
+
+@pytest.fixture
+def fixture_project(tmp_path):
+    project_dir = str(tmp_path / "project")
+    os.makedirs(os.path.join(project_dir, "skeletons", "heroes"))
+    # Images of the skeletons are in the images folder of the project
+    for json_path, skeleton_path, images_path in [
+        (SPINE_JSON_PATH, "original.json", "../images/"),
+        (SPINE_JSON_ERASE_SKIN_PATH, "heroes/masquerade.json", "../../images/"),
+    ]:
+        with open(json_path) as f:
+            json_data = json.load(f)
+        json_data["skeleton"]["images"] = images_path
+        with open(os.path.join(project_dir, "skeletons", skeleton_path), "w") as f:
+            json.dump(json_data, f)
+    # Not every json is a skeleton
+    with open(os.path.join(project_dir, "skeletons", "config.json"), "w") as f:
+        json.dump({"pretty_print": False}, f)
+
+    images_dir = os.path.join(project_dir, "images")
+    os.makedirs(os.path.join(images_dir, "sherezar"))
+    for image_id in ["freepik", "not_used", "sherezar/head", "sherezar/old_head"]:
+        open(os.path.join(images_dir, image_id + ".png"), "w").close()
+    return project_dir
+
+
+def test_image_usage_index(fixture_project):
+    index = ImageUsageIndex.from_directory(os.path.join(fixture_project, "skeletons"))
+
+    assert index.get_skeletons() == ["heroes/masquerade.json", "original.json"]
+    assert index.get_unused_images(os.path.join(fixture_project, "images")) == [
+        "not_used",
+        "sherezar/old_head",
+    ]
+    assert index.get_image_usages("freepik") == {
+        "original.json": [
+            ("skin2", "freepik2[scale:0.1]", "freepik"),
+            ("skin3", "freepik2[scale:0.1]", "freepik"),
+        ]
+    }
+    assert "sherezar/head" in index.get_images_only_used_by_skin("basic")
+    assert "freepik" not in index.get_images_only_used_by_skin("basic")
+
+    # Images are looked for in the images folder of every skeleton
+    images_dir = os.path.join(fixture_project, "images")
+    other_images_dir = os.path.join(fixture_project, "other_images")
+    os.makedirs(other_images_dir)
+    for image_id in ["freepik", "not_used"]:
+        open(os.path.join(other_images_dir, image_id + ".png"), "w").close()
+    assert index.get_unused_images(other_images_dir) == ["freepik", "not_used"]
+
+    # Without skeleton.images the ids are looked for in the folder given
+    original_json = os.path.join(fixture_project, "skeletons", "original.json")
+    with open(original_json) as f:
+        json_data = json.load(f)
+    del json_data["skeleton"]["images"]
+    with open(original_json, "w") as f:
+        json.dump(json_data, f)
+    assert index.update() == ["original.json"]
+    assert "freepik" not in index.get_unused_images(other_images_dir)
+    assert "freepik" not in index.get_unused_images(images_dir)
+
+    parallel_index = ImageUsageIndex.from_directory(
+        os.path.join(fixture_project, "skeletons"), workers=2
+    )
+    assert parallel_index.files == index.files
+
+
+def test_image_usage_index_update(fixture_project, tmp_path):
+    skeletons_dir = os.path.join(fixture_project, "skeletons")
+    index = ImageUsageIndex.from_directory(skeletons_dir)
+    index_json = str(tmp_path / "index" / "images_index.json")
+    index.save(index_json)
+
+    # Nothing changed since the index was saved
+    index = ImageUsageIndex.load(index_json)
+    assert index.update() == []
+    assert "freepik" in index.get_used_images()
+
+    original_json = os.path.join(skeletons_dir, "original.json")
+    with open(original_json) as f:
+        json_data = json.load(f)
+    assert "freepik" not in index.get_images_only_used_by_skin("skin2")
+    for skin in json_data["skins"]:
+        if skin["name"] == "skin3":
+            skin["attachments"].pop("freepik2[scale:0.1]", None)
+    with open(original_json, "w") as f:
+        json.dump(json_data, f)
+
+    assert index.update() == ["original.json"]
+    assert "freepik" in index.get_images_only_used_by_skin("skin2")
+
+    for skin in json_data["skins"]:
+        skin["attachments"].pop("freepik2[scale:0.1]", None)
+    with open(original_json, "w") as f:
+        json.dump(json_data, f)
+
+    assert index.update() == ["original.json"]
+    assert "freepik" not in index.get_used_images()
+    assert "freepik" not in index.get_images_only_used_by_skin("skin2")
+    assert "freepik" in index.get_unused_images(os.path.join(fixture_project, "images"))
+
+    os.remove(os.path.join(skeletons_dir, "heroes", "masquerade.json"))
+    assert index.update() == []
+    assert index.get_skeletons() == ["original.json"]
+    assert index.get_image_usages("sherezar/head") == {}
+    assert "sherezar/head" not in index.get_images_only_used_by_skin("basic")
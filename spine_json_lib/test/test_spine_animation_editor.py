@@ -3,6 +3,9 @@ import os
 import pytest
 import json
 
+from spine_json_lib.data.data_types.bone import Bone
+from spine_json_lib.data.data_types.draworder import DrawOrderTimeline
+from spine_json_lib.data.data_types.slot import Slot
 from spine_json_lib.data.spine_exceptions import SpineParsingException
 from spine_json_lib.spine_animation_editor import SpineAnimationEditor
 from deepdiff import DeepDiff
@@ -212,6 +215,288 @@ class TestSpineAnimationEditor:
 
         assert DeepDiff(animation_editor.images_references, imgs_refs_expected) == {}
 
+    def test_animations_manifest(self, tmp_path):
+        animation_editor = SpineAnimationEditor.from_json_file(
+            json_path=SPINE_JSON_PATH
+        )
+        manifest = animation_editor.get_animations_manifest()
+
+        assert manifest["animations"] == {
+            "anim1": {
+                "slots": ["bone2_slot2[scale:2]", "bone3_slot_check_image"],
+                "attachments": ["freepik_copy", "image_1", "path", "unnamed"],
+                "images": ["freepik_copy", "image_1", "unnamed"],
+            },
+            "anim2": {
+                "slots": [
+                    "bone2_slot2[scale:2]",
+                    "freepik2[scale:0.1]",
+                    "freepik_copy",
+                    "path",
+                ],
+                "attachments": ["check_image", "freepik", "image_1", "unnamed"],
+                "images": ["check_image", "freepik", "image_1", "unnamed"],
+            },
+        }
+        # Same references, and scales, as the images json
+        assert manifest["images"] == {
+            image_id: animation_editor.images_references[image_id]
+            for image_id in manifest["animations"]["anim1"]["images"]
+            + manifest["animations"]["anim2"]["images"]
+        }
+        assert manifest["images"]["image_1"]["scale"] == 2.0
+
+        manifest_json = os.path.join(str(tmp_path), "manifest.json")
+        animation_editor.save_animations_manifest(manifest_json)
+        with open(manifest_json) as f:
+            assert json.load(f) == manifest
+
+    @pytest.mark.parametrize(
+        "json_path, animations, skins",
+        [
+            (SPINE_JSON_ERASE_SKIN_PATH, [], ["basic"]),
+            (SPINE_JSON_ERASE_PATH, ["breathe", "attack"], ["basic"]),
+            (SPINE_JSON_ERASE_PATH, ["walk"], ["basic", "l3"]),
+            (SPINE_JSON_PATH, ["anim1"], ["skin2"]),
+        ],
+    )
+    def test_plan_erase(self, json_path, animations, skins):
+        animation_editor = SpineAnimationEditor.from_json_file(json_path=json_path)
+        json_data = animation_editor.to_json_data()
+        images_references = dict(animation_editor.images_references)
+
+        plan = animation_editor.plan_erase(animations=animations, skins=skins)
+        assert DeepDiff(animation_editor.to_json_data(), json_data) == {}
+        assert animation_editor.images_references == images_references
+
+        def skins_entries(spine_data):
+            return {
+                (skin.name, slot_id, attachment_id)
+                for skin in spine_data.skins
+                for slot_id, slot_attachments in skin.attachments.items()
+                for attachment_id in slot_attachments
+                if skin.name not in skins
+            }
+
+        def deform_entries(spine_data):
+            return {
+                (anim_id, skin_id, slot_id, attachment_id)
+                for anim_id, anim in spine_data.animations.items()
+                for skin_id, skin_deform in anim.deform.items()
+                for slot_id, slot_deform in skin_deform.items()
+                for attachment_id in slot_deform
+                if anim_id not in animations
+            }
+
+        spine_data = animation_editor.spine_anim_data.data
+        entries_before = skins_entries(spine_data)
+        deforms_before = deform_entries(spine_data)
+
+        animation_editor.erase_skins(skins_to_erase=skins, is_safe_mode=True)
+        result = animation_editor.erase_animations(animations_to_erase=animations)
+        slots_removed, _ = result.result_summary
+
+        spine_data = animation_editor.spine_anim_data.data
+        assert plan.slots == sorted(slots_removed)
+        assert plan.attachments == sorted(entries_before - skins_entries(spine_data))
+        assert plan.images == sorted(
+            images_references.keys() - animation_editor.images_references.keys()
+        )
+        assert plan.deforms == sorted(deforms_before - deform_entries(spine_data))
+
+    def test_keep_animations(self, fixture_elvira_spine_json_data):
+        animation_editor = SpineAnimationEditor.from_json_file(
+            json_path=SPINE_JSON_ERASE_PATH
+        )
+        result = animation_editor.keep_animations(
+            animations_to_keep=["breathe", "walk", "attack_skill"]
+        )
+
+        # Same result as erasing the rest of animations
+        assert DeepDiff(fixture_elvira_spine_json_data, result.result_data_json) == {}
+        with open(ELVIRA_CLEANED_UP_IMAGES_JSON_PATH, "r") as f:
+            data_image_refs = json.load(f)
+        assert DeepDiff(animation_editor.images_references, data_image_refs) == {}
+
+        # The graph is left as erasing would do
+        erase_editor = SpineAnimationEditor.from_json_file(
+            json_path=SPINE_JSON_ERASE_PATH
+        )
+        erase_editor.erase_animations(
+            animations_to_erase=["attack", "special1", "levelup", "prone"]
+        )
+        assert (
+            erase_editor.get_animations_manifest()
+            == animation_editor.get_animations_manifest()
+        )
+
+        with pytest.raises(ValueError):
+            animation_editor.keep_animations(animations_to_keep=["attack"])
+
+    def test_keep_skins(self):
+        erase_editor = SpineAnimationEditor.from_json_file(
+            json_path=SPINE_JSON_ERASE_PATH
+        )
+        erase_editor.erase_skins(skins_to_erase=["basic", "l3"])
+
+        keep_editor = SpineAnimationEditor.from_json_file(
+            json_path=SPINE_JSON_ERASE_PATH
+        )
+        keep_editor.keep_skins(skins_to_keep=["default", "l2"])
+
+        assert DeepDiff(erase_editor.to_json_data(), keep_editor.to_json_data()) == {}
+        assert erase_editor.images_references == keep_editor.images_references
+        assert (
+            erase_editor.get_animations_manifest()
+            == keep_editor.get_animations_manifest()
+        )
+
+    def test_unused_slots_and_attachments(self):
+        animation_editor = SpineAnimationEditor.from_json_file(
+            json_path=SPINE_JSON_PATH
+        )
+        anim_data = animation_editor.spine_anim_data.data
+
+        slots, attachments = anim_data.get_unused_slots_and_attachments()
+        assert slots == frozenset(["bone2_slot1", "empty", "freepik"])
+        assert attachments == frozenset()
+
+        # Without animations no slot is ever visible, so every attachment is unused
+        anim_data.animations = {}
+        slots, attachments = anim_data.get_unused_slots_and_attachments()
+        assert slots == frozenset(slot.name for slot in anim_data.slots)
+        assert attachments == frozenset(
+            attachment_id
+            for skin in anim_data.skins
+            for slot_attachments in skin.attachments.values()
+            for attachment_id in slot_attachments
+        )
+
+    def test_visible_slots_and_attachments(self):
+        animation_editor = SpineAnimationEditor.from_json_file(
+            json_path=SPINE_JSON_PATH
+        )
+        anim_data = animation_editor.spine_anim_data.data
+        alpha_zero_slots = anim_data.get_slots_with_alpha_zero()
+        no_attachment_slots = anim_data.get_slots_not_visible_in_setup_pose()
+        default_visible_slots = frozenset(
+            slot.name for slot in anim_data.slots
+        ) - frozenset(alpha_zero_slots + no_attachment_slots)
+
+        visible_slots = frozenset()
+        used_attachments = frozenset()
+        for animation in anim_data.animations.values():
+            (
+                anim_visible_slots,
+                anim_used_attachments,
+            ) = anim_data.get_visible_slots_and_attachments(
+                anim_slots=animation.slots,
+                visible_slots=default_visible_slots,
+                alpha_zero_slots=alpha_zero_slots,
+                no_attachment_slots=no_attachment_slots,
+            )
+            assert all(
+                not anim_used_attachments[slot_id]
+                for slot_id in animation.slots
+                if slot_id not in anim_visible_slots
+            )
+            visible_slots |= anim_visible_slots
+            for attachments in anim_used_attachments.values():
+                used_attachments |= attachments
+
+        slots, attachments = anim_data.get_unused_slots_and_attachments()
+        assert slots == frozenset(slot.name for slot in anim_data.slots) - visible_slots
+        assert not attachments & used_attachments
+
+    def test_remove_attachments_clears_slots_default(self):
+        animation_editor = SpineAnimationEditor.from_json_file(
+            json_path=SPINE_JSON_PATH
+        )
+        anim_data = animation_editor.spine_anim_data.data
+        defaults = {
+            slot.name: slot.attachment
+            for slot in anim_data.slots
+            if slot.attachment is not None
+        }
+        slot_id, attachment_id = sorted(defaults.items())[0]
+
+        animation_editor.remove_attachments(attachments_ids=frozenset([attachment_id]))
+
+        # Slots showing an attachment removed have no default attachment anymore
+        assert {
+            slot.name: slot.attachment
+            for slot in anim_data.slots
+            if slot.attachment is not None
+        } == {
+            slot: attachment
+            for slot, attachment in defaults.items()
+            if attachment != attachment_id
+        }
+        assert "attachment" not in animation_editor.to_json_data()["slots"][
+            [slot.name for slot in anim_data.slots].index(slot_id)
+        ]
+
+    def test_custom_scales_cache(self):
+        animation_editor = SpineAnimationEditor.from_json_file(
+            json_path=SPINE_JSON_PATH
+        )
+        anim_data = animation_editor.spine_anim_data.data
+
+        slot = anim_data.get_slot("bone2_slot2[scale:2]")
+        assert anim_data.get_slot_custom_scale(slot) == 2.0
+
+        # Renaming a bone needs invalidating the scales already computed
+        bone = anim_data.get_bone("bone2")
+        bone.name = "bone2[scale:3]"
+        for slot_data in anim_data.slots:
+            if slot_data.bone == "bone2":
+                slot_data.bone = bone.name
+        anim_data.invalidate_hierarchy_cache()
+        assert anim_data.get_slot_custom_scale(slot) == 6.0
+
+        # Replacing the bones list or changing its length is found out
+        anim_data.bones = [b for b in anim_data.bones if b.name != "master[scale:0.5]"]
+        assert anim_data.get_bone("master[scale:0.5]") is None
+        anim_data.bones.append(Bone({"name": "new[scale:2]", "parent": "root"}))
+        assert anim_data.get_bone("new[scale:2]") is anim_data.bones[-1]
+        anim_data.slots.pop(anim_data.slots.index(slot))
+        assert anim_data.get_slot(slot.name) is None
+
+        # Caches of other skeletons are not affected
+        other_data = SpineAnimationEditor.from_json_file(
+            json_path=SPINE_JSON_PATH
+        ).spine_anim_data.data
+        assert other_data.get_slot_custom_scale(other_data.get_slot(slot.name)) == 2.0
+        other_data.get_bone("bone2").name = "bone2[scale:5]"
+        assert anim_data.get_slot_custom_scale(slot) == 6.0
+
+        # Cache is never serialized
+        json_data = animation_editor.to_json_data()
+        assert "_hierarchy_cache" not in json_data
+        assert any(b["name"] == "bone2[scale:3]" for b in json_data["bones"])
+
+    @pytest.mark.parametrize(
+        "offsets, slots_ids, expected_offsets",
+        [
+            # d, a, b, c -> d, b, c
+            ([{"slot": "d", "offset": -3}], ["a"], [("d", -2)]),
+            ([{"slot": "d", "offset": -3}], ["d"], []),
+            # b, a, c, d -> b, c, d so b is not moving anymore
+            ([{"slot": "a", "offset": 1}], ["a"], []),
+            (
+                [{"slot": "a", "offset": 1}, {"slot": "c", "offset": 1}],
+                ["b"],
+                [("c", 1)],
+            ),
+        ],
+    )
+    def test_draw_order_remove_offsets(self, offsets, slots_ids, expected_offsets):
+        slots = [Slot({"name": name, "bone": "root"}) for name in "abcd"]
+        draw_order = DrawOrderTimeline({"time": 0, "offsets": offsets})
+
+        draw_order.remove_offsets_with_ids(slots_ids, slots)
+        assert [(o.slot, o.offset) for o in draw_order.offsets] == expected_offsets
+
     def test_missing_required_offsets_attr(self):
         with open(SPINE_JSON_ERASE_SKIN_PATH) as f:
             spine_json_data = json.load(f)
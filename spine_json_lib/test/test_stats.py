@@ -0,0 +1,62 @@
+import json
+import os
+
+from spine_json_lib.spine_animation_editor import SpineAnimationEditor
+from spine_json_lib.stats import AnimationStats, scan_stats
+
+SPINE_JSON_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data/original/original.json"
+)
+SPINE_JSON_DEFORM_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data/original/elvira_original.json"
+)
+
+
+def test_scan_stats():
+    stats = scan_stats(SPINE_JSON_PATH)
+
+    assert stats.spine_version == "3.8.59"
+    assert (stats.bones, stats.slots, stats.skins) == (7, 8, 3)
+    assert stats.attachments == {"region": 6, "mesh": 1, "path": 1}
+    assert stats.mesh_vertices == 4
+    assert stats.keyframes == {"translate": 2, "shear": 1, "rotate": 1, "attachment": 7}
+    assert stats.animations == {
+        "anim1": AnimationStats(
+            duration=0.5,
+            keyframes={"translate": 2, "shear": 1, "attachment": 2},
+            deform_keys=0,
+            deform_values=0,
+        ),
+        "anim2": AnimationStats(
+            duration=0.7,
+            keyframes={"rotate": 1, "attachment": 5},
+            deform_keys=0,
+            deform_values=0,
+        ),
+    }
+
+
+def test_scan_stats_matches_model():
+    with open(SPINE_JSON_DEFORM_PATH) as f:
+        json_data = json.load(f)
+    stats = scan_stats(json_data)
+
+    spine_data = SpineAnimationEditor(json_data=json_data).spine_anim_data.data
+    assert stats.bones == len(spine_data.bones)
+    assert stats.slots == len(spine_data.slots)
+    assert sum(stats.attachments.values()) == sum(
+        len(slot_attachments)
+        for skin in spine_data.skins
+        for slot_attachments in skin.attachments.values()
+    )
+
+    deforms = [
+        deform
+        for anim in spine_data.animations.values()
+        for skin_deform in anim.deform.values()
+        for slot_deform in skin_deform.values()
+        for deform_keys in slot_deform.values()
+        for deform in deform_keys
+    ]
+    assert stats.deform_keys == len(deforms) > 0
+    assert stats.deform_values == sum(len(deform.vertices or []) for deform in deforms)
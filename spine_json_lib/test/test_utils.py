@@ -1,6 +1,6 @@
 import pytest
 
-from spine_json_lib.utils import get_tags_from_name
+from spine_json_lib.utils import get_tags_from_name, get_tags_from_names
 from deepdiff import DeepDiff
 
 
@@ -35,3 +35,25 @@ def test_wrong_type_tag_value():
         get_tags_from_name(bone_name)
 
     assert str(e.value) == f"could not convert string to float: '{invalid_tag_value}'"
+
+
+def test_get_tags_from_names():
+    names = ["bone", "bone[scale:2]", "slot[ scale : 0.5 ]", "bone[scale:2]"]
+    tags_result = get_tags_from_names(names)
+    assert tags_result == {
+        "bone": {},
+        "bone[scale:2]": {"scale": 2.0},
+        "slot[ scale : 0.5 ]": {"scale": 0.5},
+    }
+
+    # Parsed tags are cached but every call gets its own dict
+    tags_result["bone[scale:2]"]["scale"] = 3.0
+    assert get_tags_from_name("bone[scale:2]") == {"scale": 2.0}
+
+
+def test_get_tags_from_names_invalid():
+    names = ["bone", "bone1[unsupported : empty]"]
+    with pytest.raises(ValueError):
+        get_tags_from_names(names)
+
+    assert get_tags_from_names(names, skip_invalid=True) == {"bone": {}}
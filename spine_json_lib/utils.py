@@ -1,5 +1,6 @@
+import functools
 import re
-from typing import List, Any
+from typing import Any, Dict, Iterable, List
 
 SEPARATOR = ":"
 
@@ -12,6 +13,9 @@ SCALE_TAG = "scale"
 
 TAGS_SUPPORTED = {SCALE_TAG: TYPE_NUMBER}
 
+# Maximum number of different names with tags kept already parsed
+TAGS_CACHE_SIZE = 4096
+
 tag_detector = re.compile(r"\[\s*[\w0-9-]+\s*:\s*[\w0-9.\s]+\s*\]")
 
 
@@ -46,6 +50,14 @@ def cast_element(value, value_type):
 
 
 def get_tags_from_name(name):
+    # Most names have no tags at all, skip the regex for them
+    if "[" not in name:
+        return {}
+    return dict(_parse_tags_from_name(name))
+
+
+@functools.lru_cache(maxsize=TAGS_CACHE_SIZE)
+def _parse_tags_from_name(name):
     tags_result = {}
     tags: List[Any] = tag_detector.findall(name)
     for tag in tags:
@@ -65,3 +77,23 @@ def get_tags_from_name(name):
         tags_result[tag_name] = cast_element(tag_value, tag_type)
 
     return tags_result
+
+
+def get_tags_from_names(
+    names: Iterable[str], skip_invalid: bool = False
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Parse the tags of many names at once, every different name is only parsed once
+    :param skip_invalid: leave out names with wrong tags instead of raising a ValueError
+    :return: tags of every name in the format {name: {tag_name: tag_value}}
+    """
+    result = {}
+    for name in names:
+        if name in result:
+            continue
+        try:
+            result[name] = get_tags_from_name(name)
+        except ValueError:
+            if not skip_invalid:
+                raise
+    return result